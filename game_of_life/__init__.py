@@ -1,8 +1,19 @@
+import functools
 import os
 import sys
 from configparser import ConfigParser
+from typing import Any
 from loguru import logger
 
+
+@functools.lru_cache(maxsize=None)
+def read_config(path: str) -> ConfigParser:
+    """Parses a configuration file on the first call, later calls return the same parser."""
+    parser = ConfigParser()
+    parser.read(path)
+    return parser
+
+
 __version__ = '0.1.0'
 
 # absolute package directory
@@ -11,23 +22,27 @@ package_dir = os.path.dirname(os.path.abspath(__file__))
 # configuration file
 relative_config_path = os.path.join("config", "config.ini")
 config_path = os.path.join(package_dir, relative_config_path)
-config = ConfigParser()
-config.read(config_path)
+config = read_config(config_path)
 
 # default configuration
 relative_default_config_path = os.path.join("config", "default.ini")
 default_config_path = os.path.join(package_dir, relative_default_config_path)
-default_config = ConfigParser()
-default_config.read(default_config_path)
 
 # project file
 relative_project_path = os.path.join("..", "pyproject.toml")
 project_path = os.path.join(package_dir, relative_project_path)
-project = ConfigParser()
-project.read(project_path)
 
 # logger
 LOGGER_LEVEL = config["LOGGER"]["LEVEL"]
 logger.remove()
 logger.add(sys.stderr, level=LOGGER_LEVEL)
 logger.info("Game of Life being initalized ...")
+
+
+def __getattr__(name: str) -> Any:
+    # the default configuration and the project file are only needed by the GUI, they are parsed on first access
+    if name == "default_config":
+        return read_config(default_config_path)
+    if name == "project":
+        return read_config(project_path)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
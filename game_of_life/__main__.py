@@ -1,8 +1,7 @@
 """Main module."""
-from tkinter import Tk
-from game_of_life.app import GameOfLife
+import sys
+
+from game_of_life.cli import main
 
 if __name__ == '__main__':
-    root = Tk()
-    client = GameOfLife(root)
-    root.mainloop()
+    sys.exit(main())
@@ -1,11 +1,21 @@
+import time
 import tkinter as tk
+from tkinter import filedialog
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 
 from game_of_life import config, logger
-from game_of_life.gui import GameOfLifeGUI
-from game_of_life.processing import ProcessingThread, Message
+from game_of_life.engines import BOARD_DTYPE
+from game_of_life.gui import GameOfLifeGUI, StatsWindow
+from game_of_life.history import HistoryReader
+from game_of_life.metrics import CANVAS, metrics
+from game_of_life.patterns import PATTERN_TYPES, write_pattern
+from game_of_life.processing import Message, Processor, ProcessingProcess, ProcessingThread
 
+# seconds between refreshes of the shown metrics and statistics
+METRICS_REFRESH = 0.5
+STATS_REFRESH = 0.5
 
 # TODO clean up the unnecessary logging
 class GameOfLife:
@@ -30,18 +40,44 @@ class GameOfLife:
         # GUI setup
         self.gui = GameOfLifeGUI(master)
         self.gui.widgets["menubar"].file_menu.entryconfigure(0, command=self.restart_game)
+        self.gui.widgets["menubar"].file_menu.entryconfigure(1, command=self.open_pattern)
+        self.gui.widgets["menubar"].file_menu.entryconfigure(2, command=self.save_pattern)
         self.gui.widgets["grid"].bind("<Button-1>", lambda x: self._edit_cell(x, alive=True))
         self.gui.widgets["grid"].bind("<B1-Motion>", lambda x: self._edit_cell(x, alive=True))
         self.gui.widgets["grid"].bind("<Button-3>", lambda x: self._edit_cell(x, alive=False))
         self.gui.widgets["grid"].bind("<B3-Motion>", lambda x: self._edit_cell(x, alive=False))
-        self.gui.widgets["grid"].bind("<ButtonRelease-1>", self._process_shown)
-        self.gui.widgets["grid"].bind("<ButtonRelease-3>", self._process_shown)
+        self.gui.widgets["grid"].bind("<ButtonRelease-1>", self._send_edits)
+        self.gui.widgets["grid"].bind("<ButtonRelease-3>", self._send_edits)
+        # cells edited since the last mouse button release, by their position
+        self.edits: Dict[Tuple[int, int], int] = dict()
+        # zoom by mouse wheel (X11 reports it as buttons 4 and 5), pan by dragging with the middle button
+        self.gui.widgets["grid"].bind("<MouseWheel>", lambda x: self.zoom(1.25 if x.delta > 0 else 0.8, x.x, x.y))
+        self.gui.widgets["grid"].bind("<Button-4>", lambda x: self.zoom(1.25, x.x, x.y))
+        self.gui.widgets["grid"].bind("<Button-5>", lambda x: self.zoom(0.8, x.x, x.y))
+        self.gui.widgets["grid"].bind("<Button-2>", self._start_pan)
+        self.gui.widgets["grid"].bind("<B2-Motion>", self._pan)
+        self.pan_position = (0, 0)
         self.gui_sleep = int(1000 / config.getint("APP", "MAX_FPS"))
         self.gui_paused = False
+        self.step_pending = False
+        self.turbo = config.getboolean("APP", "TURBO")
+        self.replay: Optional[HistoryReader] = None
+        self.replay_index = 0
+        self.metrics_shown = False
+        self.metrics_time = 0.0
+        self.stats_window: Optional[StatsWindow] = None
+        self.stats_time = 0.0
 
         # processing 
-        self.processor = ProcessingThread()
+        self.processor: Processor
+        if config.getboolean("APP", "WORKER_PROCESS"):
+            self.processor = ProcessingProcess()
+        else:
+            self.processor = ProcessingThread()
+        # the view into an unbounded universe may leave the board
+        self.gui.widgets["grid"].viewport.bounded = not self.processor.unbounded
         self.shown: np.ndarray
+        self.shown_generation = 0
 
         # initialize game
         self.processor.send_message(Message(Message.RANDOM_INIT))
@@ -62,6 +98,19 @@ class GameOfLife:
             config["APP"]["QUIT_GAME_KEY"]: self.gui.widgets["menubar"].exit_command,
             config["APP"]["SETTINGS_KEY"]: self.gui.widgets["menubar"].settings_command,
             config["APP"]["ABOUT_KEY"]: self.gui.widgets["menubar"].about_command,
+            config["APP"]["FAST_FORWARD_KEY"]: self.fast_forward,
+            config["APP"]["TURBO_KEY"]: self.toggle_turbo,
+            config["APP"]["OPEN_PATTERN_KEY"]: self.open_pattern,
+            config["APP"]["SAVE_PATTERN_KEY"]: self.save_pattern,
+            config["APP"]["REPLAY_KEY"]: self.toggle_replay,
+            config["APP"]["REPLAY_BACK_KEY"]: lambda: self._replay_step(-1),
+            config["APP"]["REPLAY_FORWARD_KEY"]: lambda: self._replay_step(1),
+            config["APP"]["ZOOM_IN_KEY"]: lambda: self.zoom(2),
+            config["APP"]["ZOOM_OUT_KEY"]: lambda: self.zoom(0.5),
+            config["APP"]["RESET_VIEW_KEY"]: self.reset_view,
+            config["APP"]["METRICS_KEY"]: self.toggle_metrics,
+            config["APP"]["TRACE_KEY"]: self.dump_trace,
+            config["APP"]["STATS_KEY"]: self.toggle_stats,
         }
 
         actions.get(char, lambda *args: None).__call__()
@@ -71,70 +120,257 @@ class GameOfLife:
 
     def pause_game(self) -> None:
         """Pauses the game."""
+        if self.replay is not None:
+            self.toggle_replay()
         if self.gui_paused:
-            self.gui_paused = False
+            self._set_paused(False)
             logger.debug("<UNPAUSED>")
         else:
-            self.gui_paused = True
+            self._set_paused(True)
             logger.debug("<PAUSED>")
 
+    def _set_paused(self, paused: bool) -> None:
+        """Pauses or unpauses both GUI and processing thread."""
+        if paused != self.gui_paused:
+            self.processor.send_message(Message(Message.PAUSE if paused else Message.RESUME))
+        self.gui_paused = paused
+
     def restart_game(self) -> None:
         """Restarts the game with random initial state."""
-        self.processor.msg_queue.put(Message(Message.RANDOM_INIT))
+        self.processor.send_message(Message(Message.RANDOM_INIT))
         self.processor.flush_processed()
         self.gui_paused = False
         logger.debug("<RESTART>")
 
     def _erase_cells(self) -> None:
         """Erases all living cells in the game."""
-        self.processor.msg_queue.put(Message(Message.CLEAN_INIT))
+        self.processor.send_message(Message(Message.CLEAN_INIT))
         self.processor.flush_processed()
         self.gui_paused = False
         logger.debug("<CELLS ERASED>")
 
+    def fast_forward(self) -> None:
+        """Skips the configured number of generations and shows only the resulting one."""
+        generations = config.getint("APP", "FAST_FORWARD_GENERATIONS")
+        self.processor.flush_processed()
+        self.processor.send_message(Message(Message.FAST_FORWARD, generations))
+        # a paused game shows the generation reached as soon as it is computed
+        self.step_pending = True
+        logger.debug(f"<FAST FORWARD {generations}>")
+
+    def toggle_turbo(self) -> None:
+        """Switches between showing every generation and showing only the newest one in turbo mode."""
+        self.turbo = not self.turbo
+        self.processor.flush_processed()
+        self.processor.send_message(Message(Message.TURBO, self.turbo))
+        logger.debug(f"<TURBO {'ON' if self.turbo else 'OFF'}>")
+
+    def open_pattern(self) -> None:
+        """Pauses the game and loads a pattern file chosen by the user, centered on the grid."""
+        path = filedialog.askopenfilename(parent=self.master, filetypes=PATTERN_TYPES)
+        if not path:
+            return
+        self._set_paused(True)
+        self.processor.flush_processed()
+        self.processor.send_message(Message(Message.LOAD_PATTERN, path))
+        self.step_pending = True
+        logger.debug(f"<OPEN PATTERN {path}>")
+
+    def save_pattern(self) -> None:
+        """Saves currently shown generation to a pattern file chosen by the user."""
+        path = filedialog.asksaveasfilename(parent=self.master, filetypes=PATTERN_TYPES, defaultextension=".rle")
+        if not path:
+            return
+        try:
+            write_pattern(path, self.shown, config["APP"]["RULE"])
+        except (OSError, ValueError) as error:
+            logger.error(f"Pattern could not be saved: {error}")
+            return
+        logger.debug(f"<SAVE PATTERN {path}>")
+
+    def toggle_replay(self) -> None:
+        """
+        Enters replay mode showing recorded generations (the game is paused), or leaves it continuing the game
+        from the replayed generation.
+        """
+        if self.replay is not None:
+            self.replay.close()
+            self.replay = None
+            self._process_shown(None)
+            logger.debug("<REPLAY OFF>")
+            return
+        if self.processor.history_path is None:
+            logger.warning("History is not being recorded, enable APP/HISTORY to replay the game.")
+            return
+
+        self._set_paused(True)
+        self.replay = HistoryReader(self.processor.history_path)
+        self.replay_index = self.replay.find(self.shown_generation)
+        self._replay_step(0)
+        logger.debug("<REPLAY ON>")
+
+    def _replay_step(self, offset: int) -> None:
+        """Shows recorded generation the given number of records away from the shown one, in replay mode only."""
+        if self.replay is None:
+            return
+        self.replay.refresh()
+        self.replay_index = min(max(self.replay_index + offset, 0), len(self.replay) - 1)
+        self.shown = self.replay.seek(self.replay_index)
+        self.shown_generation = self.replay.generations[self.replay_index]
+        self.gui.show_cells(self.processor.array_to_img(self.shown), self.shown_generation)
+
+    def zoom(self, factor: float, x: Optional[int] = None, y: Optional[int] = None) -> None:
+        """Zooms the grid in (factor > 1) or out around the given canvas position (the centre by default)."""
+        self.gui.widgets["grid"].viewport.zoom_by(factor, x, y)
+        self._set_view()
+
+    def reset_view(self) -> None:
+        """Shows the whole grid, or all alive cells of an unbounded universe."""
+        viewport = self.gui.widgets["grid"].viewport
+        box = self.processor.bounding_box() if self.processor.unbounded else None
+        if box is None:
+            viewport.reset()
+        else:
+            viewport.fit(box)
+        self._set_view()
+
+    def toggle_metrics(self) -> None:
+        """Shows or hides the overlay with timings of the pipeline stages."""
+        self.metrics_shown = not self.metrics_shown
+        if self.metrics_shown:
+            self._show_metrics()
+        else:
+            self.gui.widgets["grid"].hide_overlay()
+
+    def _show_metrics(self) -> None:
+        self.metrics_time = time.perf_counter()
+        self.gui.widgets["grid"].show_overlay(metrics.report())
+
+    def toggle_stats(self) -> None:
+        """Opens or closes the window with live statistics of the game."""
+        if self.stats_window is not None:
+            self.stats_window.destroy()
+            self.stats_window = None
+            return
+        if not config.getboolean("APP", "STATS"):
+            logger.warning("Statistics are not being collected, enable APP/STATS to show them.")
+            return
+        self.stats_window = StatsWindow(self.master, on_close=self.toggle_stats)
+        self._request_stats()
+
+    def _request_stats(self) -> None:
+        """Shows the newest statistics received from the processing thread and asks for fresh ones."""
+        self.stats_time = time.perf_counter()
+        snapshot = self.processor.statistics()
+        if snapshot is not None and self.stats_window is not None:
+            self.stats_window.show(snapshot)
+        self.processor.send_message(Message(Message.STATS))
+
+    def dump_trace(self) -> None:
+        """Saves the recorded timings as a Chrome trace."""
+        path = config["APP"]["TRACE_FILE"]
+        metrics.dump_trace(path)
+        logger.info(f"Trace of {len(metrics.events)} events saved to '{path}'")
+
+    def _start_pan(self, event: tk.Event) -> None:
+        self.pan_position = (event.x, event.y)
+
+    def _pan(self, event: tk.Event) -> None:
+        """Moves the shown window of the grid along with the mouse."""
+        x, y = self.pan_position
+        viewport = self.gui.widgets["grid"].viewport
+        view = viewport.view
+        viewport.pan(event.x - x, event.y - y)
+        if viewport.view != view:
+            self.pan_position = (event.x, event.y)
+            self._set_view()
+
+    def _set_view(self) -> None:
+        """Redraws the shown generation in the current view and passes the view to the processing thread."""
+        view = self.gui.widgets["grid"].viewport.view
+        self.processor.edit_renderer.set_view(view)
+        self.processor.flush_processed()
+        self.processor.send_message(Message(Message.VIEW, view))
+        if self.processor.unbounded:
+            # cells outside of the board are rendered by the worker, also while paused
+            self.step_pending = True
+        if hasattr(self, "shown"):
+            self.gui.show_cells(self.processor.array_to_img(self.shown), self.shown_generation, self._status())
+        logger.debug(f"<VIEW {view}>")
+
     def _next_step(self) -> None:
         """Pauses the game and performs a single next step."""
-        self.gui_paused = True
-        self._update_gui()
+        self._set_paused(True)
+        if not self._update_gui():
+            # nothing computed ahead, ask the paused processing thread for the next generation
+            self.processor.send_message(Message(Message.STEP))
+            self.step_pending = True
 
     def _edit_cell(self, event: tk.Event, alive: bool) -> None:
-        """Edits cell status at the given position."""
-        self.gui_paused = True
-        cell_array = self.shown
+        """Edits cell status at the given position, repainting only the pixels of the cell."""
+        self._set_paused(True)
+        if not self.edits:
+            # generations computed ahead are outdated by the edits, the shown array may be shared with them
+            self.processor.flush_processed()
+            self.shown = self.shown.copy()
 
         i, j = self.gui.widgets["grid"].coords_to_grid_position(x=event.x, y=event.y)
-        i, j = max(i, 0), max(j, 0)
-
-        try:
-            cell_array[i, j] = int(alive)
-        except IndexError:
+        if not (0 <= i < self.shown.shape[0] and 0 <= j < self.shown.shape[1]):
             logger.debug("Cursor outside of canvas.")
+            return
+        if self.shown[i, j] == alive:
+            return
+
+        self.shown[i, j] = int(alive)
+        self.edits[(i, j)] = int(alive)
+        painted = self.processor.region_to_img(self.shown, (i, j, i + 1, j + 1))
+        if painted is not None:
+            self.gui.paint_cells(*painted)
 
-        self.shown = cell_array
-        cells = self.processor.array_to_img(cell_array)
-        self.gui.show_cells(cells)
+    def _send_edits(self, event: tk.Event) -> None:
+        """Sends cells edited since the last mouse button press to the processing thread."""
+        if not self.edits:
+            return
+        positions = np.array(list(self.edits), dtype=np.intp).reshape(-1, 2)
+        values = np.array(list(self.edits.values()), dtype=BOARD_DTYPE)
+        # the worker goes back to the shown generation if it got ahead of it
+        edits = (positions[:, 0], positions[:, 1], values, self.shown_generation)
+        self.processor.send_message(Message(Message.EDIT_CELLS, edits))
+        logger.debug(f"Sent {len(values)} edited cells")
+        self.edits = dict()
 
-    def _process_shown(self, event: tk.Event) -> None:
-        """Puts currently shown image to the processing thread as a new initial state."""
+    def _process_shown(self, event: Optional[tk.Event]) -> None:
+        """Puts currently shown generation to the processing thread as a new initial state, keeping its number."""
         self.processor.flush_processed()
-        logger.debug(f"Processed imgs in queue: {self.processor.processed.qsize()}")
-        self.processor.send_message(Message(Message.IMG_UPDATE, self.shown))
+        self.processor.send_message(Message(Message.IMG_UPDATE, (self.shown, self.shown_generation)))
         logger.debug("Inserted current gen msg in msg queue")
 
     def periodic_gui_update(self) -> None:
         """GUI update loop responsible for showing new cell generations."""
         if not self.gui_paused:
             self._update_gui()
+        elif self.step_pending:
+            self.step_pending = not self._update_gui()
+        if self.metrics_shown and time.perf_counter() - self.metrics_time >= METRICS_REFRESH:
+            self._show_metrics()
+        if self.stats_window is not None and time.perf_counter() - self.stats_time >= STATS_REFRESH:
+            self._request_stats()
 
         self.master.after(self.gui_sleep, self.periodic_gui_update)
 
-    def _update_gui(self) -> None:
-        """Performs a single step in the GUI update loop."""
-        if not self.processor.processed.empty():
-            logger.debug("processed not empty, showing img...")
-            self.shown, cell_img = self.processor.get_processed()
-            self.processor.processed.task_done()
-            self.gui.show_cells(cell_img)
-            logger.debug(f"{self.processor.processed.qsize()} processed imgs left in queue")
-        else:
-            logger.debug(f"processed empty: {self.processor.processed.qsize()}")
+    def _status(self) -> Optional[str]:
+        """Returns description of the cycle the shown generation is part of, if detected."""
+        cycle = self.processor.cycle
+        if cycle is not None and self.shown_generation >= cycle.start:
+            return str(cycle)
+        return None
+
+    def _update_gui(self) -> bool:
+        """Performs a single step in the GUI update loop, returns whether a new generation was shown."""
+        frame = self.processor.take_frame()
+        if frame is None:
+            return False
+        self.shown, cell_img, self.shown_generation = frame
+        with metrics.timer(CANVAS):
+            self.gui.show_cells(cell_img, self.shown_generation, self._status())
+        return True
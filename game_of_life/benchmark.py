@@ -0,0 +1,203 @@
+"""Benchmarks of startup and of the stages of the game loop: stepping, rendering, drawing and queue hand-off."""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game_of_life import __version__, config, logger
+
+Result = Dict[str, Any]
+
+# sizes and densities measured by default
+SIZES = (20, 128, 512, 2048, 8192)
+DENSITIES = (0.1, 0.5)
+
+
+def measure(fn: Callable[[], Any], min_time: float = 0.2, min_repeats: int = 3) -> float:
+    """Returns median duration of a call of the function in seconds."""
+    fn()  # warm-up
+    durations: List[float] = []
+    total_start = time.perf_counter()
+    while len(durations) < min_repeats or time.perf_counter() - total_start < min_time:
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def random_board(size: int, density: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.random((size, size)) < density).astype(np.uint8)
+
+
+def bench_import(module: str = "game_of_life.cli", repeats: int = 3) -> float:
+    """Median duration of a cold import of the module in a new interpreter, as reported by `-X importtime`."""
+    durations = []
+    for _ in range(repeats):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+        )
+        for line in process.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            fields = line.split("|")
+            if line.startswith("import time:") and fields[-1].strip() == module:
+                durations.append(int(fields[1]) / 1e6)
+    return statistics.median(durations)
+
+
+def bench_step(size: int, density: float, engine: str, min_time: float) -> float:
+    """Duration of calculation of one generation (the worker's `_process` step without rendering)."""
+    from game_of_life.simulation import Simulation
+
+    # without cycle detection, so that a settled board is not served from the cycle cache, and without statistics
+    simulation = Simulation((size, size), engine, detect_cycles=False, stats=False)
+    try:
+        simulation.load(random_board(size, density))
+        return measure(simulation.step, min_time)
+    finally:
+        simulation.close()
+
+
+def bench_step_allocations(size: int, density: float, engine: str) -> int:
+    """Bytes allocated by the engine during calculation of one generation."""
+    from game_of_life.engines import get_engine
+    from game_of_life.metrics import allocated_bytes
+
+    stepper = get_engine(engine)((size, size))
+    try:
+        stepper.load(random_board(size, density))
+        return allocated_bytes(stepper.step)
+    finally:
+        stepper.close()
+
+
+def bench_render(size: int, density: float, min_time: float) -> float:
+    """Duration of colorization and scaling of a board to the canvas size (`array_to_img` without Tk)."""
+    from game_of_life.processing import ProcessingThread
+
+    processor = ProcessingThread(units=size, engine="convolve")
+    board = random_board(size, density)
+    return measure(lambda: processor.renderer.render(board), min_time)
+
+
+def bench_draw(size: int, density: float, min_time: float) -> Optional[float]:
+    """Duration of PhotoImage creation and `Grid.draw_img`, None when no display is available."""
+    import tkinter as tk
+    from PIL import ImageTk
+    from game_of_life.gui import Grid
+    from game_of_life.processing import ProcessingThread
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    try:
+        processor = ProcessingThread(units=size, engine="convolve")
+        grid = Grid(root, dim=processor.array_size, num_units=size, background_color=processor.background_color,
+                    foreground_color=processor.foreground_color, edge_color=config.get("GRID", "EDGE_COLOR"))
+        processor.renderer.render(random_board(size, density))
+
+        def draw() -> None:
+            grid.draw_img(ImageTk.PhotoImage(processor.renderer.image()))
+            root.update_idletasks()
+
+        return measure(draw, min_time)
+    finally:
+        root.destroy()
+
+
+def bench_queue(size: int, min_time: float, items: int = 200) -> float:
+    """Duration of a hand-off of one processed frame from the worker to the GUI update loop."""
+    from game_of_life.processing import ProcessingThread
+
+    processor = ProcessingThread(units=size, engine="convolve")
+    item = (random_board(size, 0.5), processor.renderer.indices)
+
+    def hand_off() -> None:
+        def produce() -> None:
+            for _ in range(items):
+                processor.processed.put(item)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        received = 0
+        while received < items:
+            if not processor.processed.empty():
+                processor.get_processed()
+                processor.processed.task_done()
+                received += 1
+        producer.join()
+
+    return measure(hand_off, min_time) / items
+
+
+def run_benchmarks(
+    sizes: Tuple[int, ...] = SIZES,
+    densities: Tuple[float, ...] = DENSITIES,
+    engine: Optional[str] = None,
+    min_time: float = 0.2,
+) -> Dict[str, Any]:
+    """Runs all benchmarks and returns results in the form saved to JSON files."""
+    engine = engine or config["APP"]["ENGINE"]
+    results: List[Result] = []
+
+    def add(stage: str, size: int, density: Optional[float], duration: Optional[float], **extra: Any) -> None:
+        if duration is None:
+            logger.warning(f"Stage '{stage}' skipped, no display available.")
+            return
+        result = dict(stage=stage, engine=engine, size=size, density=density, time=duration, rate=1 / duration)
+        results.append(dict(result, **extra))
+        logger.info(
+            f"{stage:>6} {size:>5} {density!s:>4}: {1e3 * duration:10.3f} ms ({1 / duration:10.1f} /s)"
+            + "".join(f", {key} {value}" for key, value in extra.items())
+        )
+
+    add("import", 0, None, bench_import())
+    for size in sizes:
+        for density in densities:
+            add(
+                "step", size, density, bench_step(size, density, engine, min_time),
+                allocated=bench_step_allocations(size, density, engine),
+            )
+            add("render", size, density, bench_render(size, density, min_time))
+            add("draw", size, density, bench_draw(size, density, min_time))
+        add("queue", size, None, bench_queue(size, min_time))
+
+    meta = dict(version=__version__, python=platform.python_version(), machine=platform.machine(), time=time.time())
+    return dict(meta=meta, results=results)
+
+
+def _key(result: Result) -> Tuple:
+    return result["stage"], result["engine"], result["size"], result["density"]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Returns descriptions of results slower than in the baseline by more than the tolerance (relative)."""
+    previous = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get(_key(result))
+        if old is not None and result["time"] > old["time"] * (1 + tolerance):
+            stage, engine, size, density = _key(result)
+            regressions.append(
+                f"{stage} ({engine}, size {size}, density {density}): "
+                f"{1e3 * old['time']:.3f} ms -> {1e3 * result['time']:.3f} ms "
+                f"({100 * (result['time'] / old['time'] - 1):+.0f} %)"
+            )
+    return regressions
+
+
+def save(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
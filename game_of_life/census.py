@@ -0,0 +1,262 @@
+"""Census of the objects random soups settle into, searched by a pool of processes."""
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game_of_life import config, logger
+from game_of_life.engines import BOARD_DTYPE
+from game_of_life.engines.lookup import normalize_rule
+from game_of_life.ensemble import Ensemble
+
+CENSUS_VERSION = 1
+
+# (seed, start, stop) of a range of searched soups
+Run = Tuple[int, int, int]
+
+
+def soups(seed: int, start: int, stop: int, size: int, soup_size: int, density: float) -> np.ndarray:
+    """
+    Returns boards with soups start..stop of the seed in their middle. Every soup has its own random generator,
+    so it is the same whichever batch or process it is searched in.
+    """
+    boards = np.zeros((stop - start, size, size), dtype=BOARD_DTYPE)
+    offset = (size - soup_size) // 2
+    for board, index in zip(boards, range(start, stop)):
+        random = np.random.default_rng([seed, index]).random((soup_size, soup_size))
+        board[offset:offset + soup_size, offset:offset + soup_size] = random < density
+    return boards
+
+
+def _crop(cells: np.ndarray) -> np.ndarray:
+    rows, cols = np.flatnonzero(cells.any(axis=1)), np.flatnonzero(cells.any(axis=0))
+    return cells[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+
+def _orientations(cells: np.ndarray) -> List[np.ndarray]:
+    """Returns the cells under all rotations and reflections."""
+    return [np.rot90(flipped, k) for flipped in (cells, cells.T) for k in range(4)]
+
+
+class Classifier:
+    """
+    Canonical names of objects, each given by its phases over a period. An object is canonicalized once:
+    its name is cached under its first phase as found on the board, which determines all of its evolution.
+    """
+
+    def __init__(self) -> None:
+        self.cache: Dict[Tuple[Tuple[int, ...], bytes], Tuple[str, np.ndarray]] = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def classify(self, phases: List[np.ndarray]) -> Tuple[str, np.ndarray]:
+        """Returns the name and the canonical form of an object given by its phases over a period."""
+        first = _crop(phases[0])
+        key = (first.shape, np.packbits(first).tobytes())
+        if key in self.cache:
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+
+        # the object may oscillate with a period dividing the period of the whole board
+        period = next((p for p in range(1, len(phases)) if np.array_equal(phases[p], phases[0])), len(phases))
+        # canonical form is the smallest of all phases under all orientations, compared by shape and cells
+        candidates = [
+            (cells.shape, np.packbits(cells).tobytes(), cells)
+            for phase in phases[:period] for cells in _orientations(_crop(phase))
+        ]
+        shape, packed, cells = min(candidates, key=lambda candidate: candidate[:2])
+        digest = hashlib.blake2b(repr(shape).encode() + packed, digest_size=8).hexdigest()
+        # prefixes of apgcodes: still lifes by population, oscillators by period
+        prefix = f"xs{int(cells.sum())}" if period == 1 else f"xp{period}"
+        self.cache[key] = (f"{prefix}_{digest}", np.ascontiguousarray(cells))
+        return self.cache[key]
+
+
+@functools.lru_cache(maxsize=None)
+def classifier(rule: str) -> Classifier:
+    """Returns the classifier of the rule, shared by all searches of a process."""
+    return Classifier()
+
+
+class Census:
+    """
+    Counts of the objects soups of a rule settled into, keyed by the canonical name of the object.
+
+    Objects are the connected components of the cells alive in any phase of the settled board, so that
+    oscillators are not split, touching objects are counted as one. Objects touching the edge of the board
+    were shaped by its dead border and are only counted in `boundary`, soups not settled within the searched
+    generations only in `unsettled`. Censuses of the same rule, board and soup sizes and density are merged
+    by adding the counts, the soups searched by each are listed in `runs`.
+    """
+
+    def __init__(self, rule: str, size: int, soup_size: int, density: float) -> None:
+        self.rule = normalize_rule(rule)
+        self.size = size
+        self.soup_size = soup_size
+        self.density = density
+        self.counts: Counter = Counter()
+        # rows of the canonical form of each object, "O" for alive cells
+        self.objects: Dict[str, List[str]] = dict()
+        self.runs: List[Run] = []
+        self.soups = 0
+        self.unsettled = 0
+        self.boundary = 0
+
+    @property
+    def settings(self) -> Tuple[str, int, int, float]:
+        return self.rule, self.size, self.soup_size, self.density
+
+    def add(self, phases: List[np.ndarray], classifier: Classifier) -> None:
+        """Adds objects of a settled board given by its phases over a period."""
+        from scipy.ndimage import find_objects, label
+
+        envelope = np.logical_or.reduce(phases)
+        labels, _ = label(envelope, structure=np.ones((3, 3)))
+        for number, (rows, cols) in enumerate(find_objects(labels), start=1):
+            if rows.start == 0 or cols.start == 0 or rows.stop == self.size or cols.stop == self.size:
+                self.boundary += 1
+                continue
+            mask = labels[rows, cols] == number
+            name, cells = classifier.classify([(phase[rows, cols] != 0) & mask for phase in phases])
+            self.counts[name] += 1
+            if name not in self.objects:
+                self.objects[name] = ["".join(".O"[int(cell)] for cell in row) for row in cells]
+
+    def merge(self, other: "Census") -> None:
+        """Adds counts of another census of the same settings and of other soups."""
+        if other.settings != self.settings:
+            raise ValueError(f"Census of {other.settings} cannot be merged into census of {self.settings}.")
+        for seed, start, stop in other.runs:
+            if any(seed == s and start < e and b < stop for s, b, e in self.runs):
+                raise ValueError(f"Soups {start}..{stop} of seed {seed} are already in the census.")
+        self.counts.update(other.counts)
+        for name, rows in other.objects.items():
+            self.objects.setdefault(name, rows)
+        self.runs = _joined(self.runs + other.runs)
+        self.soups += other.soups
+        self.unsettled += other.unsettled
+        self.boundary += other.boundary
+
+    def next_soup(self, seed: int) -> int:
+        """Returns the index of the soup of the seed following the searched ones."""
+        return max((stop for s, _, stop in self.runs if s == seed), default=0)
+
+    def report(self, top: int = 20) -> str:
+        objects = sum(self.counts.values())
+        lines = [
+            f"{self.rule}: {self.soups} soups, {len(self.counts)} distinct objects out of {objects}, "
+            f"{self.unsettled} soups unsettled, {self.boundary} objects at the edge",
+            f"{'object':<24}{'count':>10}{'share':>9}",
+        ]
+        for name, count in self.counts.most_common(top):
+            lines.append(f"{name:<24}{count:>10}{100 * count / objects:>8.3f}%")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            version=CENSUS_VERSION, rule=self.rule, size=self.size, soup_size=self.soup_size, density=self.density,
+            soups=self.soups, unsettled=self.unsettled, boundary=self.boundary, runs=[list(run) for run in self.runs],
+            objects={name: dict(count=count, cells=self.objects[name]) for name, count in self.counts.most_common()},
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Census":
+        if data.get("version") != CENSUS_VERSION:
+            raise ValueError(f"Unsupported census version {data.get('version')}.")
+        census = cls(data["rule"], data["size"], data["soup_size"], data["density"])
+        census.soups, census.unsettled, census.boundary = data["soups"], data["unsettled"], data["boundary"]
+        census.runs = [tuple(run) for run in data["runs"]]
+        for name, entry in data["objects"].items():
+            census.counts[name] = entry["count"]
+            census.objects[name] = entry["cells"]
+        return census
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "Census":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _joined(runs: List[Run]) -> List[Run]:
+    """Returns the runs sorted, with adjacent runs of a seed joined into one."""
+    joined: List[Run] = []
+    for seed, start, stop in sorted(runs):
+        if joined and joined[-1][0] == seed and joined[-1][2] == start:
+            joined[-1] = (seed, joined[-1][1], stop)
+        else:
+            joined.append((seed, start, stop))
+    return joined
+
+
+def search_batch(census: Census, seed: int, start: int, stop: int, generations: int) -> Census:
+    """Evolves soups start..stop of the seed as an ensemble until they settle and adds them to an empty census."""
+    ensemble = Ensemble(stop - start, (census.size, census.size), census.rule)
+    ensemble.load(soups(seed, start, stop, census.size, census.soup_size, census.density))
+    ensemble.run(generations)
+
+    # all phases of the settled boards
+    settled = np.flatnonzero(ensemble.settled >= 0)
+    phases = [ensemble.boards.copy()]
+    for _ in range(int(ensemble.period[settled].max(initial=1)) - 1):
+        ensemble.step()
+        phases.append(ensemble.boards.copy())
+
+    for board in settled:
+        census.add([phase[board] for phase in phases[:ensemble.period[board]]], classifier(census.rule))
+    census.runs = [(seed, start, stop)]
+    census.soups = stop - start
+    census.unsettled = stop - start - settled.size
+    return census
+
+
+def _search_task(task: Tuple[Tuple[str, int, int, float], int, int, int, int]) -> Census:
+    settings, seed, start, stop, generations = task
+    return search_batch(Census(*settings), seed, start, stop, generations)
+
+
+def search(
+    count: int,
+    seed: int = 0,
+    start: int = 0,
+    rule: Optional[str] = None,
+    size: int = 64,
+    soup_size: int = 16,
+    density: float = 0.5,
+    generations: int = 4000,
+    batch: int = 64,
+    workers: Optional[int] = None,
+) -> Census:
+    """
+    Searches `count` soups of the seed from the `start`-th on in batches spread over a pool of processes
+    (`WORKERS` by default, all CPUs if 0). Each batch is evolved as an ensemble, so the soups of a batch are
+    stepped in a single vectorized pass, and sent back as a census of its own merged into the result.
+    """
+    census = Census(rule or config["APP"]["RULE"], size, soup_size, density)
+    if workers is None:
+        workers = config.getint("APP", "WORKERS")
+    workers = workers or os.cpu_count() or 1
+    tasks = [
+        (census.settings, seed, first, min(first + batch, start + count), generations)
+        for first in range(start, start + count, batch)
+    ]
+
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            census.merge(_search_task(task))
+    else:
+        logger.info(f"Census search started {min(workers, len(tasks))} workers.")
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(min(workers, len(tasks))) as pool:
+            for result in pool.imap_unordered(_search_task, tasks):
+                census.merge(result)
+    return census
@@ -0,0 +1,268 @@
+"""Command line interface, running either the GUI or the headless commands."""
+import argparse
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game_of_life import config, logger
+from game_of_life.history import HistoryWriter
+from game_of_life.metrics import metrics
+from game_of_life.patterns import read_pattern, write_pattern
+from game_of_life.simulation import Simulation
+
+
+def run_gui(args: argparse.Namespace) -> int:
+    """Runs the game with GUI."""
+    from tkinter import Tk
+    from game_of_life.app import GameOfLife
+
+    root = Tk()
+    GameOfLife(root)
+    root.mainloop()
+    return 0
+
+
+def read_input(args: argparse.Namespace) -> Tuple[Optional[np.ndarray], Optional[str]]:
+    """Returns the board of the input pattern file, if any, and the rule given or else the rule of the file."""
+    if not args.input:
+        return None, args.rule
+    board, rule = read_pattern(args.input, shape=(args.size, args.size))
+    return board, args.rule or rule
+
+
+def run_headless(args: argparse.Namespace) -> int:
+    """Evolves a random board (or a pattern) for the given number of generations without GUI and reports the results."""
+    board, rule = read_input(args)
+    simulation = Simulation((args.size, args.size), args.engine, args.memory_budget, rule=rule)
+    try:
+        if board is not None:
+            simulation.load(board)
+        else:
+            simulation.reset(random=True, density=args.density, seed=args.seed)
+        logger.info(f"Running {args.generations} generations of {args.size}x{args.size} board ...")
+
+        start = time.perf_counter()
+        if args.history:
+            # every generation is recorded, so the engine is stepped one generation at a time
+            recorder = HistoryWriter(args.history, simulation.shape, config.getint("APP", "HISTORY_KEYFRAME_INTERVAL"))
+            recorder.append(simulation.generation, simulation.state(), keyframe=True)
+            for _ in range(args.generations):
+                simulation.step()
+                recorder.append(simulation.generation, simulation.state())
+            recorder.close()
+        else:
+            simulation.advance(args.generations)
+        elapsed = time.perf_counter() - start
+
+        print(f"engine:      {simulation.engine.name}")
+        print(f"rule:        {simulation.engine.rule}")
+        print(f"generations: {simulation.generation}")
+        print(f"elapsed:     {elapsed:.3f} s")
+        print(f"speed:       {simulation.generation / max(elapsed, 1e-9):.1f} gen/s")
+        print(f"population:  {simulation.population}")
+        print(f"board bytes: {simulation.nbytes}")
+
+        if args.history:
+            print(f"history:     {args.history}")
+        if args.output:
+            write_pattern(args.output, simulation.state(), simulation.engine.rule)
+            print(f"output:      {args.output}")
+        if args.trace:
+            metrics.dump_trace(args.trace)
+            print(f"trace:       {args.trace}")
+    finally:
+        simulation.close()
+    return 0
+
+
+def run_sweep(args: argparse.Namespace) -> int:
+    """Evolves ensembles of random boards of each density and reports their survival and settling statistics."""
+    from game_of_life.ensemble import Ensemble
+
+    results: Dict[str, Any] = dict()
+    print(
+        f"{'density':>8}{'alive':>8}{'extinct':>9}{'settled':>9}"
+        f"{'population':>12}{'extinction':>12}{'settle time':>13}"
+    )
+    for i, density in enumerate(args.densities):
+        ensemble = Ensemble(args.boards, (args.size, args.size), rule=args.rule)
+        ensemble.randomize(density, seed=None if args.seed is None else args.seed + i)
+        ensemble.run(args.generations)
+
+        extinct, settled = ensemble.extinction >= 0, ensemble.settled >= 0
+        print(
+            f"{density:>8.3f}{np.mean(~extinct):>8.3f}{np.mean(extinct):>9.3f}{np.mean(settled):>9.3f}"
+            f"{ensemble.population.mean():>12.1f}"
+            f"{ensemble.extinction[extinct].mean() if extinct.any() else float('nan'):>12.1f}"
+            f"{ensemble.settled[settled].mean() if settled.any() else float('nan'):>13.1f}"
+        )
+        results[f"{density}"] = np.stack((ensemble.population, ensemble.extinction, ensemble.settled, ensemble.period))
+
+    if args.output:
+        # per density, rows of population, extinction generation, settle generation and period of each board
+        np.savez_compressed(args.output, **results)
+        print(f"Results saved to {args.output}.")
+    return 0
+
+
+def run_census(args: argparse.Namespace) -> int:
+    """Searches random soups in a pool of processes and reports the objects they settled into."""
+    from game_of_life.census import Census, search
+
+    # a search continues the census saved to the output (and the merged ones) with the next soups of the seed
+    census = Census(args.rule or config["APP"]["RULE"], args.size, args.soup_size, args.density)
+    paths = ([args.output] if args.output and os.path.exists(args.output) else []) + args.merge
+    try:
+        for path in paths:
+            census.merge(Census.load(path))
+    except (OSError, ValueError, KeyError) as error:
+        logger.error(f"Census could not be merged: {error}")
+        return 1
+    start = census.next_soup(args.seed)
+
+    started = time.perf_counter()
+    census.merge(search(
+        args.soups, args.seed, start, args.rule, args.size, args.soup_size, args.density,
+        args.generations, args.batch, args.workers,
+    ))
+    elapsed = time.perf_counter() - started
+    print(
+        f"Searched soups {start}..{start + args.soups} of seed {args.seed} "
+        f"in {elapsed:.2f} s ({args.soups / elapsed:.1f} soups/s)."
+    )
+    print(census.report(args.top))
+    if args.output:
+        census.save(args.output)
+        print(f"Census saved to {args.output}.")
+    return 0
+
+
+def run_server(args: argparse.Namespace) -> int:
+    """Serves a random board (or a pattern) evolving until interrupted, streaming it to connected clients."""
+    import asyncio
+    from game_of_life.server import FrameServer
+
+    board, rule = read_input(args)
+    simulation = Simulation((args.size, args.size), args.engine, rule=rule)
+    if board is not None:
+        simulation.load(board)
+    else:
+        simulation.reset(random=True, density=args.density, seed=args.seed)
+
+    async def serve() -> None:
+        server = FrameServer(simulation, args.rate, args.history, args.patterns)
+        await server.start(args.host, args.port, args.unix)
+        print(f"Serving on {server.address}, stop by Ctrl+C.")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulation.close()
+    return 0
+
+
+def run_benchmark(args: argparse.Namespace) -> int:
+    """Runs benchmarks, optionally saves them and compares them with a baseline."""
+    from game_of_life import benchmark
+
+    results = benchmark.run_benchmarks(tuple(args.sizes), tuple(args.densities), args.engine, args.min_time)
+    if args.output:
+        benchmark.save(results, args.output)
+        print(f"Results saved to {args.output}.")
+
+    if args.compare:
+        regressions = benchmark.compare(benchmark.load(args.compare), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            print(f"{len(regressions)} regressions against {args.compare}.")
+            return 1
+        print(f"No regressions against {args.compare}.")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="game_of_life", description="Conway's Game of Life.")
+    parser.set_defaults(command=run_gui)
+    commands = parser.add_subparsers(title="commands")
+
+    run = commands.add_parser("run", help="run a simulation without GUI")
+    run.add_argument("--size", type=int, default=config.getint("GRID", "UNITS"), help="number of units per side")
+    run.add_argument("--generations", type=int, default=1000, help="number of generations to compute")
+    run.add_argument("--seed", type=int, default=None, help="seed of the random initial state")
+    run.add_argument("--density", type=float, default=0.5, help="density of alive cells in the initial state")
+    run.add_argument("--engine", default=config["APP"]["ENGINE"], help="stepping engine")
+    run.add_argument("--rule", default=None, help="B/S rulestring, e.g. B36/S23")
+    run.add_argument("--memory-budget", type=int, default=None, help="memory budget of the board in MB")
+    run.add_argument("--input", default=None, help="pattern file to start from (.rle, .cells, .mc or .npy)")
+    run.add_argument("--output", default=None, help="file to save the final generation to (.rle, .cells, .mc or .npy)")
+    run.add_argument("--history", default=None, help="file to record every generation to")
+    run.add_argument("--trace", default=None, help="file to save Chrome trace of the stage timings to")
+    run.set_defaults(command=run_headless)
+
+    sweep = commands.add_parser("sweep", help="evolve ensembles of random boards of varying initial density")
+    sweep.add_argument("--size", type=int, default=64, help="number of units per side of each board")
+    sweep.add_argument("--boards", type=int, default=1000, help="number of boards per density")
+    sweep.add_argument("--densities", type=float, nargs="+", default=[0.1, 0.2, 0.3, 0.4, 0.5], help="densities")
+    sweep.add_argument("--generations", type=int, default=1000, help="maximal number of generations to compute")
+    sweep.add_argument("--seed", type=int, default=None, help="seed of the random initial states")
+    sweep.add_argument("--rule", default=None, help="B/S rulestring, e.g. B36/S23")
+    sweep.add_argument("--output", default=None, help=".npz file to save statistics of all boards to")
+    sweep.set_defaults(command=run_sweep)
+
+    census = commands.add_parser("census", help="search random soups and count the objects they settle into")
+    census.add_argument("--soups", type=int, default=1000, help="number of soups to search")
+    census.add_argument("--seed", type=int, default=0, help="seed of the soups")
+    census.add_argument("--size", type=int, default=64, help="number of units per side of the board of a soup")
+    census.add_argument("--soup-size", type=int, default=16, help="number of units per side of a soup")
+    census.add_argument("--density", type=float, default=0.5, help="density of alive cells in a soup")
+    census.add_argument("--generations", type=int, default=4000, help="maximal number of generations to compute")
+    census.add_argument("--rule", default=None, help="B/S rulestring, e.g. B36/S23")
+    census.add_argument("--batch", type=int, default=64, help="number of soups evolved together by a worker")
+    census.add_argument("--workers", type=int, default=None, help="number of worker processes, 0 for all CPUs")
+    census.add_argument("--output", default=None, help="JSON census file to continue and save the census to")
+    census.add_argument("--merge", nargs="+", default=[], help="JSON census files to merge into the census")
+    census.add_argument("--top", type=int, default=20, help="number of the most common objects to list")
+    census.set_defaults(command=run_census)
+
+    serve = commands.add_parser("serve", help="stream a simulation to clients over a local socket")
+    serve.add_argument("--size", type=int, default=config.getint("GRID", "UNITS"), help="number of units per side")
+    serve.add_argument("--seed", type=int, default=None, help="seed of the random initial state")
+    serve.add_argument("--density", type=float, default=0.5, help="density of alive cells in the initial state")
+    serve.add_argument("--engine", default=config["APP"]["ENGINE"], help="stepping engine")
+    serve.add_argument("--rule", default=None, help="B/S rulestring, e.g. B36/S23")
+    serve.add_argument("--input", default=None, help="pattern file to start from (.rle, .cells, .mc or .npy)")
+    serve.add_argument(
+        "--rate", type=float, default=config.getint("APP", "MAX_FPS"), help="generations per second, 0 for unlimited"
+    )
+    serve.add_argument("--history", default=None, help="file to record every generation to, allows seeking back")
+    serve.add_argument("--patterns", default=None, help="directory of pattern files the clients may load")
+    serve.add_argument("--host", default="127.0.0.1", help="TCP address to listen on")
+    serve.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    serve.add_argument("--unix", default=None, help="Unix socket to listen on instead of TCP")
+    serve.set_defaults(command=run_server)
+
+    bench = commands.add_parser("bench", help="benchmark stepping, rendering, drawing and queue hand-off")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[20, 128, 512, 2048, 8192], help="numbers of units")
+    bench.add_argument("--densities", type=float, nargs="+", default=[0.1, 0.5], help="densities of alive cells")
+    bench.add_argument("--engine", default=config["APP"]["ENGINE"], help="stepping engine")
+    bench.add_argument("--min-time", type=float, default=0.2, help="minimal duration of each measurement in seconds")
+    bench.add_argument("--output", default=None, help="JSON file to save the results to")
+    bench.add_argument("--compare", default=None, help="JSON file with baseline results to compare with")
+    bench.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown against the baseline")
+    bench.set_defaults(command=run_benchmark)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.command(args)
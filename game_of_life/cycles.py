@@ -0,0 +1,158 @@
+"""Detection of still lifes and oscillators by incremental hashing of boards."""
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game_of_life.engines import BOARD_DTYPE
+
+
+def mix(values: np.ndarray) -> np.ndarray:
+    """Returns pseudo-random 64-bit mix of the given values (splitmix64 finalizer)."""
+    with np.errstate(over="ignore"):
+        z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def pack_words(board: np.ndarray) -> np.ndarray:
+    """Returns board packed to 64-cell words."""
+    packed = np.packbits(board != 0, axis=None)
+    padding = -packed.size % 8
+    if padding:
+        packed = np.concatenate((packed, np.zeros(padding, dtype=np.uint8)))
+    return packed.view(np.uint64)
+
+
+def word_keys(indices: np.ndarray, words: np.ndarray) -> np.ndarray:
+    """Returns keys of words with the given values at the given positions."""
+    return mix(mix(indices) ^ words)
+
+
+def words_hash(words: np.ndarray) -> int:
+    """Returns hash of a packed board, XOR of keys of its words."""
+    return int(np.bitwise_xor.reduce(word_keys(np.arange(words.size), words), initial=np.uint64(0)))
+
+
+def board_hash(board: np.ndarray) -> int:
+    """Returns hash of a board, XOR of keys of its 64-cell words."""
+    return words_hash(pack_words(board))
+
+
+class CycleDetector:
+    """
+    Detects repetition of boards of consecutive generations.
+
+    The hash of the board is maintained incrementally: words of 64 cells changed since the previous generation
+    replace their keys in it. The changed words are found from the cells changed by the step if the engine reports
+    them, otherwise by comparing the whole packed board with the previous one. Hashes of the last `window`
+    generations are kept, a board whose hash is among them repeats the generation it was seen in, so the boards
+    cycle with period of the generations' difference.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self.window = window
+        self.hash = 0
+        self.generation: Optional[int] = None
+        # packed board of the last generation
+        self._previous = np.zeros(0, dtype=np.uint64)
+        self._seen: Dict[int, int] = dict()
+        self._order: Deque[int] = deque()
+
+    def reset(self) -> None:
+        """Forgets all seen generations."""
+        self.generation = None
+        self._seen.clear()
+        self._order.clear()
+
+    def _replace(self, words: np.ndarray) -> None:
+        """Replaces keys of the words differing from the kept ones."""
+        changed = np.flatnonzero(words != self._previous)
+        self._rehash(changed, self._previous[changed], words[changed])
+        self._previous = words
+
+    def _flip(self, cells: np.ndarray) -> None:
+        """Flips the given cells of the kept words and replaces keys of their words."""
+        changed = np.unique(cells // 64)
+        before = self._previous[changed]
+        # cell i is bit 7 - i % 8 of byte i // 8, as packed by `pack_words`
+        np.bitwise_xor.at(self._previous.view(np.uint8), cells // 8, (128 >> (cells % 8)).astype(np.uint8))
+        self._rehash(changed, before, self._previous[changed])
+
+    def _rehash(self, indices: np.ndarray, before: np.ndarray, after: np.ndarray) -> None:
+        keys = word_keys(indices, before) ^ word_keys(indices, after)
+        self.hash ^= int(np.bitwise_xor.reduce(keys, initial=np.uint64(0)))
+
+    def update(
+        self, board: Optional[np.ndarray], generation: int, changes: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> Optional[int]:
+        """
+        Adds a generation, returns period of the cycle it closes, if any. Given the flat indices of the cells born
+        and died since the previous generation, only their words are updated and the board is not needed.
+        """
+        follows = self.generation is not None and generation == self.generation + 1
+        if follows and changes is not None:
+            self._flip(np.concatenate(changes))
+        elif board is None:
+            raise ValueError("Board is needed unless the cells changed since the previous generation are given.")
+        elif follows:
+            self._replace(pack_words(board))
+        else:
+            # not a continuation of the seen generations, start over
+            self.reset()
+            self._previous = pack_words(board)
+            self.hash = words_hash(self._previous)
+        self.generation = generation
+
+        seen = self._seen.get(self.hash)
+        if seen is not None:
+            return generation - seen
+        if len(self._order) >= self.window:
+            del self._seen[self._order.popleft()]
+        self._seen[self.hash] = generation
+        self._order.append(self.hash)
+        return None
+
+
+class Cycle:
+    """Generations repeating with the given period from the `start` generation on, cached bit-packed if captured."""
+
+    def __init__(self, start: int, period: int, shape: Tuple[int, int], cached: bool = True) -> None:
+        self.start = start
+        self.period = period
+        self.shape = shape
+        self.cached = cached
+        self._frames: List[np.ndarray] = []
+        self._populations: List[int] = []
+
+    def __str__(self) -> str:
+        if self.period == 1:
+            return f"still life since generation {self.start}"
+        return f"period {self.period} since generation {self.start}"
+
+    def __len__(self) -> int:
+        """Number of cached generations."""
+        return len(self._frames)
+
+    @property
+    def complete(self) -> bool:
+        """Whether all generations of the period are cached."""
+        return self.cached and len(self) == self.period
+
+    def add(self, board: np.ndarray) -> None:
+        """Caches the next generation of the period."""
+        self._frames.append(np.packbits(board != 0, axis=None))
+        self._populations.append(int(np.count_nonzero(board)))
+
+    def phase(self, generation: int) -> int:
+        return (generation - self.start) % self.period
+
+    def state(self, generation: int) -> np.ndarray:
+        """Returns board of the given generation (of the cached cycle)."""
+        size = self.shape[0] * self.shape[1]
+        frame = self._frames[self.phase(generation)]
+        return np.unpackbits(frame, count=size).reshape(self.shape).astype(BOARD_DTYPE, copy=False)
+
+    def population(self, generation: int) -> int:
+        return self._populations[self.phase(generation)]
@@ -0,0 +1,31 @@
+"""Engines computing next generations of cells."""
+from typing import Dict, Type
+
+from game_of_life.engines.base import BOARD_DTYPE, CONWAY, Engine, as_board
+from game_of_life.engines.bitpacked import BitPackedEngine
+from game_of_life.engines.buffered import BufferedEngine
+from game_of_life.engines.convolve import ConvolveEngine
+from game_of_life.engines.hashlife import HashLifeEngine
+from game_of_life.engines.lookup import LookupEngine, normalize_rule, parse_rule
+from game_of_life.engines.parallel import ParallelEngine
+from game_of_life.engines.sparse import SparseEngine
+from game_of_life.engines.tiled import TiledEngine
+
+ENGINES: Dict[str, Type[Engine]] = {
+    ConvolveEngine.name: ConvolveEngine,
+    BitPackedEngine.name: BitPackedEngine,
+    BufferedEngine.name: BufferedEngine,
+    HashLifeEngine.name: HashLifeEngine,
+    LookupEngine.name: LookupEngine,
+    ParallelEngine.name: ParallelEngine,
+    SparseEngine.name: SparseEngine,
+    TiledEngine.name: TiledEngine,
+}
+
+
+def get_engine(name: str) -> Type[Engine]:
+    """Returns engine class registered under the given name."""
+    try:
+        return ENGINES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown engine '{name}', choose one of: {', '.join(ENGINES)}.")
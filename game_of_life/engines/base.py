@@ -0,0 +1,144 @@
+"""Common interface of the engines computing next generations of cells."""
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+# dtype of boards exchanged with engines, renderers and GUI: C-contiguous array of zeros and ones
+BOARD_DTYPE = np.uint8
+# rulestring of Conway's Game of Life
+CONWAY = "B3/S23"
+
+
+def as_board(array: np.ndarray) -> np.ndarray:
+    """Returns the array as a board of the standard dtype and layout, copying it only if necessary."""
+    return np.ascontiguousarray(array, dtype=BOARD_DTYPE)
+
+
+def check_generations(generations: int) -> None:
+    """Raises ValueError if the number of generations to advance by is negative, generations only go forward."""
+    if generations < 0:
+        raise ValueError(f"Cannot advance by {generations} generations.")
+
+
+def board_changes(current: np.ndarray, previous: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns flat indices of the cells born and died between two boards."""
+    return np.flatnonzero(current > previous), np.flatnonzero(current < previous)
+
+
+def board_region(board: np.ndarray, top: int, left: int, height: int, width: int) -> np.ndarray:
+    """Returns the given rectangle of a board, cells outside of the board are dead."""
+    out = np.zeros((height, width), dtype=BOARD_DTYPE)
+    r0, r1 = max(top, 0), min(top + height, board.shape[0])
+    c0, c1 = max(left, 0), min(left + width, board.shape[1])
+    if r0 < r1 and c0 < c1:
+        out[r0 - top:r1 - top, c0 - left:c1 - left] = board[r0:r1, c0:c1]
+    return out
+
+
+def board_bounding_box(board: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """Returns (top, left, bottom, right) of the alive cells of a board with exclusive bottom and right, if any."""
+    rows, cols = np.nonzero(board)
+    if rows.size == 0:
+        return None
+    return int(rows.min()), int(cols.min()), int(rows.max()) + 1, int(cols.max()) + 1
+
+
+def next_window(window: np.ndarray) -> np.ndarray:
+    """Returns the next generation of the interior of a board window surrounded by a one-cell halo."""
+    neighbors = (
+        window[:-2, :-2] + window[:-2, 1:-1] + window[:-2, 2:]
+        + window[1:-1, :-2] + window[1:-1, 2:]
+        + window[2:, :-2] + window[2:, 1:-1] + window[2:, 2:]
+    )
+    alive = window[1:-1, 1:-1] == 1
+    return (neighbors == 3) | (alive & (neighbors == 2))
+
+
+class Engine:
+    """
+    Base class of all engines.
+
+    An engine owns the current generation of cells on a board of a given shape. The board is loaded from
+    and exported to a 2D uint8 array of zeros (dead cells) and ones (alive cells), whatever the internal
+    representation of the engine is.
+    """
+    name = "base"
+    # whether cells outside of the board keep evolving
+    unbounded = False
+    # rule computed by the engine
+    rule = CONWAY
+    _changes: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __init__(self, shape: Tuple[int, int]) -> None:
+        self.shape = shape
+        self.generation = 0
+
+    @classmethod
+    def estimate_bytes(cls, shape: Tuple[int, int]) -> int:
+        """Returns estimated size of the board storage for the given shape, 0 if it depends on the population."""
+        return shape[0] * shape[1] * np.dtype(BOARD_DTYPE).itemsize
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the board storage in bytes."""
+        return self.estimate_bytes(self.shape)
+
+    def load(self, array: np.ndarray) -> None:
+        """Sets the current generation of cells."""
+        raise NotImplementedError
+
+    def state(self) -> np.ndarray:
+        """Returns the current generation of cells as a 2D array."""
+        raise NotImplementedError
+
+    def snapshot(self) -> Any:
+        """Returns the current generation in a form taken back by `restore`, cells outside of the board included."""
+        return self.state()
+
+    def restore(self, snapshot: Any) -> None:
+        """Sets the current generation of cells from a `snapshot`."""
+        self.load(snapshot)
+
+    def edit(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> None:
+        """Sets cells at the given positions to the given values (the board is reloaded unless overridden)."""
+        board = self.state().copy()
+        board[rows, cols] = values
+        self.load(board)
+
+    def region(self, top: int, left: int, height: int, width: int) -> np.ndarray:
+        """Returns the given rectangle of the universe, cells outside of a bounded board are dead."""
+        return board_region(self.state(), top, left, height, width)
+
+    def bounding_box(self) -> Optional[Tuple[int, int, int, int]]:
+        """Returns (top, left, bottom, right) of the alive cells with exclusive bottom and right, if any."""
+        return board_bounding_box(self.state())
+
+    def dirty_regions(self) -> Optional[List[Tuple[int, int, int, int]]]:
+        """
+        Returns (top, left, bottom, right) of the board regions changed by the last step,
+        None if the whole board is to be considered changed.
+        """
+        return None
+
+    @property
+    def changes(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Flat indices of the cells born and died in the last step, None if unknown (e.g. after a load)."""
+        return self._changes
+
+    @property
+    def population(self) -> int:
+        """Number of alive cells."""
+        return int(np.count_nonzero(self.state()))
+
+    def close(self) -> None:
+        """Releases resources held by the engine."""
+
+    def step(self) -> None:
+        """Calculates the next generation of cells."""
+        raise NotImplementedError
+
+    def advance(self, generations: int) -> None:
+        """Calculates the given number of generations ahead."""
+        check_generations(generations)
+        for _ in range(generations):
+            self.step()
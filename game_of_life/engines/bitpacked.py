@@ -0,0 +1,138 @@
+"""Engine working on bit-packed boards."""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from game_of_life.engines.base import Engine
+from game_of_life.metrics import NEIGHBORS, RULES, metrics
+
+WORD_BITS = 64
+_ONE = np.uint64(1)
+_LAST_BIT = np.uint64(WORD_BITS - 1)
+
+
+def pack(array: np.ndarray, num_words: int) -> np.ndarray:
+    """Packs rows of a 2D array of zeros and ones into uint64 words, column j being bit j % 64 of word j // 64."""
+    packed = np.packbits(array.astype(bool), axis=1, bitorder="little")
+    padded = np.zeros((array.shape[0], num_words * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view("<u8").astype(np.uint64)
+
+
+def unpack(words: np.ndarray, width: int) -> np.ndarray:
+    """Inverse of `pack`, returns uint8 array with the given number of columns."""
+    as_bytes = np.ascontiguousarray(words, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, count=width, bitorder="little")
+
+
+def set_bits(words: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns rows and columns of the bits set in packed rows, only the non-zero words are unpacked."""
+    rows, cols = np.nonzero(words)
+    as_bytes = np.ascontiguousarray(words[rows, cols], dtype="<u8").view(np.uint8).reshape(-1, 8)
+    found, bits = np.nonzero(np.unpackbits(as_bytes, axis=1, bitorder="little"))
+    return rows[found], cols[found] * WORD_BITS + bits
+
+
+def full_adder(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Bitwise sum of three bit planes, returns (sum, carry)."""
+    a_xor_b = a ^ b
+    return a_xor_b ^ c, (a & b) | (c & a_xor_b)
+
+
+def half_adder(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Bitwise sum of two bit planes, returns (sum, carry)."""
+    return a ^ b, a & b
+
+
+class BitPackedEngine(Engine):
+    """
+    Engine storing 64 cells per uint64 word.
+
+    Neighbour counts are evaluated for all 64 cells of a word at once with bitwise full-adder logic (SWAR),
+    producing the count as four bit planes (ones, twos, fours, eights). The packed board is padded with
+    a dead row above and below, cells outside of the board are dead like in the reference engine.
+
+    Once `changes` are asked for, a back board is allocated: the next generation is then written to it and
+    the boards are swapped, keeping the previous generation to diff against. Until then the storage is single.
+    """
+    name = "bitpacked"
+
+    def __init__(self, shape: Tuple[int, int]) -> None:
+        super().__init__(shape)
+        height, width = shape
+        self.num_words = -(-width // WORD_BITS)
+        self.words = np.zeros((height + 2, self.num_words), dtype=np.uint64)
+        self.back: Optional[np.ndarray] = None
+        # whether the back board holds the previous generation
+        self._stepped = False
+
+        # mask of the bits in the last word that belong to the board
+        tail = width - (self.num_words - 1) * WORD_BITS
+        self.tail_mask = np.uint64((1 << tail) - 1) if tail < WORD_BITS else ~np.uint64(0)
+
+    @classmethod
+    def estimate_bytes(cls, shape: Tuple[int, int]) -> int:
+        return (shape[0] + 2) * -(-shape[1] // WORD_BITS) * 8
+
+    @property
+    def nbytes(self) -> int:
+        return self.words.nbytes + (0 if self.back is None else self.back.nbytes)
+
+    def load(self, array: np.ndarray) -> None:
+        self.words[1:-1] = pack(array, self.num_words)
+        self._stepped = False
+
+    def state(self) -> np.ndarray:
+        return unpack(self.words[1:-1], self.shape[1])
+
+    def count_planes(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Returns bit planes (ones, twos, fours, eights) of neighbour counts of all board cells."""
+        words = self.words
+
+        # west[.., j] holds the cell at column j - 1, east[.., j] the one at column j + 1
+        west = words << _ONE
+        west[:, 1:] |= words[:, :-1] >> _LAST_BIT
+        east = words >> _ONE
+        east[:, :-1] |= words[:, 1:] << _LAST_BIT
+
+        # horizontal sums of the rows above and below, pairs of neighbours in the same row
+        row_sum, row_carry = full_adder(west, words, east)
+        mid_sum, mid_carry = half_adder(west[1:-1], east[1:-1])
+
+        ones, carry = full_adder(row_sum[:-2], row_sum[2:], mid_sum)
+        twos, fours_a = full_adder(row_carry[:-2], row_carry[2:], mid_carry)
+        twos, fours_b = half_adder(twos, carry)
+        fours, eights = half_adder(fours_a, fours_b)
+        return ones, twos, fours, eights
+
+    def step(self) -> None:
+        alive = self.words[1:-1]
+        with metrics.timer(NEIGHBORS):
+            ones, twos, fours, eights = self.count_planes()
+
+        with metrics.timer(RULES):
+            # alive with two or three neighbours, or dead with exactly three neighbours
+            processed = twos & (ones | alive) & ~(fours | eights)
+            processed[:, -1] &= self.tail_mask
+            if self.back is None:
+                self.words[1:-1] = processed
+            else:
+                self.back[1:-1] = processed
+                self.words, self.back = self.back, self.words
+        self._stepped = self.back is not None
+        self.generation += 1
+
+    @property
+    def changes(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        # unpacked from the previous generation left in the back board only when asked
+        if self.back is None:
+            self.back = np.zeros_like(self.words)
+        if not self._stepped:
+            return None
+        alive, previous = self.words[1:-1], self.back[1:-1]
+        return self._flat(alive & ~previous), self._flat(previous & ~alive)
+
+    def _flat(self, words: np.ndarray) -> np.ndarray:
+        """Returns flat board indices of the cells set in packed rows."""
+        rows, cols = set_bits(words)
+        return rows * self.shape[1] + cols
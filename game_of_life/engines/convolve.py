@@ -0,0 +1,59 @@
+"""Reference engine based on 2D convolution."""
+from typing import Tuple
+
+import numpy as np
+
+from game_of_life.engines.base import BOARD_DTYPE, Engine, as_board
+from game_of_life.metrics import NEIGHBORS, RULES, metrics
+
+
+class ConvolveEngine(Engine):
+    """Engine counting cell neighbours by convolution of the board with a 3x3 kernel."""
+    name = "convolve"
+
+    def __init__(self, shape: Tuple[int, int]) -> None:
+        super().__init__(shape)
+        # SciPy takes longer to import than the rest of the package, it is loaded with the first engine
+        from scipy.signal import convolve2d
+        self.convolve2d = convolve2d
+        self.kernel = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], dtype=BOARD_DTYPE)
+        self.board = np.zeros(shape=shape, dtype=BOARD_DTYPE)
+
+    def load(self, array: np.ndarray) -> None:
+        self.board = as_board(array)
+        self._changes = None
+
+    def edit(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> None:
+        # the board may have been handed out by `state`, a new one is made
+        self.board = self.board.copy()
+        self.board[rows, cols] = values
+        self._changes = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.board.nbytes
+
+    def state(self) -> np.ndarray:
+        return self.board
+
+    def step(self) -> None:
+        to_process = self.board
+        processed = to_process.copy()
+
+        # calculate number of cell neighbours
+        with metrics.timer(NEIGHBORS):
+            neighbors = self.convolve2d(to_process, self.kernel, mode='same')
+
+        # apply rules of life
+        with metrics.timer(RULES):
+            should_die = (to_process == 1) & ((neighbors > 3) | (neighbors < 2))
+            should_live = (to_process == 0) & (neighbors == 3)
+            # indices of the changed cells are kept as a side output for statistics
+            born, died = np.flatnonzero(should_live), np.flatnonzero(should_die)
+            cells = processed.reshape(-1)
+            cells[born] = 1
+            cells[died] = 0
+
+        self.board = processed
+        self._changes = (born, died)
+        self.generation += 1
@@ -0,0 +1,303 @@
+"""HashLife engine based on a memoized quadtree."""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from game_of_life import config, logger
+from game_of_life.engines.base import BOARD_DTYPE, Engine, check_generations
+
+
+class Node:
+    """Canonical quadtree node of size 2^level x 2^level composed of four quadrants, single cells are `Leaf`s."""
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level: int, nw: "Node", ne: "Node", sw: "Node", se: "Node", population: int) -> None:
+        self.level = level
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.population = population
+
+
+class Leaf(Node):
+    """Single cell (level 0), it has no quadrants."""
+    __slots__ = ()
+
+    def __init__(self, population: int) -> None:
+        self.level = 0
+        self.population = population
+
+
+# rough size of a cached node including its key in the cache
+NODE_BYTES = 200
+
+DEAD = Leaf(0)
+ALIVE = Leaf(1)
+
+
+class HashLifeEngine(Engine):
+    """
+    Engine advancing the universe by 2^j generations in one call of the memoized quadtree successor.
+
+    Unlike the array engines, the universe is unbounded: patterns leaving the board keep evolving outside
+    of it and the board is only a window into the universe. Canonical nodes and memoized successors are
+    kept in a bounded cache, which is cleared whenever it grows over `max_nodes` entries.
+    """
+    name = "hashlife"
+    unbounded = True
+
+    def __init__(self, shape: Tuple[int, int], max_nodes: Optional[int] = None) -> None:
+        super().__init__(shape)
+        if max_nodes is None:
+            max_nodes = config.getint("APP", "HASHLIFE_MAX_NODES")
+        self.max_nodes = max_nodes
+        self.evictions = 0
+
+        self._nodes: Dict[Tuple[Node, Node, Node, Node], Node] = dict()
+        self._results: Dict[Tuple[Node, int], Node] = dict()
+        self._empty: List[Node] = [DEAD]
+
+        # root node and world coordinates of its top left corner
+        self.root = self._empty_node(3)
+        self.origin = (0, 0)
+
+    # quadtree construction
+
+    def _join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """Returns canonical node composed of the given quadrants."""
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            if len(self._nodes) + len(self._results) >= self.max_nodes:
+                self._evict()
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(nw.level + 1, nw, ne, sw, se, population)
+            self._nodes[key] = node
+        return node
+
+    def _evict(self) -> None:
+        """Clears the node cache. Nodes still referenced (e.g. the root) stay valid, only sharing is lost."""
+        self._nodes.clear()
+        self._results.clear()
+        self.evictions += 1
+        logger.debug(f"HashLife cache evicted ({self.evictions} evictions so far).")
+
+    def _empty_node(self, level: int) -> Node:
+        """Returns empty node of the given level."""
+        while len(self._empty) <= level:
+            smaller = self._empty[-1]
+            self._empty.append(Node(smaller.level + 1, smaller, smaller, smaller, smaller, 0))
+        return self._empty[level]
+
+    def _centre(self, node: Node) -> Node:
+        """Returns node of one level up with the given node in its centre."""
+        empty = self._empty_node(node.level - 1)
+        return self._join(
+            self._join(empty, empty, empty, node.nw),
+            self._join(empty, empty, node.ne, empty),
+            self._join(empty, node.sw, empty, empty),
+            self._join(node.se, empty, empty, empty),
+        )
+
+    def _inner(self, node: Node) -> Node:
+        """Returns the central quarter (two levels down) of the given node."""
+        return self._join(node.nw.se.se, node.ne.sw.sw, node.sw.ne.ne, node.se.nw.nw)
+
+    def _build(self, array: np.ndarray, level: int) -> Node:
+        """Builds node from a square array of side 2^level."""
+        if not array.any():
+            return self._empty_node(level)
+        if level == 0:
+            return ALIVE
+        half = 1 << (level - 1)
+        return self._join(
+            self._build(array[:half, :half], level - 1),
+            self._build(array[:half, half:], level - 1),
+            self._build(array[half:, :half], level - 1),
+            self._build(array[half:, half:], level - 1),
+        )
+
+    def _set(self, node: Node, rows: np.ndarray, cols: np.ndarray, alive: np.ndarray) -> Node:
+        """Returns the node with cells at the given positions within it set alive or dead."""
+        if rows.size == 0:
+            return node
+        if node.level == 0:
+            # the last value given for the cell wins
+            return ALIVE if alive[-1] else DEAD
+        half = 1 << (node.level - 1)
+        south, east = rows >= half, cols >= half
+        quadrants = []
+        children = ((node.nw, False, False), (node.ne, False, True), (node.sw, True, False), (node.se, True, True))
+        for child, in_south, in_east in children:
+            inside = (south == in_south) & (east == in_east)
+            quadrants.append(
+                self._set(child, rows[inside] - half * in_south, cols[inside] - half * in_east, alive[inside])
+            )
+        return self._join(*quadrants)
+
+    def _fill(self, node: Node, top: int, left: int, out: np.ndarray) -> None:
+        """Writes alive cells of a node placed at the given board position into the output array."""
+        size = 1 << node.level
+        height, width = out.shape
+        if node.population == 0 or top >= height or left >= width or top + size <= 0 or left + size <= 0:
+            return
+        if node.level == 0:
+            out[top, left] = 1
+            return
+        half = size >> 1
+        self._fill(node.nw, top, left, out)
+        self._fill(node.ne, top, left + half, out)
+        self._fill(node.sw, top + half, left, out)
+        self._fill(node.se, top + half, left + half, out)
+
+    def _bounds(self, node: Node, top: int, left: int) -> Tuple[int, int, int, int]:
+        """Returns bounding box of alive cells of a non-empty node placed at the given position."""
+        if node.level == 0:
+            return top, left, top + 1, left + 1
+        half = 1 << (node.level - 1)
+        quadrants = ((node.nw, 0, 0), (node.ne, 0, half), (node.sw, half, 0), (node.se, half, half))
+        boxes = [self._bounds(child, top + dr, left + dc) for child, dr, dc in quadrants if child.population]
+        return (
+            min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes),
+        )
+
+    # evolution
+
+    def _life_4x4(self, node: Node) -> Node:
+        """Returns the central 2x2 node of a 4x4 node one generation ahead."""
+        cells = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        alive = [[cell.population for cell in row] for row in cells]
+
+        def next_cell(i: int, j: int) -> Node:
+            neighbors = sum(alive[i + di][j + dj] for di in (-1, 0, 1) for dj in (-1, 0, 1)) - alive[i][j]
+            return ALIVE if neighbors == 3 or (alive[i][j] and neighbors == 2) else DEAD
+
+        return self._join(next_cell(1, 1), next_cell(1, 2), next_cell(2, 1), next_cell(2, 2))
+
+    def _successor(self, node: Node, j: int) -> Node:
+        """Returns the central half of a node (level >= 2) advanced by 2^j generations, j <= level - 2."""
+        if node.population == 0:
+            return node.nw
+
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        if node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            j = min(j, node.level - 2)
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            c1 = self._successor(self._join(nw.nw, nw.ne, nw.sw, nw.se), j)
+            c2 = self._successor(self._join(nw.ne, ne.nw, nw.se, ne.sw), j)
+            c3 = self._successor(self._join(ne.nw, ne.ne, ne.sw, ne.se), j)
+            c4 = self._successor(self._join(nw.sw, nw.se, sw.nw, sw.ne), j)
+            c5 = self._successor(self._join(nw.se, ne.sw, sw.ne, se.nw), j)
+            c6 = self._successor(self._join(ne.sw, ne.se, se.nw, se.ne), j)
+            c7 = self._successor(self._join(sw.nw, sw.ne, sw.sw, sw.se), j)
+            c8 = self._successor(self._join(sw.ne, se.nw, sw.se, se.sw), j)
+            c9 = self._successor(self._join(se.nw, se.ne, se.sw, se.se), j)
+
+            if j < node.level - 2:
+                # the nine subresults are already advanced by 2^j, only their centres are composed
+                result = self._join(
+                    self._join(c1.se, c2.sw, c4.ne, c5.nw),
+                    self._join(c2.se, c3.sw, c5.ne, c6.nw),
+                    self._join(c4.se, c5.sw, c7.ne, c8.nw),
+                    self._join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                # the nine subresults are advanced by 2^(level - 3), the second half is done here
+                result = self._join(
+                    self._successor(self._join(c1, c2, c4, c5), j),
+                    self._successor(self._join(c2, c3, c5, c6), j),
+                    self._successor(self._join(c4, c5, c7, c8), j),
+                    self._successor(self._join(c5, c6, c8, c9), j),
+                )
+
+        self._results[key] = result
+        return result
+
+    def _jump(self, j: int) -> None:
+        """Advances the universe by 2^j generations."""
+        root, (top, left) = self.root, self.origin
+        while root.level < j + 3 or root.population != self._inner(root).population:
+            offset = 1 << (root.level - 1)
+            root, top, left = self._centre(root), top - offset, left - offset
+
+        offset = 1 << (root.level - 2)
+        self.root, self.origin = self._successor(root, j), (top + offset, left + offset)
+
+    # engine interface
+
+    @classmethod
+    def estimate_bytes(cls, shape: Tuple[int, int]) -> int:
+        return 0
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated size of the node cache."""
+        return (len(self._nodes) + len(self._results)) * NODE_BYTES
+
+    def load(self, array: np.ndarray) -> None:
+        level = max(3, int(np.ceil(np.log2(max(array.shape)))))
+        side = 1 << level
+        square = np.zeros((side, side), dtype=bool)
+        square[:array.shape[0], :array.shape[1]] = array
+        self.root = self._build(square, level)
+        self.origin = (0, 0)
+
+    def snapshot(self) -> Any:
+        # nodes are immutable, the root stays valid after the cache is evicted
+        return self.root, self.origin
+
+    def restore(self, snapshot: Any) -> None:
+        self.root, self.origin = snapshot
+
+    def edit(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> None:
+        rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+        if rows.size == 0:
+            return
+        root, (top, left) = self.root, self.origin
+        # the root grows around its centre until it contains all the cells
+        while (
+            rows.min() < top or cols.min() < left
+            or rows.max() >= top + (1 << root.level) or cols.max() >= left + (1 << root.level)
+        ):
+            offset = 1 << (root.level - 1)
+            root, top, left = self._centre(root), top - offset, left - offset
+        self.root, self.origin = self._set(root, rows - top, cols - left, np.asarray(values) != 0), (top, left)
+
+    def state(self) -> np.ndarray:
+        return self.region(0, 0, *self.shape)
+
+    def region(self, top: int, left: int, height: int, width: int) -> np.ndarray:
+        out = np.zeros((height, width), dtype=BOARD_DTYPE)
+        self._fill(self.root, self.origin[0] - top, self.origin[1] - left, out)
+        return out
+
+    def bounding_box(self) -> Optional[Tuple[int, int, int, int]]:
+        if self.root.population == 0:
+            return None
+        return self._bounds(self.root, *self.origin)
+
+    def step(self) -> None:
+        self.advance(1)
+
+    def advance(self, generations: int) -> None:
+        check_generations(generations)
+        j = 0
+        while generations >> j:
+            if (generations >> j) & 1:
+                self._jump(j)
+            j += 1
+        self.generation += generations
+
+    @property
+    def population(self) -> int:
+        return self.root.population
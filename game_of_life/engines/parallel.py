@@ -0,0 +1,114 @@
+"""Engine stepping horizontal strips of the board in a pool of processes."""
+import multiprocessing
+import os
+import weakref
+from multiprocessing.pool import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from game_of_life import config, logger
+from game_of_life.engines.base import BOARD_DTYPE, Engine, board_changes, next_window
+
+# shared front and back buffers as seen by a worker process
+_buffers: List[np.ndarray] = []
+_memory: List[SharedMemory] = []
+
+
+def _attach(names: List[str], shape: Tuple[int, int]) -> None:
+    """Initializes worker process by mapping the shared buffers."""
+    for name in names:
+        memory = SharedMemory(name=name)
+        _memory.append(memory)
+        _buffers.append(np.ndarray(shape, dtype=BOARD_DTYPE, buffer=memory.buf))
+
+
+def _step_strip(task: Tuple[int, int, int]) -> None:
+    """Computes next generation of board rows top..bottom from the source buffer into the other one."""
+    source, top, bottom = task
+    # board row i is row i + 1 of the padded buffers, the rows next to the strip form its halo
+    _buffers[1 - source][top + 1:bottom + 1, 1:-1] = next_window(_buffers[source][top:bottom + 2])
+
+
+def _release(pool: Pool, memory: List[SharedMemory]) -> None:
+    """Stops the pool and frees the shared buffers."""
+    pool.terminate()
+    pool.join()
+    for block in memory:
+        block.unlink()
+        try:
+            block.close()
+        except BufferError:
+            # arrays of a dying engine may still be mapped, the mapping goes away with them
+            pass
+
+
+class ParallelEngine(Engine):
+    """
+    Engine splitting the board into horizontal strips stepped in parallel by a pool of processes.
+
+    The board is double-buffered in two blocks of shared memory padded with a dead border. Each worker
+    reads its strip together with the one-row halo of its neighbours from the front buffer and writes the next
+    generation of the strip to the back buffer, then the buffers are swapped. Nothing but the strip bounds
+    crosses the process boundary.
+    """
+    name = "parallel"
+
+    def __init__(self, shape: Tuple[int, int], workers: Optional[int] = None) -> None:
+        super().__init__(shape)
+        if workers is None:
+            workers = config.getint("APP", "WORKERS")
+        self.workers = workers or os.cpu_count() or 1
+
+        height, width = shape
+        padded_shape = (height + 2, width + 2)
+        size = int(np.prod(padded_shape))
+        self._memory = [SharedMemory(create=True, size=size) for _ in range(2)]
+        self._buffers = [np.ndarray(padded_shape, dtype=BOARD_DTYPE, buffer=block.buf) for block in self._memory]
+        for buffer in self._buffers:
+            buffer.fill(0)
+        self.front = 0
+        # whether the back buffer holds the previous generation
+        self._stepped = False
+
+        bounds = np.linspace(0, height, min(self.workers, height) + 1).astype(int)
+        self.strips = [(int(top), int(bottom)) for top, bottom in zip(bounds[:-1], bounds[1:])]
+
+        context = multiprocessing.get_context("spawn")
+        names = [block.name for block in self._memory]
+        self._pool = context.Pool(len(self.strips), initializer=_attach, initargs=(names, padded_shape))
+        self._finalizer = weakref.finalize(self, _release, self._pool, self._memory)
+        logger.info(f"Parallel engine started {len(self.strips)} workers.")
+
+    @classmethod
+    def estimate_bytes(cls, shape: Tuple[int, int]) -> int:
+        return 2 * (shape[0] + 2) * (shape[1] + 2)
+
+    @property
+    def board(self) -> np.ndarray:
+        """Current generation (a view into the front buffer)."""
+        return self._buffers[self.front][1:-1, 1:-1]
+
+    def load(self, array: np.ndarray) -> None:
+        self.board[...] = array
+        self._stepped = False
+
+    def state(self) -> np.ndarray:
+        return self.board.copy()
+
+    def step(self) -> None:
+        self._pool.map(_step_strip, [(self.front, top, bottom) for top, bottom in self.strips])
+        self.front = 1 - self.front
+        self._stepped = True
+        self.generation += 1
+
+    @property
+    def changes(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if not self._stepped:
+            return None
+        return board_changes(self.board, self._buffers[1 - self.front][1:-1, 1:-1])
+
+    def close(self) -> None:
+        self._buffers = []
+        self._finalizer()
@@ -0,0 +1,99 @@
+"""Engine recomputing only the active tiles of the board."""
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from game_of_life import config
+from game_of_life.engines.base import BOARD_DTYPE, Engine, next_window
+
+
+class TiledEngine(Engine):
+    """
+    Engine splitting the board into square tiles and tracking which of them changed in the last generation.
+
+    Only the changed tiles and their neighbours can change in the next generation, so only those are
+    recomputed while the rest of the board (still lifes, empty space) is left untouched. The changed tiles
+    of the last generation are exposed as `dirty_tiles`, so that renderers can redraw just them.
+    """
+    name = "tiled"
+
+    def __init__(self, shape: Tuple[int, int], tile_size: Optional[int] = None) -> None:
+        super().__init__(shape)
+        if tile_size is None:
+            tile_size = config.getint("APP", "TILE_SIZE")
+        self.tile_size = tile_size
+
+        # board with a dead border, so that each tile can be processed with its one-cell halo
+        height, width = shape
+        self.padded = np.zeros((height + 2, width + 2), dtype=BOARD_DTYPE)
+        self.board = self.padded[1:-1, 1:-1]
+
+        tiles_shape = (-(-height // tile_size), -(-width // tile_size))
+        self.active = np.ones(tiles_shape, dtype=bool)
+        self.dirty = np.ones(tiles_shape, dtype=bool)
+        self._all_dirty = True
+
+    @classmethod
+    def estimate_bytes(cls, shape: Tuple[int, int]) -> int:
+        return (shape[0] + 2) * (shape[1] + 2)
+
+    @property
+    def nbytes(self) -> int:
+        return self.padded.nbytes + self.active.nbytes + self.dirty.nbytes
+
+    def load(self, array: np.ndarray) -> None:
+        self.board[...] = array
+        self.active[...] = True
+        self.dirty[...] = True
+        self._all_dirty = True
+        self._changes = None
+
+    def state(self) -> np.ndarray:
+        return self.board.copy()
+
+    def _tile_bounds(self, ty: int, tx: int) -> Tuple[int, int, int, int]:
+        """Returns (top, left, bottom, right) of the tile on the board."""
+        top, left = ty * self.tile_size, tx * self.tile_size
+        return top, left, min(top + self.tile_size, self.shape[0]), min(left + self.tile_size, self.shape[1])
+
+    def step(self) -> None:
+        # all tiles are computed from the current generation before any of them is written back
+        updates = []
+        for ty, tx in np.argwhere(self.active).tolist():
+            top, left, bottom, right = self._tile_bounds(ty, tx)
+            processed = next_window(self.padded[top:bottom + 2, left:right + 2])
+            if not np.array_equal(processed, self.board[top:bottom, left:right]):
+                updates.append((ty, tx, processed))
+
+        self.dirty[...] = False
+        born, died = [np.zeros(0, dtype=np.intp)], [np.zeros(0, dtype=np.intp)]
+        for ty, tx, processed in updates:
+            top, left, bottom, right = self._tile_bounds(ty, tx)
+            tile = self.board[top:bottom, left:right]
+            for changed, cells in ((born, processed > tile), (died, processed < tile)):
+                rows, cols = np.nonzero(cells)
+                changed.append((rows + top) * self.shape[1] + cols + left)
+            tile[...] = processed
+            self.dirty[ty, tx] = True
+        self._changes = (np.concatenate(born), np.concatenate(died))
+
+        # changed tiles and their neighbours are to be recomputed next time
+        padded = np.pad(self.dirty, 1)
+        tiles_height, tiles_width = self.dirty.shape
+        self.active[...] = False
+        for dy in range(3):
+            for dx in range(3):
+                self.active |= padded[dy:dy + tiles_height, dx:dx + tiles_width]
+
+        self._all_dirty = False
+        self.generation += 1
+
+    @property
+    def dirty_tiles(self) -> Set[Tuple[int, int]]:
+        """Tiles (row, column) changed in the last generation."""
+        return {(int(ty), int(tx)) for ty, tx in zip(*np.nonzero(self.dirty))}
+
+    def dirty_regions(self) -> Optional[List[Tuple[int, int, int, int]]]:
+        if self._all_dirty:
+            return None
+        return [self._tile_bounds(ty, tx) for ty, tx in np.argwhere(self.dirty).tolist()]
@@ -0,0 +1,104 @@
+"""Ensembles of independent boards evolved together as a single 3D stack, for statistics over initial states."""
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from game_of_life import config
+from game_of_life.cycles import word_keys
+from game_of_life.engines import BOARD_DTYPE
+from game_of_life.engines.lookup import normalize_rule, rule_table, step_padded
+
+
+def board_hashes(boards: np.ndarray) -> np.ndarray:
+    """Returns hashes of a stack of boards, one per board (see `cycles.board_hash`)."""
+    packed = np.packbits(boards.reshape(len(boards), -1) != 0, axis=1)
+    padding = -packed.shape[1] % 8
+    if padding:
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+    words = packed.view(np.uint64)
+    return np.bitwise_xor.reduce(word_keys(np.arange(words.shape[1]), words), axis=1)
+
+
+class Ensemble:
+    """
+    Stack of `count` independent boards of the given shape, all stepped in a single vectorized pass
+    by the lookup table of the rule (see `LookupEngine`).
+
+    For every board the ensemble tracks its population, the generation it died out in (-1 while alive)
+    and when it settled: the generation from which it repeats with a period of up to `max_period`
+    generations (-1 while unsettled), extinct boards settle as still lifes.
+    """
+
+    def __init__(
+        self, count: int, shape: Tuple[int, int], rule: Optional[str] = None, max_period: Optional[int] = None
+    ) -> None:
+        self.count = count
+        self.shape = shape
+        self.rule = normalize_rule(rule or config["APP"]["RULE"])
+        self.table = rule_table(self.rule)
+        self.max_period = max_period or config.getint("APP", "CYCLE_MAX_PERIOD")
+        self.generation = 0
+
+        # boards surrounded by halos of dead cells, and buffer of the lookup indices
+        self.padded = np.zeros((count, shape[0] + 2, shape[1] + 2), dtype=BOARD_DTYPE)
+        self.boards = self.padded[:, 1:-1, 1:-1]
+        self.index = np.zeros((count,) + tuple(shape), dtype=BOARD_DTYPE)
+
+        self.population = np.zeros(count, dtype=np.int64)
+        self.extinction = np.full(count, -1, dtype=np.int64)
+        self.settled = np.full(count, -1, dtype=np.int64)
+        self.period = np.zeros(count, dtype=np.int64)
+        # hashes of the last `max_period` generations, generation g in row g % max_period
+        self._hashes = np.zeros((self.max_period, count), dtype=np.uint64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.padded.nbytes + self.index.nbytes + self._hashes.nbytes
+
+    def load(self, boards: np.ndarray) -> None:
+        """Sets the initial generation of all boards from a (count, height, width) array."""
+        self.boards[...] = boards
+        self.generation = 0
+        self.extinction[:] = -1
+        self.settled[:] = -1
+        self.period[:] = 0
+        self._update()
+
+    def randomize(self, density: Union[float, np.ndarray] = 0.5, seed: Optional[int] = None) -> None:
+        """Sets random initial boards with the given density of alive cells (a single one or one per board)."""
+        density = np.broadcast_to(np.asarray(density, dtype=float), (self.count,))
+        random = np.random.default_rng(seed).random((self.count,) + tuple(self.shape))
+        self.load(random < density[:, np.newaxis, np.newaxis])
+
+    def step(self) -> None:
+        step_padded(self.padded, self.index, self.table)
+        self.generation += 1
+        self._update()
+
+    def run(self, generations: int) -> None:
+        """Steps the boards the given number of generations or until all of them settle."""
+        for _ in range(generations):
+            if self.all_settled:
+                break
+            self.step()
+
+    @property
+    def all_settled(self) -> bool:
+        return bool((self.settled >= 0).all())
+
+    def _update(self) -> None:
+        """Updates statistics of the boards with the current generation."""
+        generation = self.generation
+        self.population[:] = np.count_nonzero(self.boards, axis=(1, 2))
+        died = (self.population == 0) & (self.extinction < 0)
+        self.extinction[died] = generation
+
+        # a board repeating one of the last generations settled into a cycle of their difference
+        hashes = board_hashes(self.boards)
+        periods = np.arange(1, min(generation, self.max_period) + 1)
+        if periods.size:
+            repeated = self._hashes[(generation - periods) % self.max_period] == hashes
+            found = repeated.any(axis=0) & (self.settled < 0)
+            self.period[found] = repeated.argmax(axis=0)[found] + 1
+            self.settled[found] = generation - self.period[found]
+        self._hashes[generation % self.max_period] = hashes
@@ -10,6 +10,8 @@ import time
 import webbrowser
 
 from game_of_life import package_dir, config, config_path, default_config, project
+from game_of_life.engines import parse_rule
+from game_of_life.rendering import Viewport
 
 
 class MenuBar(tk.Menu):
@@ -20,6 +22,8 @@ class MenuBar(tk.Menu):
         self.file_menu = tk.Menu(self, tearoff=0)
         self.add_cascade(label="File", menu=self.file_menu)
         self.file_menu.add_command(label="Restart (R)")
+        self.file_menu.add_command(label="Open pattern... (O)")
+        self.file_menu.add_command(label="Save pattern... (W)")
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Quit (Q)", command=self.exit_command)
 
@@ -92,6 +96,9 @@ class SettingsWindow(tk.Toplevel):
         # FPS
         settings["fps"] = Option(game_settings, config_item=("APP", "MAX_FPS"), label="Maximum FPS", validation_fn=int)
         settings["fps"].grid(row=2, column=0, sticky=tk.EW)
+        # Rule
+        settings["rule"] = Option(game_settings, config_item=("APP", "RULE"), label="Rule (B/S rulestring)", validation_fn=parse_rule)
+        settings["rule"].grid(row=3, column=0, sticky=tk.EW)
 
         # Graphics settings
         graphics = ttk.LabelFrame(self, text="Graphics")
@@ -186,6 +193,62 @@ class AboutWindow(tk.Toplevel):
         return info_text
 
 
+class StatsWindow(tk.Toplevel):
+    """Window plotting population, births and deaths of the last generations along with the activity heatmap."""
+    PLOT_WIDTH = 360
+    PLOT_HEIGHT = 160
+    HEATMAP_SIZE = 160
+
+    def __init__(self, master: tk.Misc, on_close: Callable[[], None]):
+        super().__init__(master)
+        self.title("Statistics")
+        self.resizable(False, False)
+        self.protocol("WM_DELETE_WINDOW", on_close)
+
+        self.summary = ttk.Label(self, font="TkFixedFont", justify=tk.LEFT)
+        self.summary.grid(row=0, column=0, columnspan=2, padx=10, pady=5, sticky=tk.W)
+        self.plot = tk.Canvas(self, width=self.PLOT_WIDTH, height=self.PLOT_HEIGHT, background="white")
+        self.plot.grid(row=1, column=0, padx=10, pady=10)
+        self.heatmap = tk.Label(self)
+        self.heatmap.grid(row=1, column=1, padx=10, pady=10)
+        self.heatmap_img: Optional[ImageTk.PhotoImage] = None
+
+    def _line(self, generations: np.ndarray, values: np.ndarray, top: float, color: str) -> None:
+        """Draws values as a line scaled so that `top` is at the top of the plot."""
+        if generations.size < 2:
+            return
+        span = max(generations[-1] - generations[0], 1)
+        x = (generations - generations[0]) * (self.PLOT_WIDTH - 1) / span
+        y = (self.PLOT_HEIGHT - 1) * (1 - values / max(top, 1))
+        self.plot.create_line(*np.column_stack((x, y)).ravel().tolist(), fill=color, tag="line")
+
+    def show(self, snapshot: Any) -> None:
+        """Shows statistics snapshot."""
+        box = "-" if snapshot.bounding_box is None else "x".join(
+            str(end - start) for start, end in zip(snapshot.bounding_box[:2], snapshot.bounding_box[2:])
+        )
+        self.summary.configure(
+            text=f"generation {snapshot.generation}   population {snapshot.population}   "
+                 f"births {snapshot.births}   deaths {snapshot.deaths}   bounding box {box}"
+        )
+
+        self.plot.delete("line")
+        generations, population, births, deaths = snapshot.history.T
+        self._line(generations, population, population.max(initial=0), "black")
+        changes = max(births.max(initial=0), deaths.max(initial=0))
+        self._line(generations, births, changes, "green")
+        self._line(generations, deaths, changes, "red")
+
+        heat = snapshot.heatmap
+        scaled = (255 * np.clip(heat / max(float(heat.max(initial=0)), 1e-6), 0, 1)).astype(np.uint8)
+        # nearest neighbour upscaling
+        rows = np.arange(self.HEATMAP_SIZE) * scaled.shape[0] // self.HEATMAP_SIZE
+        cols = np.arange(self.HEATMAP_SIZE) * scaled.shape[1] // self.HEATMAP_SIZE
+        image = Image.fromarray(np.ascontiguousarray(scaled[np.ix_(rows, cols)]))
+        self.heatmap_img = ImageTk.PhotoImage(image)
+        self.heatmap.configure(image=self.heatmap_img)
+
+
 class Option(tk.Frame):
     """Option as a pair composed of a label and an entry."""
     def __init__(self, master: tk.Misc, config_item: tuple, label: str, validation_fn: Optional[Callable] = None) -> None:
@@ -246,25 +309,12 @@ class Grid(tk.Canvas):
         self.num_units = num_units
         self.unit_size = dim / num_units
         self.dim = dim
-        self.background = np.dstack([
-            np.ones((self.num_units, self.num_units)),
-            np.ones((self.num_units, self.num_units)),
-            np.ones((self.num_units, self.num_units))
-        ]) * background_color
-        self.foreground = np.dstack([
-            np.ones((self.num_units, self.num_units)),
-            np.ones((self.num_units, self.num_units)),
-            np.ones((self.num_units, self.num_units))
-        ]) * foreground_color
+        self.background_color = background_color
+        self.foreground_color = foreground_color
         self.cells = self.create_image(0, 0, anchor=tk.NW, image=None, tag="cells")
         self.cell_img = None
-
-    def draw_grid(self) -> None:
-        self.delete('grid')
-        for unit in range(self.num_units):
-            pos = unit * self.unit_size
-            self.create_line(0, pos, self.dim, pos, fill=self.edge_color, tag="grid")
-            self.create_line(pos, 0, pos, self.dim, fill=self.edge_color, tag="grid")
+        # shown window of the board, grid lines are drawn into the cell images
+        self.viewport = Viewport((num_units, num_units), dim)
 
     def draw_array(self, cell_array: np.ndarray) -> None:
         image = Image.fromarray(255 * (1 - cell_array.astype(np.uint8)))
@@ -278,9 +328,19 @@ class Grid(tk.Canvas):
         self.tag_lower("cells")
 
     def coords_to_grid_position(self, x: int, y: int) -> Tuple[int, int]:
-        i = int(y // self.unit_size)
-        j = int(x // self.unit_size)
-        return i, j
+        return self.viewport.cell_at(x, y)
+
+    def show_overlay(self, text: str) -> None:
+        """Shows text in a box over the top left corner of the cells."""
+        self.hide_overlay()
+        text_item = self.create_text(
+            8, 8, anchor=tk.NW, text=text, font=("TkFixedFont", 9), fill="white", tags="overlay"
+        )
+        self.create_rectangle(*self.bbox(text_item), fill="black", stipple="gray75", outline="", tags="overlay")
+        self.tag_raise(text_item)
+
+    def hide_overlay(self) -> None:
+        self.delete("overlay")
 
 
 
@@ -297,9 +357,11 @@ class GameOfLifeGUI:
         self.widgets = self._init_widgets()
 
         # canvas update related params
-        self.cells: tk.PhotoImage
+        self.cells: ImageTk.PhotoImage
         self.last_time: float
         self.current_time = time.perf_counter()
+        self.generation: Optional[int] = None
+        self.status: Optional[str] = None
 
         logger.info("GUI initialized ...")
 
@@ -319,19 +381,32 @@ class GameOfLifeGUI:
             edge_color=config.get("GRID", "EDGE_COLOR"),
             highlightthickness=0
         )
-        widgets["grid"].draw_grid()
         widgets["grid"].pack()
 
         return widgets
 
-    def _show_fps(self) -> None:
+    def _show_fps(self, generation: Optional[int] = None) -> None:
+        """Shows display FPS and, if generations are known, simulation speed in the title bar."""
         self.last_time = self.current_time
         self.current_time = time.perf_counter()
         elapsed = self.current_time - self.last_time
-        self.master.title(f"Game of Life ({int(1 / elapsed)} FPS)")
-
-    def show_cells(self, cells: tk.PhotoImage) -> None:
+        title = f"Game of Life ({int(1 / elapsed)} FPS"
+        if generation is not None and self.generation is not None and generation > self.generation:
+            title += f", {int((generation - self.generation) / elapsed)} gen/s"
+        self.generation = generation
+        if self.status:
+            title += f", {self.status}"
+        self.master.title(title + ")")
+
+    def paint_cells(self, cells: ImageTk.PhotoImage, position: Tuple[int, int]) -> None:
+        """Paints image of a part of the cells over the shown cells at the given pixel position."""
+        self.master.tk.call(str(self.cells), "copy", str(cells), "-to", *position)
+
+    def show_cells(
+        self, cells: ImageTk.PhotoImage, generation: Optional[int] = None, status: Optional[str] = None
+    ) -> None:
         """Handle all cell images currently in the queue, if any."""
-        self._show_fps()
+        self.status = status
+        self._show_fps(generation)
         self.cells = cells
         self.widgets["grid"].draw_img(self.cells)
@@ -0,0 +1,158 @@
+"""Compressed generation history: recording of generations to an append-only file and random-access replay."""
+import bisect
+import struct
+import zlib
+from typing import BinaryIO, List, Optional, Tuple
+
+import numpy as np
+
+from game_of_life.engines import BOARD_DTYPE
+
+MAGIC = b"GOLH"
+# file header: magic, format version, board height and width
+HEADER = struct.Struct("<4sHII")
+VERSION = 1
+# record header: generation, kind of the record, length of the compressed payload
+RECORD = struct.Struct("<qcI")
+KEYFRAME = b"K"
+DELTA = b"D"
+COMPRESSION_LEVEL = 1
+
+
+def encode_delta(delta: np.ndarray) -> bytes:
+    """Encodes changed bytes of a delta as gaps between their positions followed by their values."""
+    positions = np.flatnonzero(delta)
+    gaps = np.diff(positions, prepend=0).astype(np.uint32)
+    return gaps.tobytes() + delta[positions].tobytes()
+
+
+def apply_delta(packed: np.ndarray, data: bytes) -> None:
+    """Applies encoded delta to a bit-packed board in place."""
+    changed = len(data) // 5
+    positions = np.cumsum(np.frombuffer(data, dtype=np.uint32, count=changed), dtype=np.int64)
+    packed[positions] ^= np.frombuffer(data, dtype=np.uint8, offset=changed * 4)
+
+
+class HistoryWriter:
+    """
+    Appends generations of a board to a history file.
+
+    Every generation is stored as XOR delta of the bit-packed board against the previously recorded one, only
+    its non-zero bytes with gaps between them are compressed by zlib, so a record takes space proportional
+    to the number of changed cells rather than to the board size.
+    Every `keyframe_interval`-th record is a full (compressed) generation, replay starts from the nearest one.
+    Generations of the records never decrease, going back to an earlier generation `truncate`s the history.
+    """
+
+    def __init__(self, path: str, shape: Tuple[int, int], keyframe_interval: int = 256) -> None:
+        self.path = path
+        self.shape = shape
+        self.keyframe_interval = keyframe_interval
+        self.records = 0
+        self._previous: Optional[np.ndarray] = None
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, *shape))
+        self._file.flush()
+
+    def append(self, generation: int, board: np.ndarray, keyframe: bool = False) -> None:
+        """Records a generation, as a keyframe if requested or due."""
+        packed = np.packbits(board != 0, axis=None)
+        if keyframe or self._previous is None or self.records % self.keyframe_interval == 0:
+            kind, payload = KEYFRAME, packed.tobytes()
+        else:
+            kind, payload = DELTA, encode_delta(np.bitwise_xor(packed, self._previous))
+        self._previous = packed
+
+        data = zlib.compress(payload, COMPRESSION_LEVEL)
+        # a whole record is written at once, so that readers of the growing file see complete records only
+        self._file.write(RECORD.pack(generation, kind, len(data)) + data)
+        self._file.flush()
+        self.records += 1
+
+    def truncate(self, generation: int) -> None:
+        """Drops the records of generations after the given one, the next record is a keyframe."""
+        reader = HistoryReader(self.path)
+        try:
+            index = bisect.bisect_right(reader.generations, generation)
+            if index == len(reader):
+                return
+            end = reader._offsets[index] - RECORD.size
+        finally:
+            reader.close()
+        self._file.seek(end)
+        self._file.truncate()
+        self._file.flush()
+        self.records = index
+        self._previous = None
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class HistoryReader:
+    """Random access to generations of a history file, which may still be growing."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: BinaryIO = open(path, "rb")
+        magic, version, height, width = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a history file.")
+        self.shape = (height, width)
+
+        # generations, kinds and payload offsets of the records
+        self.generations: List[int] = []
+        self._kinds: List[bytes] = []
+        self._offsets: List[int] = []
+        self._end = HEADER.size
+        # the last rebuilt record, so that replay forward applies a single delta per record
+        self._cached: Optional[Tuple[int, np.ndarray]] = None
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.generations)
+
+    def refresh(self) -> None:
+        """Indexes records appended since the last refresh, only their headers are read."""
+        size = self._file.seek(0, 2)
+        while self._end + RECORD.size <= size:
+            self._file.seek(self._end)
+            generation, kind, length = RECORD.unpack(self._file.read(RECORD.size))
+            if self._end + RECORD.size + length > size:
+                break
+            self.generations.append(generation)
+            self._kinds.append(kind)
+            self._offsets.append(self._end + RECORD.size)
+            self._end += RECORD.size + length
+
+    def _payload(self, index: int) -> bytes:
+        start = self._offsets[index]
+        stop = self._end if index + 1 == len(self) else self._offsets[index + 1] - RECORD.size
+        self._file.seek(start)
+        return zlib.decompress(self._file.read(stop - start))
+
+    def seek(self, index: int) -> np.ndarray:
+        """Returns the board of the given record, rebuilt from the nearest keyframe (or the last rebuilt record)."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Record {index} not in history of {len(self)} records.")
+
+        start = index
+        while self._kinds[start] != KEYFRAME:
+            start -= 1
+        if self._cached is not None and start <= self._cached[0] <= index:
+            start, packed = self._cached
+        else:
+            packed = np.frombuffer(self._payload(start), dtype=np.uint8).copy()
+        for i in range(start + 1, index + 1):
+            apply_delta(packed, self._payload(i))
+        self._cached = (index, packed)
+
+        size = self.shape[0] * self.shape[1]
+        return np.unpackbits(packed, count=size).reshape(self.shape).astype(BOARD_DTYPE, copy=False)
+
+    def find(self, generation: int) -> int:
+        """Returns index of the last record of the given generation (or of the closest earlier one recorded)."""
+        return max(bisect.bisect_right(self.generations, generation) - 1, 0)
+
+    def close(self) -> None:
+        self._file.close()
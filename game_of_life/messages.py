@@ -0,0 +1,22 @@
+"""Control messages of the workers computing generations."""
+from typing import Any
+
+
+class Message:
+    """Message objects to be send to Processor thread via message queue (or to worker process via pipe)."""
+    CLEAN_INIT = "CLEAN_INIT"
+    RANDOM_INIT = "RANDOM_INIT"
+    PAUSE = "PAUSE"
+    RESUME = "RESUME"
+    STEP = "STEP"
+    IMG_UPDATE = "IMG_UPDATE"
+    FAST_FORWARD = "FAST_FORWARD"
+    TURBO = "TURBO"
+    LOAD_PATTERN = "LOAD_PATTERN"
+    VIEW = "VIEW"
+    EDIT_CELLS = "EDIT_CELLS"
+    STATS = "STATS"
+
+    def __init__(self, type: object, content: Any = None):
+        self.type = type
+        self.content = content
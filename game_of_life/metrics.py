@@ -0,0 +1,156 @@
+"""Low-overhead timing of the stages of the pipeline: rolling histograms, text report and Chrome trace."""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Deque, Dict, Tuple
+
+import numpy as np
+
+from game_of_life import config
+
+# stages of the pipeline
+NEIGHBORS = "neighbor count"
+RULES = "rule application"
+STEP = "step"
+RESIZE = "resize"
+PHOTOIMAGE = "colorize + PhotoImage"
+QUEUE_WAIT = "queue wait"
+CANVAS = "canvas update"
+STAGES = (NEIGHBORS, RULES, STEP, RESIZE, PHOTOIMAGE, QUEUE_WAIT, CANVAS)
+
+# upper edges of histogram bins in seconds (log-spaced from 10 us to 1 s)
+BIN_EDGES = np.logspace(-5, 0, 11)
+SPARK = " ▁▂▃▄▅▆▇█"
+
+
+class Histogram:
+    """Rolling window of the last durations of a stage."""
+
+    def __init__(self, window: int) -> None:
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        """Returns mean, median, 90th and 99th percentile and maximum of the window (in seconds)."""
+        samples = np.array(list(self.samples))
+        p50, p90, p99 = np.percentile(samples, (50, 90, 99))
+        return dict(mean=float(samples.mean()), p50=p50, p90=p90, p99=p99, max=float(samples.max()))
+
+    def bins(self) -> np.ndarray:
+        """Returns counts of the window's durations in the log-spaced bins."""
+        return np.bincount(np.searchsorted(BIN_EDGES, list(self.samples)), minlength=BIN_EDGES.size + 1)
+
+
+def allocated_bytes(fn: Callable[[], Any], repeats: int = 3) -> int:
+    """
+    Returns the most memory allocated during a call of the function, in bytes above the memory in use before
+    the call (e.g. temporaries of a step), as traced by tracemalloc (NumPy reports its buffers to it).
+    """
+    fn()  # warm-up, so that lazily created buffers are not counted
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        allocated = 0
+        for _ in range(repeats):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            fn()
+            allocated = max(allocated, tracemalloc.get_traced_memory()[1] - before)
+        return allocated
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.metrics.record(self.stage, self.start, time.perf_counter_ns())
+
+
+class Metrics:
+    """
+    Durations of the stages of the pipeline, measured by `timer` context managers from any thread.
+
+    Each stage keeps a rolling histogram of its last `window` durations. The last `trace_events` measurements
+    are also kept as events of a Chrome trace (chrome://tracing, Perfetto) with the measuring thread.
+    """
+
+    def __init__(self, enabled: bool = True, window: int = 256, trace_events: int = 100000) -> None:
+        self.enabled = enabled
+        self.window = window
+        self.histograms: Dict[str, Histogram] = dict()
+        self.events: Deque[Tuple[str, int, int, int]] = deque(maxlen=trace_events)
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def timer(self, stage: str) -> ContextManager:
+        """Returns context manager measuring the duration of its block as the given stage."""
+        if not self.enabled:
+            return nullcontext()
+        return _Timer(self, stage)
+
+    def record(self, stage: str, start: int, end: int) -> None:
+        """Records a stage measured from start to end (perf_counter_ns)."""
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram(self.window))
+        histogram.add((end - start) / 1e9)
+        self.events.append((stage, start, end, threading.get_ident()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.events.clear()
+
+    def report(self) -> str:
+        """Returns table of the stages with their rolling statistics (in ms) and histograms."""
+        lines = [f"{'stage':<22}{'p50':>8}{'p90':>8}{'max':>8}  histogram 10us-1s"]
+        for stage in sorted(self.histograms, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            histogram = self.histograms[stage]
+            if not histogram.samples:
+                continue
+            summary = histogram.summary()
+            bins = histogram.bins()
+            spark = "".join(SPARK[int(np.ceil(8 * count / bins.max()))] for count in bins)
+            lines.append(
+                f"{stage:<22}{1e3 * summary['p50']:>8.2f}{1e3 * summary['p90']:>8.2f}{1e3 * summary['max']:>8.2f}  {spark}"
+            )
+        return "\n".join(lines)
+
+    def trace(self) -> Dict[str, Any]:
+        """Returns the recorded events in Chrome trace format."""
+        pid = os.getpid()
+        events = [
+            dict(name=stage, ph="X", ts=(start - self._origin) / 1e3, dur=(end - start) / 1e3, pid=pid, tid=tid)
+            for stage, start, end, tid in list(self.events)
+        ]
+        return dict(traceEvents=events, displayTimeUnit="ms")
+
+    def dump_trace(self, path: str) -> None:
+        """Writes the recorded events to a Chrome trace JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
+
+
+metrics = Metrics(
+    config.getboolean("APP", "METRICS"), config.getint("APP", "METRICS_WINDOW"), config.getint("APP", "TRACE_EVENTS")
+)
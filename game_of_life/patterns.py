@@ -0,0 +1,328 @@
+"""Reading and writing of patterns: RLE, plaintext (.cells), Macrocell (.mc) and NumPy (.npy) files."""
+import os
+import re
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from game_of_life import logger
+from game_of_life.engines import BOARD_DTYPE, CONWAY, normalize_rule
+
+PATTERN_TYPES = (
+    ("Run length encoded", "*.rle"),
+    ("Plaintext", "*.cells"),
+    ("Macrocell", "*.mc"),
+    ("NumPy array", "*.npy"),
+)
+
+# size of chunks in which pattern files are read
+CHUNK_SIZE = 1 << 16
+# maximal length of lines of written RLE files
+RLE_LINE_LENGTH = 70
+
+_RLE_TOKEN = re.compile(rb"(\d*)([A-Za-z$!])")
+_RLE_SIZE = re.compile(rb"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)")
+_RLE_RULE = re.compile(rb"rule\s*=\s*([^\s,]+)")
+# rules in the S/B digit notation of older pattern files, e.g. 23/3
+_DIGIT_RULE = re.compile(r"^([0-8]*)/([0-8]*)$")
+
+
+def _suffix(path: str) -> str:
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in (".rle", ".cells", ".mc", ".npy"):
+        raise ValueError(f"Unsupported pattern file '{path}'.")
+    return suffix
+
+
+def _set_run(board: np.ndarray, row: int, col: int, length: int) -> None:
+    """Sets a horizontal run of alive cells, clipped to the board."""
+    if 0 <= row < board.shape[0]:
+        start, stop = max(col, 0), min(col + length, board.shape[1])
+        if start < stop:
+            board[row, start:stop] = 1
+
+
+def _centered(size: Tuple[int, int], board: np.ndarray) -> Tuple[int, int]:
+    """Returns position of the top left corner of a pattern of the given size centered on the board."""
+    return (board.shape[0] - size[0]) // 2, (board.shape[1] - size[1]) // 2
+
+
+def _chunks(f: BinaryIO) -> Iterator[bytes]:
+    return iter(lambda: f.read(CHUNK_SIZE), b"")
+
+
+# reading
+
+
+def _rle_tokens(f: BinaryIO, rest: bytes) -> Iterator[Tuple[int, bytes]]:
+    """Yields (run length, tag) tokens of RLE body, reading the file chunk by chunk."""
+    for chunk in _chunks(f):
+        rest += chunk
+        end = 0
+        for match in _RLE_TOKEN.finditer(rest):
+            end = match.end()
+            yield int(match.group(1) or 1), match.group(2)
+        # an incomplete token (run length without its tag) stays for the next chunk
+        rest = rest[end:].lstrip()
+    for match in _RLE_TOKEN.finditer(rest):
+        yield int(match.group(1) or 1), match.group(2)
+
+
+def _read_rle(f: BinaryIO, board: np.ndarray) -> Optional[str]:
+    """Parses RLE file into the board, returns the rule of the header if any."""
+    # header: comments and the size line with the optional rule
+    line = f.readline()
+    while line.startswith(b"#"):
+        line = f.readline()
+    size, rule = (0, 0), None
+    match = _RLE_SIZE.search(line)
+    if match is not None:
+        size = (int(match.group(2)), int(match.group(1)))
+        rule_match = _RLE_RULE.search(line)
+        if rule_match is not None:
+            rule = rule_match.group(1).decode()
+        line = b""
+    top, left = _centered(size, board)
+
+    row, col = top, left
+    for length, tag in _rle_tokens(f, line):
+        if tag == b"b":
+            col += length
+        elif tag == b"$":
+            row, col = row + length, left
+        elif tag == b"!":
+            break
+        else:
+            _set_run(board, row, col, length)
+            col += length
+    return rule
+
+
+def _cells_size(f: BinaryIO) -> Tuple[int, int]:
+    """Returns size of a plaintext pattern, scanning the file line by line."""
+    height, width = 0, 0
+    for line in f:
+        if not line.startswith(b"!"):
+            height += 1
+            width = max(width, len(line.rstrip()))
+    f.seek(0)
+    return height, width
+
+
+def _read_cells(f: BinaryIO, board: np.ndarray) -> Optional[str]:
+    """Parses plaintext file into the board, line by line. Plaintext files have no rule."""
+    top, left = _centered(_cells_size(f), board)
+    row = top
+    for line in f:
+        if line.startswith(b"!"):
+            continue
+        if 0 <= row < board.shape[0]:
+            chars = np.frombuffer(line.rstrip(), dtype=np.uint8)
+            start, stop = max(left, 0), min(left + chars.size, board.shape[1])
+            if start < stop:
+                chars = chars[start - left:stop - left]
+                board[row, start:stop] = (chars == ord("O")) | (chars == ord("*"))
+        row += 1
+    return None
+
+
+def _read_mc(f: BinaryIO, board: np.ndarray) -> Optional[str]:
+    """Parses Macrocell file into the board, returns the rule of the #R line if any."""
+    # node 0 is the empty node (never filled), leaves are 8x8 arrays, other nodes (level, nw, ne, sw, se)
+    nodes: List[Union[np.ndarray, Tuple[int, int, int, int, int]]] = [np.zeros((8, 8), dtype=BOARD_DTYPE)]
+    rule = None
+    for line in f:
+        line = line.strip()
+        if line.startswith(b"#R"):
+            rule = line[2:].strip().decode()
+        if not line or line.startswith((b"[", b"#")):
+            continue
+        if line[:1] in (b".", b"*", b"$"):
+            leaf = np.zeros((8, 8), dtype=BOARD_DTYPE)
+            for i, leaf_row in enumerate(line.split(b"$")[:8]):
+                chars = np.frombuffer(leaf_row[:8], dtype=np.uint8)
+                leaf[i, :chars.size] = chars == ord("*")
+            nodes.append(leaf)
+        else:
+            level, nw, ne, sw, se = (int(value) for value in line.split()[:5])
+            nodes.append((level, nw, ne, sw, se))
+
+    if len(nodes) == 1:
+        return rule
+    root = nodes[-1]
+    side = 8 if isinstance(root, np.ndarray) else 1 << root[0]
+    top, left = _centered((side, side), board)
+
+    def fill(index: int, top: int, left: int, side: int) -> None:
+        if index == 0 or top >= board.shape[0] or left >= board.shape[1] or top + side <= 0 or left + side <= 0:
+            return
+        node = nodes[index]
+        if isinstance(node, np.ndarray):
+            rows = slice(max(top, 0), min(top + 8, board.shape[0]))
+            cols = slice(max(left, 0), min(left + 8, board.shape[1]))
+            board[rows, cols] |= node[rows.start - top:rows.stop - top, cols.start - left:cols.stop - left]
+            return
+        half = side // 2
+        _, nw, ne, sw, se = node
+        fill(nw, top, left, half)
+        fill(ne, top, left + half, half)
+        fill(sw, top + half, left, half)
+        fill(se, top + half, left + half, half)
+
+    fill(len(nodes) - 1, top, left, side)
+    return rule
+
+
+def _read_npy(path: str, board: np.ndarray) -> None:
+    """Copies memory-mapped array into the board, only the overlapping part is read from the disk."""
+    array = load_npy(path)
+    top, left = _centered(array.shape, board)
+    rows = slice(max(top, 0), min(top + array.shape[0], board.shape[0]))
+    cols = slice(max(left, 0), min(left + array.shape[1], board.shape[1]))
+    board[rows, cols] = array[rows.start - top:rows.stop - top, cols.start - left:cols.stop - left]
+
+
+def read_pattern(
+    path: str, board: Optional[np.ndarray] = None, shape: Optional[Tuple[int, int]] = None
+) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Reads pattern file into the board (a new empty one of the given shape if no board is given) and returns it
+    along with the rule of the file (normalized), None if the file does not specify one. The pattern is centered
+    on the board and cropped to it. Files are parsed as a stream, cells are written to the board right away.
+    """
+    suffix = _suffix(path)
+    if board is None:
+        if shape is None:
+            raise ValueError("Either a board or its shape is needed.")
+        board = np.zeros(shape, dtype=BOARD_DTYPE)
+
+    if suffix == ".npy":
+        _read_npy(path, board)
+        return board, None
+
+    readers = {".rle": _read_rle, ".cells": _read_cells, ".mc": _read_mc}
+    with open(path, "rb") as f:
+        rule = readers[suffix](f, board)
+    return board, None if rule is None else _pattern_rule(rule, path)
+
+
+def _pattern_rule(rule: str, path: str) -> Optional[str]:
+    """Returns the normalized rule of a pattern file, None if it is not supported (the pattern is still read)."""
+    match = _DIGIT_RULE.match(rule.strip())
+    if match is not None:
+        rule = f"B{match.group(2)}/S{match.group(1)}"
+    try:
+        return normalize_rule(rule)
+    except ValueError:
+        logger.warning(f"Rule '{rule}' of pattern '{path}' is not supported, the pattern is read without it.")
+        return None
+
+
+def load_npy(path: str) -> np.ndarray:
+    """Opens board saved as .npy file without reading it, pages are loaded on access and never written back."""
+    return np.load(path, mmap_mode="c")
+
+
+# writing
+
+
+def _rle_run(length: int, tag: bytes) -> bytes:
+    return (str(length).encode() if length > 1 else b"") + tag
+
+
+def _write_rle(f: BinaryIO, board: np.ndarray, rule: str) -> None:
+    height, width = board.shape
+    f.write(f"x = {width}, y = {height}, rule = {rule}\n".encode())
+
+    def tokens() -> Iterator[bytes]:
+        current_row = 0
+        for i, row in enumerate(board):
+            # starts and ends of runs of alive cells
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], row != 0, [False])).astype(np.int8)))
+            if edges.size == 0:
+                continue
+            if i > current_row:
+                yield _rle_run(i - current_row, b"$")
+                current_row = i
+            col = 0
+            for start, stop in zip(edges[::2], edges[1::2]):
+                if start > col:
+                    yield _rle_run(int(start - col), b"b")
+                yield _rle_run(int(stop - start), b"o")
+                col = stop
+        yield b"!"
+
+    line = b""
+    for token in tokens():
+        if len(line) + len(token) > RLE_LINE_LENGTH:
+            f.write(line + b"\n")
+            line = b""
+        line += token
+    f.write(line + b"\n")
+
+
+def _write_cells(f: BinaryIO, board: np.ndarray, rule: str) -> None:
+    f.write(b"!Name: game_of_life\n")
+    chars = np.array([ord("."), ord("O")], dtype=np.uint8)
+    for row in board:
+        f.write(chars[(row != 0).view(np.uint8)].tobytes() + b"\n")
+
+
+def _write_mc(f: BinaryIO, board: np.ndarray, rule: str) -> None:
+    f.write(f"[M2] (game_of_life)\n#R {rule}\n".encode())
+    level = max(3, int(np.ceil(np.log2(max(board.shape)))))
+    # the board is centered in the root node the same way the root node is centered on a board when read
+    top, left = _centered((1 << level, 1 << level), board)
+    index: Dict[object, int] = dict()
+
+    def window(top: int, left: int, side: int) -> np.ndarray:
+        """Returns square of the given side at the board position padded with dead cells."""
+        block = np.zeros((side, side), dtype=bool)
+        rows = slice(max(top, 0), max(min(top + side, board.shape[0]), 0))
+        cols = slice(max(left, 0), max(min(left + side, board.shape[1]), 0))
+        block[rows.start - top:rows.stop - top, cols.start - left:cols.stop - left] = board[rows, cols] != 0
+        return block
+
+    def node(top: int, left: int, level: int) -> int:
+        side = 1 << level
+        rows = slice(max(top, 0), max(min(top + side, board.shape[0]), 0))
+        cols = slice(max(left, 0), max(min(left + side, board.shape[1]), 0))
+        if not board[rows, cols].any():
+            return 0
+        if level == 3:
+            leaf = window(top, left, 8)
+            key: object = leaf.tobytes()
+            if key not in index:
+                rows_text = [b"".join(b"*" if cell else b"." for cell in leaf_row).rstrip(b".") for leaf_row in leaf]
+                while rows_text and not rows_text[-1]:
+                    rows_text.pop()
+                f.write(b"$".join(rows_text) + b"$\n")
+                index[key] = len(index) + 1
+            return index[key]
+        half = side // 2
+        children = (
+            node(top, left, level - 1), node(top, left + half, level - 1),
+            node(top + half, left, level - 1), node(top + half, left + half, level - 1),
+        )
+        key = (level, children)
+        if key not in index:
+            f.write(f"{level} {children[0]} {children[1]} {children[2]} {children[3]}\n".encode())
+            index[key] = len(index) + 1
+        return index[key]
+
+    node(top, left, level)
+
+
+def write_pattern(path: str, board: np.ndarray, rule: str = CONWAY) -> None:
+    """
+    Writes the board to pattern file of the type given by the file suffix. The rule is written to RLE and
+    Macrocell files, plaintext and NumPy files have no place for it.
+    """
+    suffix = _suffix(path)
+    if suffix == ".npy":
+        np.save(path, np.ascontiguousarray(board, dtype=BOARD_DTYPE))
+        return
+
+    writers = {".rle": _write_rle, ".cells": _write_cells, ".mc": _write_mc}
+    with open(path, "wb") as f:
+        writers[suffix](f, board, normalize_rule(rule))
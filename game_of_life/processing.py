@@ -1,31 +1,171 @@
-from queue import Queue
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from queue import Empty, Queue
+import sys
 import threading
 import time
-from typing import Any, Optional
-from PIL import ImageTk, Image, ImageColor
-from scipy.signal import convolve2d
+import weakref
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Optional, Tuple
+from PIL import Image, ImageColor
 import numpy as np
 
 from game_of_life import config, logger 
+from game_of_life.cycles import Cycle
+from game_of_life.engines import BOARD_DTYPE, CONWAY, get_engine, normalize_rule
+from game_of_life.history import HistoryWriter
+from game_of_life.messages import Message
+from game_of_life.metrics import PHOTOIMAGE, QUEUE_WAIT, RESIZE, metrics
+from game_of_life.patterns import read_pattern
+from game_of_life.rendering import Renderer
+from game_of_life.simulation import Simulation
+from game_of_life.stats import Snapshot
 
+if TYPE_CHECKING:
+    from PIL import ImageTk
 
-class Message:
-    """Message objects to be send to Processor thread via message queue."""
-    CLEAN_INIT = object()
-    RANDOM_INIT = object()
-    PAUSE = object()
-    IMG_UPDATE = object()
+# (top, left, bottom, right) of the alive cells
+Box = Tuple[int, int, int, int]
+# (top, left, height, width) of a view and the cells in it
+Window = Tuple[Tuple[int, int, int, int], np.ndarray]
 
-    def __init__(self, type: object, content: Optional[np.ndarray] = None):
-        self.type = type
-        self.content = content
 
 
-class ProcessingThread(threading.Thread):
+def photo_image(image: Image.Image) -> "ImageTk.PhotoImage":
+    """Converts an image for Tk, imported on first use so that worker processes never load Tk."""
+    from PIL import ImageTk
+    return ImageTk.PhotoImage(image)
+
+
+class FrameHolder:
+    """
+    Single-slot, double-buffered hand-off of the newest generation from the worker to the GUI.
+
+    The worker writes a generation into the back buffer and swaps it with the front one, the GUI takes a copy
+    of the front buffer. Generations published before the GUI takes them are dropped, so the GUI always
+    shows the newest one. Generations of unbounded engines come with the cells of the view they are shown in.
+    """
+
+    def __init__(self, shape: Tuple[int, int]) -> None:
+        self._buffers = [np.zeros(shape, dtype=BOARD_DTYPE), np.zeros(shape, dtype=BOARD_DTYPE)]
+        self._front = 0
+        self._lock = threading.Lock()
+        self.generation = -1
+        self.window: Optional[Window] = None
+        self.consumed = True
+        self.published = 0
+
+    def publish(self, generation: int, array: np.ndarray, window: Optional[Window] = None) -> None:
+        """Publishes a generation, overwriting the previous one if not taken yet (called by the worker only)."""
+        back = 1 - self._front
+        np.copyto(self._buffers[back], array, casting="unsafe")
+        with self._lock:
+            self._front = back
+            self.generation = generation
+            self.window = window
+            self.consumed = False
+            self.published = time.perf_counter_ns()
+
+    def take(self) -> Optional[Tuple[int, np.ndarray, Optional[Window]]]:
+        """Returns the newest generation, a copy of its cells and its view window, None if it has already been taken."""
+        with self._lock:
+            if self.consumed:
+                return None
+            self.consumed = True
+            metrics.record(QUEUE_WAIT, self.published, time.perf_counter_ns())
+            return self.generation, self._buffers[self._front].copy(), self.window
+
+    def clear(self) -> None:
+        """Drops the published generation."""
+        with self._lock:
+            self.consumed = True
+
+
+class Processor:
+    """
+    Common part of the workers computing generations: the board and canvas sizes, colors and conversion
+    of arrays to images done in the GUI thread (edits, replay).
+    """
+    # whether the engine of the worker is unbounded, the board being only a window into its universe
+    unbounded = False
+
+    def __init__(self, units: Optional[int] = None, size: Optional[int] = None) -> None:
+        units = units or config.getint("GRID", "UNITS")
+        self.array_size = size or config.getint("GRID", "SIZE")
+        self.array_shape=(units, units)
+        self.background_color=ImageColor.getrgb(config["GRID"]["BACKGROUND"])
+        self.foreground_color=ImageColor.getrgb(config["GRID"]["FOREGROUND"])
+        self.edge_color=ImageColor.getrgb(config["GRID"]["EDGE_COLOR"])
+        self.colors = (self.background_color, self.foreground_color, self.edge_color)
+        self.grid_min_zoom = config.getfloat("GRID", "GRID_LINES_MIN_ZOOM")
+        self.edit_renderer = Renderer(self.array_shape, self.array_size, self.colors, self.grid_min_zoom)
+
+    def send_message(self, msg: Message) -> None:
+        """Sends a message to the worker."""
+        raise NotImplementedError
+
+    def take_frame(self) -> Optional[Tuple[np.ndarray, "ImageTk.PhotoImage", int]]:
+        """Returns the next computed generation as (cells, image, generation), None if there is none yet."""
+        raise NotImplementedError
+
+    def flush_processed(self) -> None:
+        """Drops computed generations not taken yet."""
+        raise NotImplementedError
+
+    @property
+    def cycle(self) -> Optional[Cycle]:
+        """Cycle detected by the worker, if any."""
+        raise NotImplementedError
+
+    @property
+    def history_path(self) -> Optional[str]:
+        """History file the generations are recorded to, if recording."""
+        raise NotImplementedError
+
+    def statistics(self) -> Optional[Snapshot]:
+        """Returns the newest statistics sent by the worker (on STATS messages), None if there are none."""
+        raise NotImplementedError
+
+    def bounding_box(self) -> Optional[Box]:
+        """Returns bounding box of the alive cells of the last published generation of an unbounded engine, if any."""
+        raise NotImplementedError
+
+    def array_to_img(self, array: np.ndarray) -> "ImageTk.PhotoImage":
+        """Conversion of array to image that will be displayed by GUI."""
+        with metrics.timer(RESIZE):
+            self.edit_renderer.render(array)
+        with metrics.timer(PHOTOIMAGE):
+            return photo_image(self.edit_renderer.image())
+
+    def window_to_img(self, cells: np.ndarray) -> "ImageTk.PhotoImage":
+        """Conversion of the cells of the current view to image that will be displayed by GUI."""
+        with metrics.timer(RESIZE):
+            self.edit_renderer.render_view(cells)
+        with metrics.timer(PHOTOIMAGE):
+            return photo_image(self.edit_renderer.image())
+
+    def region_to_img(
+        self, array: np.ndarray, region: Tuple[int, int, int, int]
+    ) -> Optional[Tuple["ImageTk.PhotoImage", Tuple[int, int]]]:
+        """
+        Conversion of a (top, left, bottom, right) region of array to image of the pixels showing it, returned along
+        with the position of the pixels in the displayed image. None if the region is not shown by any pixel.
+        """
+        box = self.edit_renderer.pixels(region)
+        if box is None:
+            return None
+        self.edit_renderer.render(array, region)
+        return photo_image(self.edit_renderer.image().crop(box)), box[:2]
+
+
+class ProcessingThread(threading.Thread, Processor):
     """Thread responsible for processing arrays during calculation of next generation of cells."""
 
-    def __init__(self) -> None:
-        super().__init__(daemon=True)
+    def __init__(self, units: Optional[int] = None, size: Optional[int] = None, engine: Optional[str] = None) -> None:
+        threading.Thread.__init__(self, daemon=True)
+        Processor.__init__(self, units, size)
         self.processing_paused: bool = True
 
         # queues
@@ -33,29 +173,48 @@ class ProcessingThread(threading.Thread):
         self.processed: Queue =  Queue(maxsize=50)
 
         # array processing objects
-        self.kernel = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]])
-        self.array_size = config.getint("GRID", "SIZE")
-        self.array_shape=(config.getint("GRID", "UNITS"), config.getint("GRID", "UNITS"))
-        self.background_color=ImageColor.getrgb(config["GRID"]["BACKGROUND"])
-        self.foreground_color=ImageColor.getrgb(config["GRID"]["FOREGROUND"])
-        self.to_process: np.ndarray
+        self.simulation = Simulation(self.array_shape, engine or config["APP"]["ENGINE"])
+        self.unbounded = self.simulation.engine.unbounded
+        self.renderer = Renderer(self.array_shape, self.array_size, self.colors, self.grid_min_zoom)
+        self.frame_generation = -1
+        self.box: Optional[Box] = None
+        self.stats_snapshot: Optional[Snapshot] = None
+        # images of generations served from the cycle cache, by their phase in the cycle
+        self.cycle_images: Dict[int, "ImageTk.PhotoImage"] = dict()
+        self.images_cycle: Optional[Cycle] = None
+        # published generations the GUI may show, by their number, so that edits of them can be applied later
+        self.snapshots: Deque[Tuple[int, Any]] = deque(maxlen=self.processed.maxsize + 1)
+
+        # turbo mode: as many generations as possible, only the newest one handed to GUI via frame holder
+        self.turbo = config.getboolean("APP", "TURBO")
+        self.frames = FrameHolder(self.array_shape)
+        self.publish_interval = 1 / config.getint("APP", "MAX_FPS")
+        self.last_publish = 0.0
 
-        self.sleep = config.getint("APP", "WORKER_SLEEP")
+        # pacing towards the target generation rate (display rate by default), unlimited in turbo mode
+        target_rate = config.getint("APP", "TARGET_GPS") or config.getint("APP", "MAX_FPS")
+        self.step_interval = 1 / target_rate
+        self.next_step = 0.0
+
+        # recording of every computed generation to the history file
+        self.recorder: Optional[HistoryWriter] = None
+        if config.getboolean("APP", "HISTORY"):
+            self.recorder = HistoryWriter(
+                config["APP"]["HISTORY_FILE"], self.array_shape, config.getint("APP", "HISTORY_KEYFRAME_INTERVAL")
+            )
         logger.info("Processing thread initialized ...")
 
     def _init_processing(self, random: bool = True) -> None:
         """Initializes starting cell generation, either random or empty."""
-        if random:
-            self.to_process = np.random.randint(2, size=self.array_shape)
-        else:
-            self.to_process = np.zeros(shape=self.array_shape)
+        self.simulation.reset(random=random)
+        self.frame_generation = -1
+        self.snapshots.clear()
+        self._record(keyframe=True)
 
         self.processing_paused = False
 
-    def _handle_messages(self) -> None:
-        """Handles messages coming via message queue."""
-        msg = self.msg_queue.get(False)
-
+    def _handle_message(self, msg: Message) -> None:
+        """Handles a message coming via message queue."""
         if msg.type == Message.CLEAN_INIT:
             logger.debug("Received INIT MSG")
             self._init_processing(random=False)
@@ -65,52 +224,212 @@ class ProcessingThread(threading.Thread):
         elif msg.type == Message.PAUSE:
             logger.debug("Received PAUSE MSG.")
             self.processing_paused = True
+        elif msg.type == Message.RESUME:
+            logger.debug("Received RESUME MSG.")
+            self.processing_paused = False
+        elif msg.type == Message.STEP:
+            logger.debug("Received STEP MSG.")
+            self.simulation.step()
+            self._record()
+            self._publish()
         elif msg.type == Message.IMG_UPDATE:
             logger.debug("Received IMG UPDATE MSG")
             logger.debug(f"len of processed and msg queue: {self.processed.qsize(), self.msg_queue.qsize()}")
-            self.to_process = msg.content
-            logger.debug("Array to_process updated")
+            board, generation = msg.content
+            self.simulation.load(board, generation)
+            self.frame_generation = -1
+            self.snapshots.clear()
+            self._record_from_here()
+            logger.debug("Engine state updated")
+        elif msg.type == Message.FAST_FORWARD:
+            logger.debug(f"Received FAST FORWARD MSG ({msg.content} generations)")
+            try:
+                self.simulation.advance(msg.content)
+            except ValueError as error:
+                logger.error(f"Generations could not be skipped: {error}")
+                return
+            self._record()
+            self._publish()
+        elif msg.type == Message.TURBO:
+            logger.debug(f"Received TURBO MSG ({msg.content})")
+            self.turbo = msg.content
+            self.frame_generation = -1
+        elif msg.type == Message.LOAD_PATTERN:
+            logger.debug(f"Received LOAD PATTERN MSG ({msg.content})")
+            try:
+                board, rule = read_pattern(msg.content, shape=self.array_shape)
+            except (OSError, ValueError) as error:
+                logger.error(f"Pattern could not be loaded: {error}")
+                return
+            if rule is not None and rule != self.simulation.engine.rule:
+                logger.warning(f"Pattern of rule {rule} is simulated with rule {self.simulation.engine.rule}.")
+            self.simulation.load(board)
+            self.frame_generation = -1
+            self.snapshots.clear()
+            self._record(keyframe=True)
+            self._publish()
+        elif msg.type == Message.EDIT_CELLS:
+            rows, cols, values, generation = msg.content
+            logger.debug(f"Received EDIT CELLS MSG ({len(values)} cells of generation {generation})")
+            self._rewind(generation)
+            self.simulation.edit(rows, cols, values)
+            self.frame_generation = -1
+            self.snapshots.clear()
+            self._record_from_here()
+        elif msg.type == Message.STATS:
+            stats = self.simulation.statistics()
+            if stats is not None:
+                self._share_stats(stats.snapshot())
+        elif msg.type == Message.VIEW:
+            logger.debug(f"Received VIEW MSG ({msg.content})")
+            self.renderer.set_view(msg.content)
+            self.cycle_images.clear()
+            self.frame_generation = -1
+            if self.unbounded:
+                # the cells in the new view are known to the worker only
+                self._publish()
         else:
             logger.warning("Received unknown type of message.")
 
+    def _rewind(self, generation: int) -> None:
+        """Goes back to a published generation the GUI shows, dropping the generations computed after it."""
+        if generation == self.simulation.generation:
+            return
+        snapshot = next((snapshot for number, snapshot in reversed(self.snapshots) if number == generation), None)
+        if snapshot is None:
+            logger.warning(f"Generation {generation} is no longer known, edits apply to {self.simulation.generation}.")
+            return
+        self.simulation.restore(snapshot, generation)
+        self.flush_processed()
+
+    def _keep_snapshot(self, snapshot: Any, consumed: Optional[bool] = None) -> None:
+        """
+        Keeps the published generation for `_rewind`. With a single-slot hand-off (`consumed` given) only the
+        generation the GUI took last may be shown, the previous one is dropped if it was replaced before being taken.
+        """
+        if consumed is not None:
+            taken = list(self.snapshots)[-1:] if consumed else list(self.snapshots)[-2:-1]
+            self.snapshots.clear()
+            self.snapshots.extend(taken)
+        self.snapshots.append((self.simulation.generation, snapshot))
+
     def _process(self) -> None:
-        """Performs calculation of next cell generation and puts it to processed queue."""
-        if not self.processed.full() and not self.processing_paused:
+        """Performs calculation of next cell generation and puts it to processed queue (or frame holder)."""
+        if self.processing_paused:
+            return
+
+        if self.turbo:
+            if self.simulation.cycle_phase() is not None:
+                # all further generations are known, nothing to compute in turbo mode
+                return
+            self.simulation.step()
+            self._record()
+            # publish only if the GUI has taken the previous generation or might want a newer one already
+            if self.frames.consumed or time.perf_counter() - self.last_publish >= self.publish_interval:
+                self._publish()
+        elif not self.processed.full():
             logger.debug("Starting processing ...")
 
-            # get image to process
-            to_process = self.to_process
-            processed = to_process.copy()
+            # calculate next generation
+            self.simulation.step()
+            self._record()
+            self._publish()
+            self._schedule_next_step()
 
-            # calcualte number of cell neighbours
-            neighbors = convolve2d(to_process, self.kernel, mode='same')
-            # logger.debug("convolved")
+    def _schedule_next_step(self) -> None:
+        """Sets time of the next step according to the target generation rate."""
+        now = time.perf_counter()
+        self.next_step += self.step_interval
+        # do not try to catch up after falling behind by more than a step
+        if self.next_step < now - self.step_interval:
+            self.next_step = now
 
-            # apply rules of life
-            should_die = (to_process == 1) & ((neighbors > 3) | (neighbors < 2))
-            should_live = (to_process == 0) & (neighbors == 3)
-            processed[should_live] = 1
-            processed[should_die] = 0
-            # logger.debug("rules applied")
+    def _timeout(self) -> Optional[float]:
+        """Returns how long to wait for messages before the next step, None to wait for messages only."""
+        if self.processing_paused:
+            return None
+        if self.turbo:
+            return None if self.simulation.cycle_phase() is not None else 0.0
+        if self.processed.full():
+            # the GUI frees at most one slot per frame
+            return self.publish_interval
+        return max(0.0, self.next_step - time.perf_counter())
 
-            # convert array to image and put in processed queue
-            cell_img = self.array_to_img(processed)
-            self.processed.put((processed, cell_img), block=False)
-            self.to_process = processed
+    def _record(self, keyframe: bool = False) -> None:
+        """Appends current generation to the history file, if recording."""
+        if self.recorder is not None:
+            self.recorder.append(self.simulation.generation, self.simulation.state(), keyframe)
 
-    def run(self) -> None:
-        while True:
-            logger.debug("loop of worker ...")
+    def _record_from_here(self) -> None:
+        """Records current generation as a keyframe, dropping recorded generations after it (the game went back)."""
+        if self.recorder is not None:
+            self.recorder.truncate(self.simulation.generation)
+        self._record(keyframe=True)
+
+    def _publish(self) -> None:
+        """Converts current generation to image and puts it to processed queue, or to frame holder in turbo mode."""
+        if self.unbounded:
+            self.box = self.simulation.bounding_box()
+        if self.turbo:
+            window = None
+            if self.unbounded:
+                window = (self.renderer.view, self.simulation.region(*self.renderer.view))
+            processed = self.simulation.state()
+            # the cells of bounded boards are their own snapshot
+            self._keep_snapshot(self.simulation.snapshot() if self.unbounded else processed, self.frames.consumed)
+            self.frames.publish(self.simulation.generation, processed, window)
+            self.last_publish = time.perf_counter()
+        elif not self.processed.full():
+            processed = self.simulation.state()
+            phase = self.simulation.cycle_phase()
+            if self.simulation.cycle is not self.images_cycle:
+                self.cycle_images.clear()
+                self.images_cycle = self.simulation.cycle
 
-            if not self.msg_queue.empty():
-                logger.debug("calling msg handler")
-                self._handle_messages()
+            if phase in self.cycle_images:
+                # the generation repeats an already rendered one
+                cell_img = self.cycle_images[phase]
+                self.frame_generation = -1
             else:
-                logger.debug("msg queue empty")
-                self._process()
-                logger.debug(f"msg queue, processed: {self.msg_queue.qsize()}, {self.processed.qsize()}")
+                self._render(processed)
+                with metrics.timer(PHOTOIMAGE):
+                    cell_img = photo_image(self.renderer.image())
+                if phase is not None:
+                    self.cycle_images[phase] = cell_img
+            self._keep_snapshot(self.simulation.snapshot() if self.unbounded else processed)
+            self.processed.put((processed, cell_img, self.simulation.generation, time.perf_counter_ns()), block=False)
+
+    def _share_stats(self, snapshot: Snapshot) -> None:
+        self.stats_snapshot = snapshot
+
+    def _render(self, board: np.ndarray) -> None:
+        """Renders current generation, redrawing only regions changed since the previously rendered one if known."""
+        if self.unbounded:
+            # only the cells in view are fetched from the engine, the view may reach outside of the board
+            with metrics.timer(RESIZE):
+                self.renderer.render_view(self.simulation.region(*self.renderer.view))
+            self.frame_generation = self.simulation.generation
+            return
+        regions = None
+        if self.simulation.generation == self.frame_generation + 1:
+            regions = self.simulation.dirty_regions()
+        with metrics.timer(RESIZE):
+            if regions is None:
+                self.renderer.render(board)
+            else:
+                for region in regions:
+                    self.renderer.render(board, region)
+        self.frame_generation = self.simulation.generation
 
-            time.sleep(1e-3 * self.sleep)
+    def run(self) -> None:
+        """Worker loop, blocks on the message queue until a message arrives or the next step is due."""
+        while True:
+            try:
+                msg = self.msg_queue.get(timeout=self._timeout())
+            except Empty:
+                self._process()
+            else:
+                self._handle_message(msg)
 
     def send_message(self, msg: Message) -> None:
         """Sends messages to processing thread."""
@@ -120,9 +439,39 @@ class ProcessingThread(threading.Thread):
         """Returns next item in processed queue."""
         return self.processed.get(block=False)
 
+    def take_frame(self) -> Optional[Tuple[np.ndarray, "ImageTk.PhotoImage", int]]:
+        newest = self.frames.take()
+        if newest is not None:
+            # turbo mode, the newest generation is converted in the GUI thread
+            generation, processed, window = newest
+            if window is not None and window[0] == self.edit_renderer.view:
+                return processed, self.window_to_img(window[1]), generation
+            return processed, self.array_to_img(processed), generation
+        if self.processed.empty():
+            return None
+        processed, cell_img, generation, published = self.get_processed()
+        metrics.record(QUEUE_WAIT, published, time.perf_counter_ns())
+        self.processed.task_done()
+        return processed, cell_img, generation
+
+    @property
+    def cycle(self) -> Optional[Cycle]:
+        return self.simulation.cycle
+
+    @property
+    def history_path(self) -> Optional[str]:
+        return None if self.recorder is None else self.recorder.path
+
+    def statistics(self) -> Optional[Snapshot]:
+        return self.stats_snapshot
+
+    def bounding_box(self) -> Optional[Box]:
+        return self.box
+
     def flush_processed(self) -> None:
-        """Deletes content of tthe processed queue."""
+        """Deletes content of tthe processed queue and frame holder."""
         self._clear_queue(self.processed)
+        self.frames.clear()
 
     @staticmethod
     def _clear_queue(q: Queue) -> None:
@@ -134,14 +483,237 @@ class ProcessingThread(threading.Thread):
             q.unfinished_tasks = 0
         logger.debug("Queue clear")
 
-    def array_to_img(self, array: np.ndarray) -> ImageTk.PhotoImage:
-        """Conversion of array to image that will be displayed by GUI."""
-        # 2D array to RGB array
-        background = self.background_color * (1 - array[:, :, None])
-        foreground = self.foreground_color * array[:, :, None]
-        array = background + foreground
-
-        # array to image and resize
-        image = Image.fromarray(array.astype(np.uint8))
-        resized_image = image.resize(size=(self.array_size, self.array_size), resample=Image.NEAREST)
-        return ImageTk.PhotoImage(resized_image)
+
+class SharedFrame:
+    """
+    Double-buffered hand-off of the newest generation and its rendered frame between processes, living in
+    shared memory.
+
+    Like `FrameHolder`, the worker writes a generation (cells and palette indices of the frame) into the back
+    slot and swaps it with the front one under a lock, the GUI maps the front slot directly while holding
+    the lock. A header holds the front slot, sequence number of the published generation, sequence number
+    of the taken one, the cycle detected by the worker and the bounding box of an unbounded universe.
+    """
+    # header fields (int64)
+    SEQUENCE, TAKEN, FRONT, GENERATION, CYCLE_START, CYCLE_PERIOD, PUBLISHED = range(7)
+    BOX = slice(7, 11)
+    HEADER_SIZE = 12
+
+    def __init__(
+        self, shape: Tuple[int, int], size: int, lock: Any, name: Optional[str] = None
+    ) -> None:
+        self.shape = shape
+        self.size = size
+        self._lock = lock
+        board_bytes, frame_bytes = shape[0] * shape[1], size * size
+        nbytes = self.HEADER_SIZE * 8 + 2 * (board_bytes + frame_bytes)
+        # the memory is unlinked by its creator, processes attaching to it do not track it (where supported)
+        tracking = dict(track=False) if name is not None and sys.version_info >= (3, 13) else dict()
+        self.memory = shared_memory.SharedMemory(name=name, create=name is None, size=nbytes, **tracking)
+        self.name = self.memory.name
+
+        buffer = self.memory.buf
+        self.header = np.ndarray((self.HEADER_SIZE,), dtype=np.int64, buffer=buffer)
+        offset = self.header.nbytes
+        self.boards = np.ndarray((2,) + tuple(shape), dtype=BOARD_DTYPE, buffer=buffer, offset=offset)
+        self.frames = np.ndarray((2, size, size), dtype=np.uint8, buffer=buffer, offset=offset + 2 * board_bytes)
+        if name is None:
+            self.header[:] = 0
+
+    @property
+    def consumed(self) -> bool:
+        return self.header[self.TAKEN] == self.header[self.SEQUENCE]
+
+    def publish(
+        self, generation: int, board: np.ndarray, frame: np.ndarray, cycle: Optional[Cycle], box: Optional[Box] = None
+    ) -> None:
+        """Publishes a generation, overwriting the previous one if not taken yet (called by the worker only)."""
+        back = 1 - self.header[self.FRONT]
+        np.copyto(self.boards[back], board, casting="unsafe")
+        np.copyto(self.frames[back], frame)
+        with self._lock:
+            self.header[self.FRONT] = back
+            self.header[self.GENERATION] = generation
+            self.header[self.CYCLE_START] = -1 if cycle is None else cycle.start
+            self.header[self.CYCLE_PERIOD] = 0 if cycle is None else cycle.period
+            # an empty box stands for none
+            self.header[self.BOX] = (0, 0, 0, 0) if box is None else box
+            self.header[self.PUBLISHED] = time.perf_counter_ns()
+            self.header[self.SEQUENCE] += 1
+
+    def take(self, to_image: Callable[[np.ndarray], Any]) -> Optional[Tuple[np.ndarray, Any, int]]:
+        """
+        Returns a copy of the cells of the newest generation, its frame converted by the given function while
+        mapped, and the generation. None if it has already been taken.
+        """
+        with self._lock:
+            if self.consumed:
+                return None
+            self.header[self.TAKEN] = self.header[self.SEQUENCE]
+            metrics.record(QUEUE_WAIT, int(self.header[self.PUBLISHED]), time.perf_counter_ns())
+            front = self.header[self.FRONT]
+            return self.boards[front].copy(), to_image(self.frames[front]), int(self.header[self.GENERATION])
+
+    def clear(self) -> None:
+        """Drops the published generation."""
+        with self._lock:
+            self.header[self.TAKEN] = self.header[self.SEQUENCE]
+
+    def cycle(self) -> Optional[Cycle]:
+        """Cycle detected by the worker as of the last published generation (without cached generations)."""
+        period = int(self.header[self.CYCLE_PERIOD])
+        if period == 0:
+            return None
+        return Cycle(int(self.header[self.CYCLE_START]), period, self.shape, cached=False)
+
+    def bounding_box(self) -> Optional[Box]:
+        """Bounding box of the alive cells as of the last published generation, if published."""
+        top, left, bottom, right = (int(value) for value in self.header[self.BOX])
+        if bottom == top:
+            return None
+        return top, left, bottom, right
+
+    def close(self) -> None:
+        self.memory.close()
+
+
+class SharedFrameWorker(ProcessingThread):
+    """
+    Worker of a separate process: messages come over a pipe and every published generation is rendered
+    by the worker into the shared frame. The worker loop runs in the main thread of the process (`run`).
+    """
+
+    def __init__(self, connection: Connection, frame: SharedFrame, engine: Optional[str] = None) -> None:
+        super().__init__(frame.shape[0], frame.size, engine)
+        self.connection = connection
+        self.shared = frame
+
+    def _process(self) -> None:
+        """Calculates the next generation, in normal mode only once the GUI has taken the previous one."""
+        if self.processing_paused:
+            return
+        if self.turbo:
+            if self.simulation.cycle_phase() is not None:
+                return
+            self.simulation.step()
+            self._record()
+            if self.shared.consumed or time.perf_counter() - self.last_publish >= self.publish_interval:
+                self._publish()
+        elif self.shared.consumed:
+            self.simulation.step()
+            self._record()
+            self._publish()
+            self._schedule_next_step()
+
+    def _timeout(self) -> Optional[float]:
+        if not self.processing_paused and not self.turbo and not self.shared.consumed:
+            # the GUI takes at most one generation per frame
+            return self.publish_interval
+        return super()._timeout()
+
+    def _share_stats(self, snapshot: Snapshot) -> None:
+        self.connection.send(snapshot)
+
+    def flush_processed(self) -> None:
+        self.shared.clear()
+
+    def _publish(self) -> None:
+        processed = self.simulation.state()
+        self._render(processed)
+        box = self.simulation.bounding_box() if self.unbounded else None
+        self._keep_snapshot(self.simulation.snapshot() if self.unbounded else processed, self.shared.consumed)
+        self.shared.publish(self.simulation.generation, processed, self.renderer.indices, self.simulation.cycle, box)
+        self.last_publish = time.perf_counter()
+
+    def run(self) -> None:
+        """Worker loop, blocks on the pipe until a message arrives or the next step is due, ends when it closes."""
+        while True:
+            try:
+                if self.connection.poll(self._timeout()):
+                    self._handle_message(self.connection.recv())
+                else:
+                    self._process()
+            except (EOFError, OSError):
+                break
+        self.simulation.close()
+        self.shared.close()
+
+
+def _serve(connection: Connection, name: str, lock: Any, shape: Tuple[int, int], size: int, engine: str) -> None:
+    """Entry point of the worker process."""
+    SharedFrameWorker(connection, SharedFrame(shape, size, lock, name), engine).run()
+
+
+def _release(process: BaseProcess, connection: Connection, frame: SharedFrame) -> None:
+    connection.close()
+    process.join(timeout=1)
+    if process.is_alive():
+        process.terminate()
+    frame.close()
+    frame.memory.unlink()
+
+
+class ProcessingProcess(Processor):
+    """
+    Worker computing generations in a separate process, so that stepping does not compete with the GUI
+    for the GIL. Messages are sent over a pipe, the newest generation and its frame are shared in
+    a `SharedFrame`, the GUI creates the image directly from the mapped frame.
+    """
+
+    def __init__(self, units: Optional[int] = None, size: Optional[int] = None, engine: Optional[str] = None) -> None:
+        super().__init__(units, size)
+        # other rules are computed by the bounded lookup engine, see `Simulation`
+        engine = engine or config["APP"]["ENGINE"]
+        self.unbounded = get_engine(engine).unbounded and normalize_rule(config["APP"]["RULE"]) == CONWAY
+        context = multiprocessing.get_context("spawn")
+        self.frame = SharedFrame(self.array_shape, self.array_size, context.Lock())
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(
+            target=_serve,
+            args=(worker_connection, self.frame.name, self.frame._lock, self.array_shape, self.array_size, engine),
+            daemon=True,
+        )
+        self._history_path = config["APP"]["HISTORY_FILE"] if config.getboolean("APP", "HISTORY") else None
+        self.stats_snapshot: Optional[Snapshot] = None
+        # palette image over the shared frame being taken, shares its memory
+        self._palette = np.array(self.colors, dtype=np.uint8).tobytes()
+        self._finalizer = weakref.finalize(self, _release, self.process, self.connection, self.frame)
+        logger.info("Processing process initialized ...")
+
+    def start(self) -> None:
+        self.process.start()
+
+    def close(self) -> None:
+        """Stops the worker process and releases the shared memory."""
+        self._finalizer()
+
+    def send_message(self, msg: Message) -> None:
+        self.connection.send(msg)
+
+    def _to_image(self, frame: np.ndarray) -> "ImageTk.PhotoImage":
+        image = Image.frombuffer("P", (self.array_size, self.array_size), frame, "raw", "P", 0, 1)
+        image.putpalette(self._palette)
+        with metrics.timer(PHOTOIMAGE):
+            return photo_image(image)
+
+    def take_frame(self) -> Optional[Tuple[np.ndarray, "ImageTk.PhotoImage", int]]:
+        return self.frame.take(self._to_image)
+
+    def flush_processed(self) -> None:
+        self.frame.clear()
+
+    @property
+    def cycle(self) -> Optional[Cycle]:
+        return self.frame.cycle()
+
+    @property
+    def history_path(self) -> Optional[str]:
+        return self._history_path
+
+    def statistics(self) -> Optional[Snapshot]:
+        while self.connection.poll():
+            self.stats_snapshot = self.connection.recv()
+        return self.stats_snapshot
+
+    def bounding_box(self) -> Optional[Box]:
+        return self.frame.bounding_box()
@@ -0,0 +1,195 @@
+"""Rendering of cell boards to frames displayed by the GUI."""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from game_of_life.engines.base import board_region
+
+# palette index of grid lines
+EDGE = 2
+# how many times the board a view into an unbounded universe may span, in each direction
+UNBOUNDED_ZOOM_OUT = 16
+
+
+class Viewport:
+    """
+    Window of `height` x `width` cells with the top left cell at (`top`, `left`) of a board, shown on a square
+    canvas of `size` pixels. The window is zoomed and panned within the board, keeping its aspect ratio.
+    The board of an unbounded engine is only a window into the universe, the view is then not confined to it.
+    """
+
+    def __init__(self, shape: Tuple[int, int], size: int, bounded: bool = True) -> None:
+        self.shape = shape
+        self.size = size
+        self.bounded = bounded
+        self.reset()
+
+    def reset(self) -> None:
+        """Shows the whole board."""
+        self.top, self.left = 0, 0
+        self.height, self.width = self.shape
+
+    @property
+    def view(self) -> Tuple[int, int, int, int]:
+        """(top, left, height, width) of the window."""
+        return self.top, self.left, self.height, self.width
+
+    @property
+    def zoom(self) -> float:
+        """Pixels per cell."""
+        return self.size / max(self.height, self.width)
+
+    @property
+    def limits(self) -> Tuple[int, int]:
+        """Largest height and width of the window."""
+        if self.bounded:
+            return self.shape
+        return UNBOUNDED_ZOOM_OUT * self.shape[0], UNBOUNDED_ZOOM_OUT * self.shape[1]
+
+    def _clamp(self) -> None:
+        if not self.bounded:
+            return
+        self.top = min(max(self.top, 0), self.shape[0] - self.height)
+        self.left = min(max(self.left, 0), self.shape[1] - self.width)
+
+    def cell_at(self, x: float, y: float) -> Tuple[int, int]:
+        """Returns (row, column) of the board cell shown at the canvas position."""
+        return self.top + int(y * self.height / self.size), self.left + int(x * self.width / self.size)
+
+    def zoom_by(self, factor: float, x: Optional[float] = None, y: Optional[float] = None) -> None:
+        """Zooms in (factor > 1) or out keeping the cell at the canvas position (the centre by default) in place."""
+        x = self.size / 2 if x is None else x
+        y = self.size / 2 if y is None else y
+        row = self.top + y * self.height / self.size
+        col = self.left + x * self.width / self.size
+
+        max_height, max_width = self.limits
+        height = min(max(round(self.height / factor), 1), max_height)
+        self.width = min(max(round(self.width * height / self.height), 1), max_width)
+        self.height = height
+        self.top = round(row - y * self.height / self.size)
+        self.left = round(col - x * self.width / self.size)
+        self._clamp()
+
+    def fit(self, box: Tuple[int, int, int, int], margin: int = 1) -> None:
+        """Shows the (top, left, bottom, right) box of cells and a margin around it, keeping the aspect ratio."""
+        top, left, bottom, right = box
+        scale = max((bottom - top + 2 * margin) / self.shape[0], (right - left + 2 * margin) / self.shape[1])
+        max_height, max_width = self.limits
+        self.height = min(max(round(scale * self.shape[0]), 1), max_height)
+        self.width = min(max(round(scale * self.shape[1]), 1), max_width)
+        self.top = (top + bottom - self.height) // 2
+        self.left = (left + right - self.width) // 2
+        self._clamp()
+
+    def pan(self, x: float, y: float) -> None:
+        """Moves the window so that the board moves by the given number of pixels."""
+        self.top -= round(y * self.height / self.size)
+        self.left -= round(x * self.width / self.size)
+        self._clamp()
+
+
+class Renderer:
+    """
+    Renders the visible window of boards of cells to palette ("P" mode) images of the canvas size.
+
+    Boards are treated as palette indices (0 dead, 1 alive). Scaling is done by nearest neighbour sampling
+    through a cached map of the board cell covered by each pixel, so the cost of a frame depends on the canvas
+    size only, not on the board size. With a third color, grid lines are drawn into the frame at zoom levels of
+    at least `grid_min_zoom` pixels per cell. The map and the frame buffer are allocated once per view.
+    A view reaching outside of the board is rendered from the cells of the view only (`render_view`).
+    The image shares memory with the frame buffer, colors are applied by PIL only when the image is copied
+    to Tk. A renderer is not thread-safe, each thread is supposed to use its own.
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, int],
+        size: int,
+        colors: Sequence[Tuple[int, ...]],
+        grid_min_zoom: float = 4,
+    ) -> None:
+        self.shape = shape
+        self.size = size
+        self.palette = np.array(colors, dtype=np.uint8)
+        self.grid_min_zoom = grid_min_zoom
+
+        self.indices = np.zeros((size, size), dtype=np.uint8)
+        self._image = Image.frombuffer("P", (size, size), self.indices, "raw", "P", 0, 1)
+        self._image.putpalette(self.palette.tobytes())
+        self.set_view((0, 0, shape[0], shape[1]))
+
+    def set_view(self, view: Tuple[int, int, int, int]) -> None:
+        """Sets the (top, left, height, width) window of boards to be rendered."""
+        self.view = view
+        top, left, height, width = view
+
+        # cells of the view sampled by each pixel row/column (same as PIL's nearest neighbour resize)
+        view_rows = ((np.arange(self.size) + 0.5) * height / self.size).astype(np.intp)
+        view_cols = ((np.arange(self.size) + 0.5) * width / self.size).astype(np.intp)
+        self.row_index, self.col_index = top + view_rows, left + view_cols
+        # flat index of the cell of each pixel, in the view and on the board if the view lies within it
+        self._view_flat = view_rows[:, np.newaxis] * width + view_cols
+        self._flat: Optional[np.ndarray] = None
+        if top >= 0 and left >= 0 and top + height <= self.shape[0] and left + width <= self.shape[1]:
+            self._flat = self.row_index[:, np.newaxis] * self.shape[1] + self.col_index
+
+        # first pixel rows/columns of cells, drawn as grid lines
+        self.edge_rows = self.edge_cols = np.zeros(0, dtype=np.intp)
+        if len(self.palette) > EDGE and self.size / max(height, width) >= self.grid_min_zoom:
+            self.edge_rows = np.flatnonzero(np.diff(self.row_index, prepend=-1))
+            self.edge_cols = np.flatnonzero(np.diff(self.col_index, prepend=-1))
+
+    def _draw_edges(self, rows: slice, cols: slice) -> None:
+        """Draws grid lines into the given part of the frame buffer."""
+        edge_rows = self.edge_rows[(self.edge_rows >= rows.start) & (self.edge_rows < rows.stop)]
+        edge_cols = self.edge_cols[(self.edge_cols >= cols.start) & (self.edge_cols < cols.stop)]
+        self.indices[edge_rows, cols] = EDGE
+        self.indices[rows, edge_cols] = EDGE
+
+    def pixels(self, region: Tuple[int, int, int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """Returns (left, top, right, bottom) box of the pixels showing a (top, left, bottom, right) region, if any."""
+        top, left, bottom, right = region
+        y0, y1 = np.searchsorted(self.row_index, (top, bottom))
+        x0, x1 = np.searchsorted(self.col_index, (left, right))
+        if y0 == y1 or x0 == x1:
+            return None
+        return int(x0), int(y0), int(x1), int(y1)
+
+    def render(self, board: np.ndarray, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        Renders the board into the buffer of palette indices and returns it. If a (top, left, bottom, right)
+        region is given, only the pixels showing that region are redrawn, the rest of the buffer is kept.
+        """
+        if self._flat is None:
+            return self.render_view(board_region(board, *self.view))
+        cells = np.ascontiguousarray(board).reshape(-1)
+        if region is None:
+            np.take(cells, self._flat, out=self.indices, mode="clip")
+            if self.edge_rows.size:
+                self._draw_edges(slice(0, self.size), slice(0, self.size))
+            return self.indices
+
+        top, left, bottom, right = region
+        rows = slice(*np.searchsorted(self.row_index, (top, bottom)))
+        cols = slice(*np.searchsorted(self.col_index, (left, right)))
+        self.indices[rows, cols] = cells[self._flat[rows, cols]]
+        if self.edge_rows.size:
+            self._draw_edges(rows, cols)
+        return self.indices
+
+    def render_view(self, cells: np.ndarray) -> np.ndarray:
+        """Renders the cells of the view (e.g. `Engine.region` of it) into the buffer of palette indices."""
+        np.take(np.ascontiguousarray(cells).reshape(-1), self._view_flat, out=self.indices, mode="clip")
+        if self.edge_rows.size:
+            self._draw_edges(slice(0, self.size), slice(0, self.size))
+        return self.indices
+
+    def image(self) -> Image.Image:
+        """Returns palette image of the last rendered board (sharing memory with the buffer)."""
+        return self._image
+
+    def rgb(self) -> np.ndarray:
+        """Returns the last rendered board as a new RGB array."""
+        return self.palette[self.indices]
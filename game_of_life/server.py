@@ -0,0 +1,396 @@
+"""
+Streaming of a headless simulation to any number of viewers over a local socket (TCP or Unix), driven by them.
+
+Clients send control messages as JSON lines, {"type": <Message type or SEEK>, ...}, e.g.
+{"type": "FAST_FORWARD", "content": 1024}, {"type": "SEEK", "generation": 100} or
+{"type": "EDIT_CELLS", "rows": [...], "cols": [...], "values": [...]}. LOAD_PATTERN takes the name of a file
+in the patterns directory of the server, and is refused if the server has none. FAST_FORWARD and SEEK may skip
+at most `max_skip` generations ahead.
+
+The server sends records of a kind byte, a generation and a payload length (see `RECORD`) followed by
+the payload: a HELLO with the board shape and rule (JSON), generations either as a KEYFRAME (run lengths of
+alternating dead and alive cells of the flattened board) or as a DELTA (XOR delta against the generation
+sent to the client before, see `history.encode_delta`), and ERRORs (UTF-8 text). Every client is sent the
+newest generation whenever it is ready to receive one, generations computed meanwhile are dropped for it,
+so slow clients never stall the simulation nor the other clients.
+"""
+import asyncio
+import json
+import os
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from game_of_life import config, logger
+from game_of_life.engines import BOARD_DTYPE
+from game_of_life.history import HistoryReader, HistoryWriter, apply_delta, encode_delta
+from game_of_life.messages import Message
+from game_of_life.patterns import read_pattern
+from game_of_life.simulation import Simulation
+
+# record header: kind of the record, generation, length of the payload
+RECORD = struct.Struct("<cqI")
+HELLO = b"H"
+KEYFRAME = b"K"
+DELTA = b"D"
+ERROR = b"E"
+# control message seeking a generation, besides the `Message` types
+SEEK = "SEEK"
+# bytes buffered for a client by the kernel, so that a slow client is not sent generations long outdated
+SEND_BUFFER = 1 << 16
+
+
+def encode_runs(board: np.ndarray) -> bytes:
+    """Encodes a board as run lengths of alternating dead and alive cells of the flattened board, dead first."""
+    flat = board.reshape(-1) != 0
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0] if flat[0] == 0 else [0, 0], changes, [flat.size]))
+    return np.diff(bounds).astype(np.uint32).tobytes()
+
+
+def decode_runs(data: bytes, shape: Tuple[int, int]) -> np.ndarray:
+    """Inverse of `encode_runs`."""
+    runs = np.frombuffer(data, dtype=np.uint32)
+    values = np.arange(runs.size, dtype=BOARD_DTYPE) % 2
+    return np.repeat(values, runs).reshape(shape)
+
+
+class _Generation:
+    """Published generation, bit-packed, with its run-length encoding computed once for all clients."""
+
+    def __init__(self, generation: int, board: np.ndarray) -> None:
+        self.generation = generation
+        self.board = board
+        self.packed = np.packbits(board != 0, axis=None)
+        self._runs: Optional[bytes] = None
+
+    @property
+    def runs(self) -> bytes:
+        if self._runs is None:
+            self._runs = encode_runs(self.board)
+        return self._runs
+
+
+class _Subscriber:
+    """Connected client: its stream and the generation it has been sent last."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.pending = asyncio.Event()
+        self.sent: Optional[_Generation] = None
+        self.dropped = 0
+
+    def record(self, kind: bytes, generation: int, payload: bytes) -> None:
+        self.writer.write(RECORD.pack(kind, generation, len(payload)) + payload)
+
+    def encode(self, newest: _Generation) -> Tuple[bytes, bytes]:
+        """Returns the smaller of keyframe and delta against the generation sent before."""
+        runs = newest.runs
+        if self.sent is None:
+            return KEYFRAME, runs
+        changed = np.count_nonzero(newest.packed != self.sent.packed)
+        if 5 * changed >= len(runs):
+            return KEYFRAME, runs
+        return DELTA, encode_delta(newest.packed ^ self.sent.packed)
+
+
+async def read_line(reader: asyncio.StreamReader) -> bytes:
+    """Returns the next line of a stream, empty at its end. A line over the limit of the reader is skipped whole."""
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+    except asyncio.LimitOverrunError as error:
+        consumed = error.consumed
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            break
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+    raise ValueError("Message is too long.")
+
+
+class FrameServer:
+    """
+    Server of a simulation stepped at `rate` generations per second (as fast as possible if 0).
+
+    Stepping and control messages are run by a single worker thread, so that the event loop keeps serving
+    clients meanwhile. Generations are recorded to `history`, if given, which allows seeking back.
+    Clients can load patterns from the `patterns` directory only, and skip at most `max_skip` generations
+    (`SERVER_MAX_SKIP` by default) by a single message.
+    """
+
+    def __init__(
+        self,
+        simulation: Simulation,
+        rate: float = 0,
+        history: Optional[str] = None,
+        patterns: Optional[str] = None,
+        max_skip: Optional[int] = None,
+    ) -> None:
+        self.simulation = simulation
+        self.patterns = None if patterns is None else os.path.realpath(patterns)
+        self.max_skip = config.getint("APP", "SERVER_MAX_SKIP") if max_skip is None else max_skip
+        self.rate_interval = 1 / rate if rate else 0.0
+        self.step_interval = self.rate_interval
+        self.paused = False
+        self.subscribers: Set[_Subscriber] = set()
+        self.newest = _Generation(simulation.generation, simulation.state().copy())
+        self.recorder: Optional[HistoryWriter] = None
+        if history is not None:
+            self.recorder = HistoryWriter(history, simulation.shape, config.getint("APP", "HISTORY_KEYFRAME_INTERVAL"))
+            self.recorder.append(simulation.generation, self.newest.board, keyframe=True)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulation")
+        self._resumed = asyncio.Event()
+        # set by `start`
+        self._server: asyncio.Server
+        self._stepping: asyncio.Task
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None) -> None:
+        """Starts serving on the Unix socket at the path, if given, or on the TCP address."""
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._serve, path)
+        else:
+            self._server = await asyncio.start_server(self._serve, host, port)
+        self._resumed.set()
+        self._stepping = asyncio.get_running_loop().create_task(self._step_loop())
+        logger.info(f"Serving {self.simulation.shape} board on {self.address}")
+
+    @property
+    def address(self) -> Any:
+        return self._server.sockets[0].getsockname()
+
+    async def close(self) -> None:
+        self._stepping.cancel()
+        self._server.close()
+        for subscriber in list(self.subscribers):
+            subscriber.writer.close()
+        await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+        if self.recorder is not None:
+            self.recorder.close()
+
+    async def _run(self, fn: Any, *args: Any) -> Any:
+        """Runs a function with the simulation in the worker thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _snapshot(self, keyframe: bool = False) -> _Generation:
+        """Captures the current generation (in the worker thread), recording it if recording."""
+        newest = _Generation(self.simulation.generation, self.simulation.state().copy())
+        if self.recorder is not None:
+            self.recorder.append(newest.generation, newest.board, keyframe)
+        return newest
+
+    def _step(self) -> _Generation:
+        self.simulation.step()
+        return self._snapshot()
+
+    def _publish(self, newest: _Generation) -> None:
+        self.newest = newest
+        for subscriber in self.subscribers:
+            if subscriber.pending.is_set():
+                subscriber.dropped += 1
+            subscriber.pending.set()
+
+    async def _step_loop(self) -> None:
+        next_step = time.perf_counter()
+        while True:
+            if self.paused:
+                await self._resumed.wait()
+                next_step = time.perf_counter()
+            self._publish(await self._run(self._step))
+
+            now = time.perf_counter()
+            next_step = max(next_step + self.step_interval, now - self.step_interval)
+            # yield to the clients even when stepping as fast as possible
+            await asyncio.sleep(max(0.0, next_step - now))
+
+    def _set_paused(self, paused: bool) -> None:
+        self.paused = paused
+        if paused:
+            self._resumed.clear()
+        else:
+            self._resumed.set()
+
+    def _handle(self, msg: Dict[str, Any]) -> _Generation:
+        """Applies a control message to the simulation (in the worker thread), returns the resulting generation."""
+        kind, content = msg.get("type"), msg.get("content")
+        simulation = self.simulation
+        if kind == Message.CLEAN_INIT:
+            simulation.reset(random=False)
+        elif kind == Message.RANDOM_INIT:
+            simulation.reset(random=True, density=msg.get("density", 0.5), seed=msg.get("seed"))
+        elif kind == Message.STEP:
+            simulation.step()
+            return self._snapshot()
+        elif kind == Message.FAST_FORWARD:
+            simulation.advance(int(msg["content"]))
+        elif kind == Message.LOAD_PATTERN:
+            board, rule = read_pattern(self._pattern_path(str(content)), shape=simulation.shape)
+            if rule is not None and rule != simulation.engine.rule:
+                logger.warning(f"Pattern of rule {rule} is simulated with rule {simulation.engine.rule}.")
+            simulation.load(board)
+        elif kind == Message.IMG_UPDATE:
+            simulation.load(np.asarray(content, dtype=BOARD_DTYPE).reshape(simulation.shape))
+        elif kind == Message.EDIT_CELLS:
+            simulation.edit(np.asarray(msg["rows"]), np.asarray(msg["cols"]), np.asarray(msg["values"], BOARD_DTYPE))
+        elif kind == SEEK:
+            self._seek(int(msg["generation"]))
+        else:
+            raise ValueError(f"Unsupported message type '{kind}'.")
+        return self._snapshot(keyframe=True)
+
+    def _check_skip(self, msg: Dict[str, Any]) -> None:
+        """Refuses to skip a non-positive number of generations, or more than `max_skip` of them."""
+        if msg.get("type") == Message.FAST_FORWARD:
+            generations = int(msg["content"])
+            if not 0 < generations <= self.max_skip:
+                raise ValueError(f"Cannot skip {generations} generations, at most {self.max_skip} at once.")
+        elif msg.get("type") == SEEK:
+            generation = int(msg["generation"])
+            if not 0 <= generation <= self.newest.generation + self.max_skip:
+                raise ValueError(f"Cannot seek generation {generation}, at most {self.max_skip} generations ahead.")
+
+    def _pattern_path(self, name: str) -> str:
+        """Returns path of a pattern file of the patterns directory, refusing paths leading out of it."""
+        if self.patterns is None:
+            raise ValueError("Loading patterns is not enabled on this server.")
+        path = os.path.realpath(os.path.join(self.patterns, name))
+        if os.path.commonpath((path, self.patterns)) != self.patterns:
+            raise ValueError(f"Pattern '{name}' is not in the patterns directory.")
+        return path
+
+    def _seek(self, generation: int) -> None:
+        """Computes the given generation, an earlier one from the closest generation recorded before it."""
+        if generation < self.simulation.generation:
+            if self.recorder is None:
+                raise ValueError("Seeking back needs the generations to be recorded.")
+            reader = HistoryReader(self.recorder.path)
+            try:
+                index = reader.find(generation)
+                self.simulation.load(reader.seek(index), reader.generations[index])
+            finally:
+                reader.close()
+            # the history goes on from the loaded generation
+            self.recorder.truncate(self.simulation.generation)
+        self.simulation.advance(generation - self.simulation.generation)
+
+    async def _control(self, subscriber: _Subscriber, line: bytes) -> None:
+        try:
+            msg = json.loads(line)
+            if not isinstance(msg, dict):
+                raise ValueError("Message is not a JSON object.")
+            kind = msg.get("type")
+            if kind == Message.PAUSE:
+                self._set_paused(True)
+            elif kind == Message.RESUME:
+                self._set_paused(False)
+            elif kind == Message.TURBO:
+                self.step_interval = 0.0 if msg.get("content", True) else self.rate_interval
+            else:
+                # checked before the message gets to the worker thread
+                self._check_skip(msg)
+                self._publish(await self._run(self._handle, msg))
+        except (ValueError, KeyError, TypeError, OSError) as error:
+            logger.warning(f"Message {line!r} failed: {error}")
+            subscriber.record(ERROR, self.newest.generation, str(error).encode())
+
+    async def _send(self, subscriber: _Subscriber) -> None:
+        """Sends the newest generation whenever there is a new one and the client has received the previous one."""
+        while True:
+            await subscriber.pending.wait()
+            subscriber.pending.clear()
+            newest = self.newest
+            kind, payload = subscriber.encode(newest)
+            subscriber.record(kind, newest.generation, payload)
+            subscriber.sent = newest
+            # backpressure of this client only, generations published meanwhile are dropped for it
+            await subscriber.writer.drain()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        subscriber = _Subscriber(writer)
+        hello = dict(shape=list(self.simulation.shape), rule=self.simulation.engine.rule)
+        subscriber.record(HELLO, self.newest.generation, json.dumps(hello).encode())
+        subscriber.pending.set()
+        self.subscribers.add(subscriber)
+        sending = asyncio.get_running_loop().create_task(self._send(subscriber))
+        try:
+            while True:
+                try:
+                    line = await read_line(reader)
+                except ValueError as error:
+                    logger.warning(f"Message failed: {error}")
+                    subscriber.record(ERROR, self.newest.generation, str(error).encode())
+                    continue
+                if not line:
+                    break
+                await self._control(subscriber, line)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            sending.cancel()
+            writer.close()
+            logger.debug(f"Client disconnected, {subscriber.dropped} generations dropped for it")
+
+
+class FrameClient:
+    """Client of a `FrameServer`, keeping the newest generation received."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.shape: Tuple[int, int] = (0, 0)
+        self.rule = ""
+        self.generation = -1
+        self.board = np.zeros(self.shape, dtype=BOARD_DTYPE)
+        self._packed = np.zeros(0, dtype=np.uint8)
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None) -> "FrameClient":
+        if path is not None:
+            client = cls(*await asyncio.open_unix_connection(path))
+        else:
+            client = cls(*await asyncio.open_connection(host, port))
+        kind, generation, payload = await client._record()
+        hello = json.loads(payload)
+        client.shape, client.rule = tuple(hello["shape"]), hello["rule"]
+        return client
+
+    async def send(self, kind: str, **content: Any) -> None:
+        """Sends a control message, e.g. send(Message.FAST_FORWARD, content=100) or send(SEEK, generation=10)."""
+        self.writer.write(json.dumps(dict(type=kind, **content)).encode() + b"\n")
+        await self.writer.drain()
+
+    async def _record(self) -> Tuple[bytes, int, bytes]:
+        kind, generation, length = RECORD.unpack(await self.reader.readexactly(RECORD.size))
+        return kind, generation, await self.reader.readexactly(length)
+
+    async def receive(self) -> Tuple[int, np.ndarray]:
+        """Waits for the next generation, returns its number and cells. Raises ValueError on server errors."""
+        kind, generation, payload = await self._record()
+        if kind == ERROR:
+            raise ValueError(payload.decode())
+        if kind == KEYFRAME:
+            self.board = decode_runs(payload, self.shape)
+            self._packed = np.packbits(self.board, axis=None)
+        else:
+            apply_delta(self._packed, payload)
+            size = self.shape[0] * self.shape[1]
+            self.board = np.unpackbits(self._packed, count=size).reshape(self.shape)
+        self.generation = generation
+        return generation, self.board
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
@@ -0,0 +1,266 @@
+"""Simulation core shared by the GUI worker thread and the headless runner."""
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from game_of_life import config, logger
+from game_of_life.cycles import Cycle, CycleDetector
+from game_of_life.engines import BOARD_DTYPE, CONWAY, BitPackedEngine, Engine, LookupEngine, get_engine, normalize_rule
+from game_of_life.engines.base import board_bounding_box, board_region, check_generations
+from game_of_life.metrics import STEP, metrics
+from game_of_life.stats import Stats
+
+# number of cells of random initial states generated at once
+RANDOM_CHUNK = 1 << 20
+
+
+class Simulation:
+    """Board of cells evolved by an engine, free of any GUI dependencies."""
+
+    def __init__(
+        self,
+        shape: Tuple[int, int],
+        engine: str,
+        memory_budget: Optional[int] = None,
+        detect_cycles: Optional[bool] = None,
+        rule: Optional[str] = None,
+        stats: Optional[bool] = None,
+    ) -> None:
+        """
+        Creates simulation of a board of the given shape. If the board storage of the chosen engine would exceed
+        the memory budget (in MB, APP/MEMORY_BUDGET by default, 0 for no limit), the bit-packed engine is used.
+        Rules other than Conway's (the B/S rulestring, APP/RULE by default) are computed by the lookup engine.
+
+        With cycle detection (APP/DETECT_CYCLES by default), still lifes and oscillators reached by stepping
+        are detected. Once all generations of a period up to APP/CYCLE_MAX_PERIOD are cached, the engine
+        is no longer stepped and the following generations are served from the cache. Unbounded engines are
+        not checked for cycles.
+
+        With statistics (APP/STATS by default), population, births and deaths, bounding box and activity
+        are maintained from the changes reported by the engine, see `statistics`.
+        """
+        self.shape = shape
+        if memory_budget is None:
+            memory_budget = config.getint("APP", "MEMORY_BUDGET")
+
+        engine_cls = get_engine(engine)
+        rule = normalize_rule(rule or config["APP"]["RULE"])
+        if rule != CONWAY and engine_cls is not LookupEngine:
+            logger.warning(
+                f"'{engine_cls.name}' engine computes {CONWAY} only; using '{LookupEngine.name}' engine for {rule}."
+            )
+            engine_cls = LookupEngine
+
+        # the bit-packed engine computes Conway's rule only
+        estimate = engine_cls.estimate_bytes(shape)
+        if rule == CONWAY and memory_budget and estimate > memory_budget * 2**20:
+            logger.warning(
+                f"Board of '{engine_cls.name}' engine would take {estimate / 2**20:.1f} MB, "
+                f"over the budget of {memory_budget} MB; using '{BitPackedEngine.name}' engine instead."
+            )
+            engine_cls = BitPackedEngine
+
+        self.engine: Engine = LookupEngine(shape, rule) if engine_cls is LookupEngine else engine_cls(shape)
+
+        if detect_cycles is None:
+            detect_cycles = config.getboolean("APP", "DETECT_CYCLES")
+        self.detector: Optional[CycleDetector] = None
+        # the board of unbounded engines is only a window, repeating windows do not mean a cycle
+        if detect_cycles and not self.engine.unbounded:
+            self.detector = CycleDetector(config.getint("APP", "CYCLE_WINDOW"))
+        self.max_period = config.getint("APP", "CYCLE_MAX_PERIOD")
+        self.cycle: Optional[Cycle] = None
+        # generation served from the complete cycle, None while the engine is stepped
+        self._generation: Optional[int] = None
+
+        if stats is None:
+            stats = config.getboolean("APP", "STATS")
+        self.stats: Optional[Stats] = None
+        if stats:
+            self.stats = Stats(shape, config.getfloat("APP", "STATS_DECAY"), config.getint("APP", "STATS_WINDOW"))
+        # whether the statistics lag behind generations whose changes are not known
+        self._stats_stale = False
+        logger.info(f"Simulation of {shape} board with '{self.engine.name}' engine, board takes {self.engine.nbytes} B.")
+
+    def reset(self, random: bool = True, density: float = 0.5, seed: Optional[int] = None) -> None:
+        """Sets starting cell generation, either random with the given density of alive cells or empty."""
+        board = np.zeros(self.shape, dtype=BOARD_DTYPE)
+        if random:
+            # generated by chunks of rows, so that no float array of the board size is needed
+            rng = np.random.default_rng(seed)
+            rows = max(1, RANDOM_CHUNK // max(self.shape[1], 1))
+            for top in range(0, self.shape[0], rows):
+                chunk = board[top:top + rows]
+                np.less(rng.random(chunk.shape, dtype=np.float32), density, out=chunk)
+        self.load(board)
+
+    def load(self, array: np.ndarray, generation: Optional[int] = None) -> None:
+        """Sets the current generation of cells, and its number if given."""
+        self._forget_cycle()
+        self.engine.load(array)
+        if generation is not None:
+            self.engine.generation = generation
+        if self.stats is not None:
+            self.stats.rescan(np.asarray(array), self.engine.generation)
+            self._stats_stale = False
+        self._restart_detection()
+
+    def snapshot(self) -> Any:
+        """Returns the current generation of cells in a form taken back by `restore`, see `Engine.snapshot`."""
+        if self._generation is not None:
+            return self.state()
+        return self.engine.snapshot()
+
+    def restore(self, snapshot: Any, generation: int) -> None:
+        """Sets a generation of cells taken by `snapshot` and its number."""
+        self._forget_cycle()
+        self.engine.restore(snapshot)
+        self.engine.generation = generation
+        if self.stats is not None:
+            self.stats.rescan(self.engine.state(), generation)
+            self._stats_stale = False
+        self._restart_detection()
+
+    def _forget_cycle(self) -> None:
+        """Drops the detected cycle, the engine continues from the current generation."""
+        if self._generation is not None:
+            self.engine.generation = self._generation
+        self.cycle = None
+        self._generation = None
+
+    def _restart_detection(self) -> None:
+        if self.detector is not None:
+            self.detector.reset()
+            self._detect()
+
+    def edit(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> None:
+        """Sets cells at the given positions to the given values."""
+        if self._generation is not None:
+            # the engine has not been stepped since the cycle was cached
+            self.load(self.state())
+        self._forget_cycle()
+        self.engine.edit(rows, cols, values)
+        self._stats_stale = True
+        self._restart_detection()
+
+    def state(self) -> np.ndarray:
+        """Returns the current generation of cells."""
+        if self._generation is not None and self.cycle is not None:
+            return self.cycle.state(self._generation)
+        return self.engine.state()
+
+    def region(self, top: int, left: int, height: int, width: int) -> np.ndarray:
+        """Returns the given rectangle of the current generation, see `Engine.region`."""
+        if self._generation is not None:
+            return board_region(self.state(), top, left, height, width)
+        return self.engine.region(top, left, height, width)
+
+    def bounding_box(self) -> Optional[Tuple[int, int, int, int]]:
+        """Returns (top, left, bottom, right) of the alive cells of the current generation, if any."""
+        if self._generation is not None:
+            return board_bounding_box(self.state())
+        return self.engine.bounding_box()
+
+    def step(self) -> None:
+        """Calculates the next generation of cells."""
+        if self._generation is not None:
+            self._generation += 1
+            self._stats_stale = True
+            return
+        with metrics.timer(STEP):
+            self.engine.step()
+        self._update_stats()
+        self._detect()
+
+    def advance(self, generations: int) -> None:
+        """Calculates the given number of generations ahead."""
+        check_generations(generations)
+        if self._generation is not None:
+            self._generation += generations
+        else:
+            self.engine.advance(generations)
+            self._detect()
+        self._stats_stale = True
+
+    def _update_stats(self) -> None:
+        """Adds the changes of the last step to the statistics, if known."""
+        if self.stats is None or self._stats_stale:
+            return
+        # computed by the engine on each access
+        changes = self.engine.changes
+        if changes is None:
+            self._stats_stale = True
+            return
+        self.stats.update(*changes, self.engine.generation)
+
+    def statistics(self) -> Optional[Stats]:
+        """
+        Returns statistics of the current generation, None if disabled. Generations whose changes are not
+        known (other engines, cached cycles, multiple generations at once) are caught up with here, by comparing
+        the current board with the one seen before.
+        """
+        if self.stats is not None and self._stats_stale:
+            self.stats.observe(self.state(), self.generation)
+            self._stats_stale = False
+        return self.stats
+
+    def _detect(self) -> None:
+        """Looks for a cycle closed by the current generation, or caches the next generation of a detected one."""
+        if self.detector is None or (self.cycle is not None and not self.cycle.cached):
+            return
+        generation = self.engine.generation
+
+        if self.cycle is not None:
+            if generation == self.cycle.start + self.cycle.period + len(self.cycle):
+                self.cycle.add(self.engine.state())
+                if self.cycle.complete:
+                    self._generation = generation
+                return
+            # generations skipped while caching the cycle, detect it again
+            self.cycle = None
+
+        # the hash follows the cells changed by the step, the board is only fetched when they are not known
+        changes = self.engine.changes if self.detector.generation == generation - 1 else None
+        board = self.engine.state() if changes is None else None
+        period = self.detector.update(board, generation, changes)
+        if period is None:
+            return
+        self.cycle = Cycle(generation - period, period, self.shape, cached=period <= self.max_period)
+        logger.info(f"Cycle detected: {self.cycle}.")
+        if self.cycle.cached:
+            self.cycle.add(self.engine.state() if board is None else board)
+            if self.cycle.complete:
+                self._generation = generation
+
+    def cycle_phase(self) -> Optional[int]:
+        """Returns phase of the current generation in the cycle it is served from, None if computed by the engine."""
+        if self._generation is None or self.cycle is None:
+            return None
+        return self.cycle.phase(self._generation)
+
+    def dirty_regions(self) -> Optional[List[Tuple[int, int, int, int]]]:
+        """Returns regions changed by the last step, None if unknown."""
+        if self._generation is not None:
+            return None
+        return self.engine.dirty_regions()
+
+    def close(self) -> None:
+        """Releases resources held by the engine."""
+        self.engine.close()
+
+    @property
+    def generation(self) -> int:
+        if self._generation is not None:
+            return self._generation
+        return self.engine.generation
+
+    @property
+    def population(self) -> int:
+        if self._generation is not None and self.cycle is not None:
+            return self.cycle.population(self._generation)
+        return self.engine.population
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the board storage in bytes."""
+        return self.engine.nbytes
@@ -0,0 +1,111 @@
+"""Population statistics and activity heatmap maintained from the cells born and died in each generation."""
+from collections import deque
+from typing import Deque, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+class Snapshot(NamedTuple):
+    """Statistics of a generation, small enough to be passed between threads and processes."""
+    generation: int
+    population: int
+    births: int
+    deaths: int
+    bounding_box: Optional[Tuple[int, int, int, int]]
+    # (generation, population, births, deaths) of the last generations
+    history: np.ndarray
+    heatmap: np.ndarray
+
+
+class Stats:
+    """
+    Running population, births and deaths, bounding box and decaying per-cell activity of a board.
+
+    Updates take the flat indices of the cells born and died, so their cost is proportional to the number
+    of changes: populations of rows and columns give the bounding box, and the activity of a cell is decayed
+    lazily, from the generation it last changed in, only when the heatmap is read. Boards of engines not
+    reporting the changes are `observe`d instead, diffed against the previously observed board.
+    """
+
+    def __init__(self, shape: Tuple[int, int], decay: float = 0.95, window: int = 512) -> None:
+        self.shape = shape
+        self.decay = decay
+        self.history: Deque[Tuple[int, int, int, int]] = deque(maxlen=window)
+        self._heat = np.zeros(shape[0] * shape[1], dtype=np.float32)
+        self._heat_generation = np.zeros(shape[0] * shape[1], dtype=np.int64)
+        self._row_population = np.zeros(shape[0], dtype=np.int64)
+        self._col_population = np.zeros(shape[1], dtype=np.int64)
+        self._board: Optional[np.ndarray] = None
+        self.generation = 0
+        self.population = 0
+        self.births = 0
+        self.deaths = 0
+        self.total_births = 0
+        self.total_deaths = 0
+
+    def rescan(self, board: np.ndarray, generation: int) -> None:
+        """Recounts the population of a board whose changes are not known, keeping the activity."""
+        alive = board != 0
+        self._row_population[:] = np.count_nonzero(alive, axis=1)
+        self._col_population[:] = np.count_nonzero(alive, axis=0)
+        self.population = int(self._row_population.sum())
+        self.generation = generation
+        self.births = self.deaths = 0
+        self._board = None
+        self.history.append((generation, self.population, 0, 0))
+
+    def update(self, born: np.ndarray, died: np.ndarray, generation: int) -> None:
+        """Adds a generation given by flat indices of the cells born and died since the previous one."""
+        self.births, self.deaths = born.size, died.size
+        self.total_births += born.size
+        self.total_deaths += died.size
+        self.population += born.size - died.size
+        self.generation = generation
+        self._board = None
+
+        width = self.shape[1]
+        for cells, sign in ((born, 1), (died, -1)):
+            if cells.size:
+                self._row_population += sign * np.bincount(cells // width, minlength=self.shape[0])
+                self._col_population += sign * np.bincount(cells % width, minlength=self.shape[1])
+        changed = np.concatenate((born, died))
+        self._heat[changed] = self._decayed(changed) + 1
+        self._heat_generation[changed] = generation
+        self.history.append((generation, self.population, self.births, self.deaths))
+
+    def observe(self, board: np.ndarray, generation: int) -> None:
+        """Adds a board, its changes since the previously observed one counted as a single generation."""
+        if self._board is None:
+            self.rescan(board, generation)
+        else:
+            flat, previous = board.reshape(-1), self._board.reshape(-1)
+            changed = np.flatnonzero(flat != previous)
+            alive = flat[changed] != 0
+            self.update(changed[alive], changed[~alive], generation)
+        self._board = board.copy()
+
+    def _decayed(self, cells: np.ndarray) -> np.ndarray:
+        age = (self.generation - self._heat_generation[cells]).astype(np.float32)
+        return self._heat[cells] * np.float32(self.decay) ** age
+
+    def heatmap(self, size: Optional[int] = None) -> np.ndarray:
+        """Returns activity of the cells decayed to the current generation, as maxima of blocks if a size is given."""
+        heat = self._decayed(np.arange(self._heat.size)).reshape(self.shape)
+        if size is None or max(self.shape) <= size:
+            return heat
+        rows = np.linspace(0, self.shape[0], min(size, self.shape[0]) + 1).astype(np.intp)[:-1]
+        cols = np.linspace(0, self.shape[1], min(size, self.shape[1]) + 1).astype(np.intp)[:-1]
+        return np.maximum.reduceat(np.maximum.reduceat(heat, rows, axis=0), cols, axis=1)
+
+    def bounding_box(self) -> Optional[Tuple[int, int, int, int]]:
+        """Returns (top, left, bottom, right) of the alive cells with exclusive bottom and right, if any."""
+        rows, cols = np.flatnonzero(self._row_population), np.flatnonzero(self._col_population)
+        if rows.size == 0:
+            return None
+        return int(rows[0]), int(cols[0]), int(rows[-1]) + 1, int(cols[-1]) + 1
+
+    def snapshot(self, heatmap_size: int = 128) -> Snapshot:
+        return Snapshot(
+            self.generation, self.population, self.births, self.deaths, self.bounding_box(),
+            np.array(self.history, dtype=np.int64).reshape(-1, 4), self.heatmap(heatmap_size),
+        )
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+from game_of_life import benchmark
+
+# cold import of the CLI, SciPy alone takes seconds
+IMPORT_BUDGET = 1.0
+
+
+def test_benchmark_results_and_regressions() -> None:
+    results = benchmark.run_benchmarks(sizes=(20,), densities=(0.5,), engine="bitpacked", min_time=0.01)
+    stages = {result["stage"] for result in results["results"]}
+    assert {"import", "step", "render", "queue"} <= stages
+    assert all(result["allocated"] >= 0 for result in results["results"] if result["stage"] == "step")
+
+    assert benchmark.compare(results, results) == []
+
+    faster = {"results": [dict(result, time=result["time"] / 2) for result in results["results"]]}
+    assert len(benchmark.compare(faster, results, tolerance=0.5)) == len(results["results"])
+
+
+def test_startup_does_not_import_heavy_modules() -> None:
+    code = "import sys, game_of_life.cli, game_of_life.processing; print(*sorted(sys.modules))"
+    modules = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    assert not [module for module in modules if module.split(".")[0] in ("scipy", "tkinter")]
+    assert "PIL.ImageTk" not in modules
+
+
+def test_startup_import_time() -> None:
+    assert benchmark.bench_import("game_of_life.cli") < IMPORT_BUDGET
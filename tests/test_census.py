@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from game_of_life.census import Census, Classifier, search
+from game_of_life.cli import main
+
+BLOCK = np.array([[1, 1], [1, 1]], dtype=np.uint8)
+BEEHIVE = np.array([[0, 1, 1, 0], [1, 0, 0, 1], [0, 1, 1, 0]], dtype=np.uint8)
+BLINKER = [np.array([[0, 0, 0], [1, 1, 1], [0, 0, 0]], dtype=np.uint8), np.array([[0, 1, 0]] * 3, dtype=np.uint8)]
+
+
+def test_objects_are_classified_under_rotation_reflection_and_phase() -> None:
+    classifier = Classifier()
+    beehive, _ = classifier.classify([BEEHIVE])
+    assert beehive.startswith("xs6_")
+    assert classifier.classify([BEEHIVE.T])[0] == beehive
+    assert classifier.classify([np.pad(BEEHIVE, 2)])[0] == beehive
+
+    blinker, cells = classifier.classify(BLINKER)
+    assert blinker.startswith("xp2_") and cells.shape == (1, 3)
+    assert classifier.classify(BLINKER[::-1])[0] == blinker
+    # a still life on a board of period 2
+    assert classifier.classify([BLOCK, BLOCK])[0].startswith("xs4_")
+    assert (classifier.hits, classifier.misses) == (1, 5)
+
+
+def test_census_counts_components_of_settled_board() -> None:
+    phases = [np.zeros((24, 24), dtype=np.uint8) for _ in range(2)]
+    for phase, blinker in zip(phases, BLINKER):
+        phase[3:5, 3:5] = BLOCK
+        phase[10:12, 10:12] = BLOCK
+        phase[3:6, 15:18] = blinker
+        phase[0:2, 20:22] = BLOCK
+
+    census = Census("B3/S23", 24, 8, 0.5)
+    census.add(phases, Classifier())
+    assert sorted(census.counts.values()) == [1, 2]
+    assert census.boundary == 1
+    assert sorted(census.objects.values()) == [["OO", "OO"], ["OOO"]]
+
+
+def test_search_is_the_same_in_any_batches_and_processes(tmp_path: Path) -> None:
+    settings = dict(size=32, soup_size=8, generations=1000)
+    census = search(12, seed=3, batch=4, workers=2, **settings)
+    assert census.runs == [(3, 0, 12)] and census.soups == 12
+    assert sum(census.counts.values()) > 12
+
+    first = search(5, seed=3, batch=3, workers=1, **settings)
+    first.merge(search(7, seed=3, start=5, batch=7, workers=1, **settings))
+    assert first.counts == census.counts
+    assert (first.runs, first.unsettled, first.boundary) == (census.runs, census.unsettled, census.boundary)
+
+    path = str(tmp_path / "census.json")
+    census.save(path)
+    loaded = Census.load(path)
+    assert loaded.counts == census.counts and loaded.objects == census.objects and loaded.runs == census.runs
+
+    with pytest.raises(ValueError, match="already"):
+        loaded.merge(first)
+    with pytest.raises(ValueError, match="cannot be merged"):
+        loaded.merge(Census("B36/S23", 32, 8, 0.5))
+
+
+def test_census_command_continues_saved_census(tmp_path: Path, capsys) -> None:
+    path = str(tmp_path / "census.json")
+    args = ["census", "--soups", "4", "--size", "24", "--soup-size", "6", "--workers", "1", "--output", path]
+    assert main(args) == 0
+    assert main(args) == 0
+    assert "soups 4..8 of seed 0" in capsys.readouterr().out
+    census = Census.load(path)
+    assert census.runs == [(0, 0, 8)] and census.soups == 8
+
+
+def test_census_command_rejects_incompatible_census(tmp_path: Path) -> None:
+    path = str(tmp_path / "census.json")
+    Census("B36/S23", 24, 6, 0.5).save(path)
+    assert main(["census", "--soups", "4", "--size", "24", "--soup-size", "6", "--output", path]) == 1
+    assert Census.load(path).soups == 0
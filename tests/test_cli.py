@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from game_of_life.cli import main
+
+
+def test_headless_run(tmp_path: Path, capsys) -> None:
+    output = tmp_path / "final.npy"
+    assert main(["run", "--size", "32", "--generations", "5", "--seed", "1", "--output", str(output)]) == 0
+
+    report = capsys.readouterr().out
+    assert "generations: 5" in report
+    assert f"population:  {int(np.load(output).sum())}" in report
+
+
+def test_headless_run_does_not_import_gui() -> None:
+    code = (
+        "import sys; from game_of_life.cli import main; main(['run', '--size', '8', '--generations', '1']); "
+        "assert not {'tkinter', 'PIL'} & set(sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+
+
+def test_headless_run_from_pattern(tmp_path: Path, capsys) -> None:
+    pattern, output = tmp_path / "blinker.cells", tmp_path / "final.rle"
+    pattern.write_text("!Name: blinker\nOOO\n")
+    assert main(["run", "--size", "9", "--generations", "3", "--input", str(pattern), "--output", str(output)]) == 0
+
+    assert "population:  3" in capsys.readouterr().out
+    assert "x = 9, y = 9" in output.read_text()
+
+
+def test_headless_run_records_history(tmp_path: Path) -> None:
+    history = tmp_path / "run.golh"
+    assert main(["run", "--size", "16", "--generations", "10", "--seed", "1", "--history", str(history)]) == 0
+
+    from game_of_life.history import HistoryReader
+    assert HistoryReader(str(history)).generations == list(range(11))
+
+
+def test_headless_run_keeps_rule_of_pattern(tmp_path: Path, capsys) -> None:
+    pattern, output = tmp_path / "replicator.rle", tmp_path / "final.rle"
+    pattern.write_text("x = 3, y = 3, rule = B36/S23\nb2o$obo$3o!\n")
+    assert main(["run", "--size", "16", "--generations", "4", "--input", str(pattern), "--output", str(output)]) == 0
+
+    assert "rule:        B36/S23" in capsys.readouterr().out
+    assert "rule = B36/S23" in output.read_text()
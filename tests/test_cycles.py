@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from game_of_life.cycles import CycleDetector, board_hash
+from game_of_life.engines import ENGINES, ConvolveEngine
+from game_of_life.simulation import Simulation
+
+
+def test_incremental_hash_matches_full_hash() -> None:
+    engine = ConvolveEngine((40, 40))
+    engine.load((np.random.default_rng(1).random((40, 40)) < 0.4).astype(np.uint8))
+    detector = CycleDetector()
+    for _ in range(20):
+        detector.update(engine.state(), engine.generation)
+        assert detector.hash == board_hash(engine.state())
+        engine.step()
+
+
+@pytest.mark.parametrize("name", ["bitpacked", "buffered", "convolve", "lookup", "tiled"])
+def test_hash_follows_changes_reported_by_engine(name: str) -> None:
+    engine = ENGINES[name]((40, 70))
+    engine.load((np.random.default_rng(2).random((40, 70)) < 0.4).astype(np.uint8))
+    detector = CycleDetector()
+    detector.update(engine.state(), engine.generation)
+    # changes are not known after a load
+    assert engine.changes is None
+    for _ in range(20):
+        engine.step()
+        assert engine.changes is not None
+        detector.update(None, engine.generation, engine.changes)
+        assert detector.hash == board_hash(engine.state())
+
+    with pytest.raises(ValueError):
+        detector.update(None, engine.generation + 2, engine.changes)
+
+
+def test_settled_soup_is_served_from_cycle_cache() -> None:
+    simulation = Simulation((32, 32), "convolve")
+    simulation.reset(density=0.3, seed=0)
+    reference = ConvolveEngine((32, 32))
+    reference.load(simulation.state())
+
+    for _ in range(500):
+        simulation.step()
+        reference.step()
+        assert np.array_equal(simulation.state(), reference.state())
+    assert simulation.cycle is not None and simulation.cycle.complete
+    assert simulation.engine.generation < 100
+
+    simulation.advance(10001)
+    reference.advance(10001)
+    assert np.array_equal(simulation.state(), reference.state())
+    assert simulation.population == reference.population
+
+    generation = simulation.generation
+    with pytest.raises(ValueError):
+        simulation.advance(-1)
+    assert simulation.generation == generation
+
+
+def test_unbounded_engine_is_not_checked() -> None:
+    assert Simulation((16, 16), "hashlife").detector is None
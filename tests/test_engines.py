@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+
+from game_of_life.engines import (
+    BitPackedEngine, BufferedEngine, ConvolveEngine, HashLifeEngine, ParallelEngine, SparseEngine, TiledEngine, get_engine
+)
+
+
+def run(engine_cls: type, board: np.ndarray, generations: int) -> np.ndarray:
+    engine = engine_cls(board.shape)
+    engine.load(board)
+    engine.advance(generations)
+    return engine.state()
+
+
+@pytest.mark.parametrize("shape", [(20, 20), (1, 1), (3, 64), (50, 65), (17, 200)])
+@pytest.mark.parametrize("density", [0.1, 0.35, 0.8])
+def test_bitpacked_matches_convolve(shape: tuple, density: float) -> None:
+    rng = np.random.default_rng(sum(shape))
+    board = (rng.random(shape) < density).astype(np.int64)
+
+    for generations in (1, 2, 10):
+        expected = run(ConvolveEngine, board, generations)
+        result = run(BitPackedEngine, board, generations)
+        assert np.array_equal(result, expected)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (20, 20), (17, 200)])
+def test_buffered_matches_convolve(shape: tuple) -> None:
+    board = (np.random.default_rng(sum(shape)).random(shape) < 0.35).astype(np.uint8)
+    for generations in (1, 2, 11):
+        assert np.array_equal(run(BufferedEngine, board, generations), run(ConvolveEngine, board, generations))
+
+
+def test_glider_dies_at_the_edge() -> None:
+    board = np.zeros((8, 70), dtype=np.int64)
+    board[0:3, 66:69] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+
+    expected = run(ConvolveEngine, board, 40)
+    assert np.array_equal(run(BitPackedEngine, board, 40), expected)
+
+
+def test_unknown_engine() -> None:
+    with pytest.raises(ValueError):
+        get_engine("unknown")
+
+
+@pytest.mark.parametrize("generations", [1, 3, 8, 13, 64])
+def test_hashlife_matches_convolve_away_from_edges(generations: int) -> None:
+    rng = np.random.default_rng(generations)
+    board = np.zeros((160, 160), dtype=np.int64)
+    board[70:90, 70:90] = rng.integers(2, size=(20, 20))
+
+    expected = run(ConvolveEngine, board, generations)
+    assert np.array_equal(run(HashLifeEngine, board, generations), expected)
+
+
+def test_hashlife_glider_leaves_and_keeps_evolving() -> None:
+    board = np.zeros((16, 16), dtype=np.int64)
+    board[0:3, 0:3] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+
+    engine = HashLifeEngine(board.shape)
+    engine.load(board)
+    engine.advance(1 << 10)
+    assert engine.population == 5
+    assert not engine.state().any()
+
+
+@pytest.mark.parametrize("engine_cls", [ConvolveEngine, HashLifeEngine])
+def test_negative_advance_is_refused(engine_cls: type) -> None:
+    engine = engine_cls((16, 16))
+    with pytest.raises(ValueError):
+        engine.advance(-3)
+    assert engine.generation == 0
+
+
+def test_hashlife_cache_is_bounded() -> None:
+    rng = np.random.default_rng(0)
+    engine = HashLifeEngine((32, 32), max_nodes=5000)
+    engine.load(rng.integers(2, size=(32, 32)))
+    engine.advance(32)
+    assert engine.evictions > 0
+    assert len(engine._nodes) + len(engine._results) <= engine.max_nodes
+
+
+@pytest.mark.parametrize("engine_cls", [SparseEngine, HashLifeEngine])
+def test_unbounded_engines_follow_glider(engine_cls: type) -> None:
+    board = np.zeros((16, 16), dtype=np.int64)
+    board[0:3, 0:3] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+
+    engine = engine_cls(board.shape)
+    engine.load(board)
+    engine.advance(400)
+
+    # a glider moves by one cell diagonally every four generations
+    assert engine.population == 5
+    assert engine.bounding_box() == (100, 100, 103, 103)
+    assert np.array_equal(engine.region(100, 100, 3, 3), board[0:3, 0:3])
+
+
+def test_sparse_matches_convolve_away_from_edges() -> None:
+    rng = np.random.default_rng(1)
+    board = np.zeros((120, 120), dtype=np.int64)
+    board[50:70, 50:70] = rng.integers(2, size=(20, 20))
+
+    expected = run(ConvolveEngine, board, 30)
+    assert np.array_equal(run(SparseEngine, board, 30), expected)
+
+
+@pytest.mark.parametrize("tile_size", [4, 7, 32])
+def test_tiled_matches_convolve(tile_size: int) -> None:
+    rng = np.random.default_rng(tile_size)
+    board = rng.integers(2, size=(45, 60))
+
+    for generations in (1, 5, 60):
+        expected = run(ConvolveEngine, board, generations)
+        engine = TiledEngine(board.shape, tile_size=tile_size)
+        engine.load(board)
+        engine.advance(generations)
+        assert np.array_equal(engine.state(), expected)
+
+
+def test_tiled_tracks_dirty_tiles() -> None:
+    board = np.zeros((32, 32), dtype=np.uint8)
+    board[1:3, 1:3] = 1  # block (still life) in tile (0, 0)
+    board[20, 18:21] = 1  # blinker in tile (2, 2)
+
+    engine = TiledEngine(board.shape, tile_size=8)
+    engine.load(board)
+    assert engine.dirty_regions() is None
+
+    engine.advance(2)
+    assert engine.dirty_tiles == {(2, 2)}
+    assert engine.dirty_regions() == [(16, 16, 24, 24)]
+    assert not engine.active[0, 0]
+
+
+def test_parallel_matches_convolve() -> None:
+    rng = np.random.default_rng(5)
+    board = rng.integers(2, size=(37, 50))
+
+    engine = ParallelEngine(board.shape, workers=3)
+    try:
+        engine.load(board)
+        engine.advance(20)
+        assert len(engine.strips) == 3
+        assert np.array_equal(engine.state(), run(ConvolveEngine, board, 20))
+    finally:
+        engine.close()
+
+
+@pytest.mark.parametrize("name", ["convolve", "lookup", "bitpacked", "buffered", "tiled", "sparse", "hashlife"])
+def test_edit_sets_cells(name: str) -> None:
+    board = (np.random.default_rng(3).random((40, 70)) < 0.3).astype(np.uint8)
+    engine = get_engine(name)(board.shape)
+    engine.load(board)
+    engine.step()
+    # cells born outside of the board keep evolving on unbounded engines
+    margin = 4 if engine.unbounded else 0
+    expected = run(ConvolveEngine, np.pad(board, margin), 1)
+
+    rows, cols = np.array([0, 5, 39, 20, 20]), np.array([0, 69, 3, 20, 20])
+    values = np.array([1, 1, 0, 0, 1], dtype=np.uint8)
+    engine.edit(rows, cols, values)
+    expected[rows + margin, cols + margin] = values
+    window = expected[margin:margin + board.shape[0], margin:margin + board.shape[1]]
+    assert np.array_equal(engine.state(), window)
+
+    engine.step()
+    expected = run(ConvolveEngine, expected, 1)
+    assert np.array_equal(engine.state(), expected[margin:margin + board.shape[0], margin:margin + board.shape[1]])
+
+
+@pytest.mark.parametrize("engine_cls", [SparseEngine, HashLifeEngine])
+def test_edit_keeps_cells_outside_of_board(engine_cls: type) -> None:
+    board = np.zeros((16, 16), dtype=np.uint8)
+    board[0:3, 0:3] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+    engine = engine_cls(board.shape)
+    engine.load(board)
+    engine.advance(100)
+
+    engine.edit(np.array([2, -50]), np.array([3, 70]), np.array([1, 1]))
+    assert engine.population == 7
+    assert engine.region(25, 25, 3, 3).sum() == 5
+    assert engine.region(-50, 70, 1, 1)[0, 0] == 1
+    engine.edit(np.array([-50]), np.array([70]), np.array([0]))
+    assert engine.population == 6
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import numpy as np
+
+from game_of_life.cli import main
+from game_of_life.engines import LookupEngine
+from game_of_life.ensemble import Ensemble
+
+
+def test_boards_evolve_like_engine() -> None:
+    ensemble = Ensemble(4, (12, 17), rule="B36/S23")
+    ensemble.randomize(np.array([0.2, 0.3, 0.4, 0.5]), seed=1)
+    initial = ensemble.boards.copy()
+    for _ in range(20):
+        ensemble.step()
+
+    for board, final in zip(initial, ensemble.boards):
+        engine = LookupEngine((12, 17), "B36/S23")
+        engine.load(board)
+        engine.advance(20)
+        np.testing.assert_array_equal(engine.state(), final)
+    np.testing.assert_array_equal(ensemble.population, ensemble.boards.sum(axis=(1, 2)))
+
+
+def test_extinction_and_settling() -> None:
+    boards = np.zeros((3, 8, 8), dtype=np.uint8)
+    boards[0, 3, 3] = 1  # dies out
+    boards[1, 3, 2:5] = 1  # blinker
+    boards[2, 1:3, 1:3] = 1  # block
+    ensemble = Ensemble(3, (8, 8), rule="B3/S23", max_period=4)
+    ensemble.load(boards)
+    ensemble.run(10)
+
+    assert ensemble.all_settled
+    assert ensemble.generation < 10
+    np.testing.assert_array_equal(ensemble.extinction, [1, -1, -1])
+    np.testing.assert_array_equal(ensemble.settled, [1, 0, 0])
+    np.testing.assert_array_equal(ensemble.period, [1, 2, 1])
+    np.testing.assert_array_equal(ensemble.population, [0, 3, 4])
+
+
+def test_sweep(tmp_path: Path, capsys) -> None:
+    output = tmp_path / "sweep.npz"
+    args = ["sweep", "--size", "16", "--boards", "8", "--densities", "0.1", "0.5", "--generations", "50"]
+    assert main(args + ["--seed", "0", "--output", str(output)]) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].split()[0] == "0.100" and lines[2].split()[0] == "0.500"
+    results = np.load(output)
+    assert results["0.1"].shape == (4, 8)
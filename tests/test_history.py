@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import numpy as np
+
+from game_of_life.engines import BitPackedEngine
+from game_of_life.history import HistoryReader, HistoryWriter
+
+
+def record(path: Path, generations: int, keyframe_interval: int) -> list:
+    engine = BitPackedEngine((64, 96))
+    engine.load((np.random.default_rng(0).random((64, 96)) < 0.3).astype(np.uint8))
+    writer = HistoryWriter(str(path), engine.shape, keyframe_interval)
+    boards = []
+    for _ in range(generations):
+        boards.append(engine.state())
+        writer.append(engine.generation, boards[-1])
+        engine.step()
+    writer.close()
+    return boards
+
+
+def test_random_access_replay(tmp_path: Path) -> None:
+    boards = record(tmp_path / "run.golh", 100, keyframe_interval=16)
+    reader = HistoryReader(str(tmp_path / "run.golh"))
+
+    assert len(reader) == 100 and reader.generations == list(range(100))
+    for index in (99, 0, 17, 18, 16, 15, 50):
+        assert np.array_equal(reader.seek(index), boards[index])
+    assert reader.find(1000) == 99
+
+
+def test_history_goes_on_from_truncated_generation(tmp_path: Path) -> None:
+    path = str(tmp_path / "run.golh")
+    writer = HistoryWriter(path, (8, 8), keyframe_interval=4)
+    for generation in range(10):
+        writer.append(generation, np.full((8, 8), generation % 2))
+    writer.truncate(5)
+    writer.append(5, np.eye(8))
+    writer.append(6, np.ones((8, 8)))
+    writer.close()
+
+    reader = HistoryReader(path)
+    assert reader.generations == [0, 1, 2, 3, 4, 5, 5, 6]
+    assert np.array_equal(reader.seek(reader.find(5)), np.eye(8))
+    assert reader.seek(reader.find(6)).all() and not reader.seek(reader.find(4)).any()
+
+
+def test_delta_size_follows_activity(tmp_path: Path) -> None:
+    path = tmp_path / "still.golh"
+    writer = HistoryWriter(str(path), (512, 512), keyframe_interval=1000)
+    board = np.zeros((512, 512), dtype=np.uint8)
+    board[100:102, 100:102] = 1
+    for generation in range(100):
+        writer.append(generation, board)
+    writer.close()
+    # a delta of a still life takes tens of bytes, the raw bit-packed board 32 kB
+    assert path.stat().st_size < 100 * 50
+
+
+def test_reader_follows_growing_file(tmp_path: Path) -> None:
+    path = str(tmp_path / "growing.golh")
+    writer = HistoryWriter(path, (8, 8))
+    writer.append(0, np.zeros((8, 8)))
+    reader = HistoryReader(path)
+    assert len(reader) == 1
+
+    writer.append(1, np.ones((8, 8)))
+    reader.refresh()
+    assert len(reader) == 2
+    assert reader.seek(1).all()
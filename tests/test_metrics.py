@@ -0,0 +1,81 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from game_of_life.cli import main
+from game_of_life.engines import BufferedEngine, ConvolveEngine, LookupEngine
+from game_of_life.metrics import NEIGHBORS, RULES, STEP, Metrics, allocated_bytes, metrics
+
+
+def test_timer_records_durations() -> None:
+    recorded = Metrics(window=4)
+    for _ in range(6):
+        with recorded.timer(STEP):
+            time.sleep(0.001)
+
+    histogram = recorded.histograms[STEP]
+    assert histogram.count == 6
+    assert len(histogram.samples) == 4
+    assert histogram.summary()["p50"] >= 0.001
+    assert histogram.bins().sum() == 4
+
+
+def test_disabled_metrics_record_nothing() -> None:
+    recorded = Metrics(enabled=False)
+    with recorded.timer(STEP):
+        pass
+    assert not recorded.histograms
+    assert not recorded.events
+
+
+def test_report_lists_stages_in_pipeline_order() -> None:
+    recorded = Metrics()
+    recorded.record(STEP, 0, 2_000_000)
+    recorded.record(NEIGHBORS, 0, 1_000_000)
+
+    lines = recorded.report().splitlines()
+    assert lines[1].startswith(NEIGHBORS)
+    assert lines[2].startswith(STEP)
+    assert "1.00" in lines[1]
+
+
+def test_trace_has_complete_events(tmp_path: Path) -> None:
+    recorded = Metrics(trace_events=2)
+    for i in range(3):
+        recorded.record(STEP, i * 1000, i * 1000 + 500)
+    path = tmp_path / "trace.json"
+    recorded.dump_trace(str(path))
+
+    events = json.loads(path.read_text())["traceEvents"]
+    assert len(events) == 2
+    assert all(event["ph"] == "X" and event["name"] == STEP and event["dur"] == 0.5 for event in events)
+
+
+def test_engine_step_records_stages() -> None:
+    board = np.random.default_rng(0).integers(0, 2, (32, 32))
+    for engine in (ConvolveEngine((32, 32)), LookupEngine((32, 32), "B36/S23")):
+        metrics.reset()
+        engine.load(board)
+        engine.step()
+        assert metrics.histograms[NEIGHBORS].count == 1
+        assert metrics.histograms[RULES].count == 1
+
+
+def test_headless_run_saves_trace(tmp_path: Path) -> None:
+    path = tmp_path / "trace.json"
+    assert main(["run", "--size", "16", "--generations", "3", "--engine", "convolve", "--trace", str(path)]) == 0
+    names = {event["name"] for event in json.loads(path.read_text())["traceEvents"]}
+    assert {NEIGHBORS, RULES} <= names
+
+
+def test_buffered_step_does_not_allocate_boards() -> None:
+    board = np.random.default_rng(0).integers(0, 2, (512, 512), dtype=np.uint8)
+    buffered, convolve = BufferedEngine(board.shape), ConvolveEngine(board.shape)
+    buffered.load(board)
+    convolve.load(board)
+
+    # only constant-size ufunc buffers and metrics events, no board-sized temporaries
+    assert allocated_bytes(buffered.step) < board.nbytes / 8
+    assert allocated_bytes(convolve.step) > board.nbytes
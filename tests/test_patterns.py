@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from game_of_life import patterns
+from game_of_life.patterns import load_npy, read_pattern, write_pattern
+
+GLIDER_RLE = b"#N Glider\n#C comment\nx = 3, y = 3, rule = B3/S23\nbob$2bo$3o!\n"
+GLIDER = np.array([[0, 1, 0], [0, 0, 1], [1, 1, 1]], dtype=np.uint8)
+
+
+@pytest.mark.parametrize("suffix", [".rle", ".cells", ".mc", ".npy"])
+@pytest.mark.parametrize("shape", [(70, 90), (71, 33), (5, 200)])
+def test_round_trip(tmp_path: Path, suffix: str, shape: tuple) -> None:
+    board = (np.random.default_rng(0).random(shape) < 0.3).astype(np.uint8)
+    path = str(tmp_path / f"board{suffix}")
+    write_pattern(path, board, "B36/S23")
+    read, rule = read_pattern(path, shape=shape)
+    assert np.array_equal(read, board)
+    assert rule == ("B36/S23" if suffix in (".rle", ".mc") else None)
+
+
+def test_rle_is_centered_and_parsed_in_chunks(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "glider.rle"
+    path.write_bytes(GLIDER_RLE)
+    monkeypatch.setattr(patterns, "CHUNK_SIZE", 2)
+
+    board, rule = read_pattern(str(path), shape=(7, 7))
+    assert rule == "B3/S23"
+    assert np.array_equal(board[2:5, 2:5], GLIDER)
+    assert board.sum() == GLIDER.sum()
+
+
+@pytest.mark.parametrize("header, expected", [("23/3", "B3/S23"), ("B3/S23:T20,20", None), ("Life", None)])
+def test_rle_rule_in_other_notations(tmp_path: Path, header: str, expected: str) -> None:
+    path = tmp_path / "glider.rle"
+    path.write_bytes(GLIDER_RLE.replace(b"B3/S23", header.encode()))
+    board, rule = read_pattern(str(path), shape=(7, 7))
+    assert rule == expected
+    assert np.array_equal(board[2:5, 2:5], GLIDER)
+
+
+def test_pattern_larger_than_board_is_cropped(tmp_path: Path) -> None:
+    path = str(tmp_path / "board.cells")
+    write_pattern(path, np.ones((10, 10), dtype=np.uint8))
+    assert np.array_equal(read_pattern(path, shape=(4, 6))[0], np.ones((4, 6), dtype=np.uint8))
+
+
+def test_npy_is_memory_mapped(tmp_path: Path) -> None:
+    path = str(tmp_path / "board.npy")
+    write_pattern(path, GLIDER)
+    array = load_npy(path)
+    assert isinstance(array, np.memmap)
+    array[0, 0] = 1
+    assert np.array_equal(np.load(path), GLIDER)
+
+
+def test_unsupported_suffix() -> None:
+    with pytest.raises(ValueError):
+        read_pattern("board.txt", shape=(4, 4))
@@ -0,0 +1,222 @@
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import ImageTk
+
+from game_of_life.engines import ConvolveEngine, SparseEngine
+from game_of_life.history import HistoryReader, HistoryWriter
+from game_of_life.processing import FrameHolder, Message, ProcessingProcess, ProcessingThread, SharedFrame
+
+
+def test_frame_holder_keeps_only_newest_generation() -> None:
+    frames = FrameHolder((4, 4))
+    assert frames.take() is None
+
+    for generation in range(3):
+        frames.publish(generation, np.full((4, 4), generation % 2))
+    generation, board, window = frames.take()
+    assert generation == 2
+    assert np.array_equal(board, np.zeros((4, 4))) and window is None
+    assert frames.take() is None
+
+
+def test_turbo_worker_publishes_to_frame_holder() -> None:
+    processor = ProcessingThread(units=16, engine="bitpacked")
+    processor._handle_message(Message(Message.TURBO, True))
+    processor._handle_message(Message(Message.RANDOM_INIT))
+
+    for _ in range(10):
+        processor._process()
+    generation, board, _ = processor.frames.take()
+    assert processor.processed.empty()
+    assert 1 <= generation <= 10
+    assert board.shape == (16, 16)
+
+
+def test_worker_wakes_on_messages_and_blocks_when_paused() -> None:
+    processor = ProcessingThread(units=16, engine="bitpacked")
+    processor.simulation.detector = None  # small soups settle quickly, keep computing
+    processor.start()
+    assert processor._timeout() is None  # paused until initialized
+
+    processor.send_message(Message(Message.TURBO, True))
+    processor.send_message(Message(Message.RANDOM_INIT))
+    deadline = time.perf_counter() + 5
+    while processor.simulation.generation < 100 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert processor.simulation.generation >= 100
+
+    processor.send_message(Message(Message.PAUSE))
+    time.sleep(0.1)
+    generation = processor.simulation.generation
+    time.sleep(0.1)
+    assert processor.simulation.generation == generation
+
+    processor.send_message(Message(Message.STEP))
+    time.sleep(0.1)
+    assert processor.simulation.generation == generation + 1
+
+
+def test_worker_loads_pattern(tmp_path) -> None:
+    pattern = tmp_path / "blinker.cells"
+    pattern.write_text("OOO\n")
+    processor = ProcessingThread(units=9, engine="bitpacked")
+    processor._handle_message(Message(Message.TURBO, True))
+    processor._handle_message(Message(Message.LOAD_PATTERN, str(pattern)))
+
+    _, board, _ = processor.frames.take()
+    assert np.array_equal(np.flatnonzero(board[4]), [3, 4, 5])
+    assert board.sum() == 3
+
+
+def test_worker_records_history(tmp_path) -> None:
+    from game_of_life.history import HistoryReader, HistoryWriter
+
+    processor = ProcessingThread(units=16, engine="bitpacked")
+    processor.recorder = HistoryWriter(str(tmp_path / "run.golh"), processor.array_shape)
+    processor._handle_message(Message(Message.TURBO, True))
+    processor._handle_message(Message(Message.RANDOM_INIT))
+    for _ in range(5):
+        processor._process()
+    processor._handle_message(Message(Message.FAST_FORWARD, 10))
+
+    reader = HistoryReader(processor.recorder.path)
+    assert reader.generations == [0, 1, 2, 3, 4, 5, 15]
+    assert np.array_equal(reader.seek(6), processor.simulation.state())
+
+
+def test_worker_stops_computing_detected_cycle(monkeypatch) -> None:
+    monkeypatch.setattr(ImageTk, "PhotoImage", lambda image: image.copy())  # no display needed
+    processor = ProcessingThread(units=16, engine="bitpacked")
+    board = np.zeros((16, 16), dtype=np.uint8)
+    board[5, 4:7] = 1  # blinker
+    processor._handle_message(Message(Message.IMG_UPDATE, (board, 0)))
+    processor._handle_message(Message(Message.RESUME))
+
+    for _ in range(10):
+        processor._process()
+        processor.processed.get()
+    assert str(processor.simulation.cycle) == "period 2 since generation 0"
+    assert processor.simulation.engine.generation == 3
+    assert processor.simulation.generation == 10
+    assert len(processor.cycle_images) == 2
+
+    processor._handle_message(Message(Message.TURBO, True))
+    assert processor._timeout() is None
+
+
+def test_worker_applies_edit_list() -> None:
+    processor = ProcessingThread(units=16, engine="bitpacked")
+    processor._handle_message(Message(Message.CLEAN_INIT))
+    processor._handle_message(Message(Message.PAUSE))
+    edits = (np.array([7, 7, 7]), np.array([6, 7, 8]), np.array([1, 1, 1], dtype=np.uint8), 0)
+    processor._handle_message(Message(Message.EDIT_CELLS, edits))
+
+    board = processor.simulation.state()
+    assert board.sum() == 3 and board[7, 6:9].all()
+    processor.simulation.step()
+    assert processor.simulation.state()[6:9, 7].all()
+
+
+def test_worker_ahead_of_shown_generation_goes_back_to_it(monkeypatch) -> None:
+    monkeypatch.setattr(ImageTk, "PhotoImage", lambda image: image.copy())  # no display needed
+    processor = ProcessingThread(units=16, engine="sparse")
+    processor._handle_message(Message(Message.RANDOM_INIT))
+    reference = SparseEngine((16, 16))
+    reference.load(processor.simulation.state())
+    for _ in range(4):
+        processor._process()
+    shown, _, generation = processor.take_frame()
+    assert generation == 1 and processor.simulation.generation == 4
+
+    processor._handle_message(Message(Message.PAUSE))
+    rows, cols, values = np.array([0, -5]), np.array([0, 20]), np.array([1, 1], dtype=np.uint8)
+    processor._handle_message(Message(Message.EDIT_CELLS, (rows, cols, values, generation)))
+    assert processor.simulation.generation == 1 and processor.processed.empty()
+    # cells outside of the board are kept
+    reference.step()
+    reference.edit(rows, cols, values)
+    assert np.array_equal(processor.simulation.engine.cells, reference.cells)
+    shown[0, 0] = 1
+    assert np.array_equal(processor.simulation.state(), shown)
+
+
+def test_worker_continues_from_replayed_generation(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(ImageTk, "PhotoImage", lambda image: image.copy())  # no display needed
+    processor = ProcessingThread(units=16, engine="bitpacked")
+    path = str(tmp_path / "run.golh")
+    processor.recorder = HistoryWriter(path, processor.array_shape)
+    processor._handle_message(Message(Message.RANDOM_INIT))
+    for _ in range(6):
+        processor._process()
+
+    replay = HistoryReader(path)
+    board = replay.seek(replay.find(2))
+    processor._handle_message(Message(Message.IMG_UPDATE, (board, 2)))
+    assert processor.simulation.generation == 2
+    processor._process()
+
+    replay = HistoryReader(path)
+    assert replay.generations == [0, 1, 2, 2, 3]
+    assert np.array_equal(replay.seek(replay.find(3)), processor.simulation.state())
+
+
+def test_unbounded_worker_publishes_cells_of_the_view() -> None:
+    processor = ProcessingThread(units=16, engine="sparse")
+    processor._handle_message(Message(Message.TURBO, True))
+    processor._handle_message(Message(Message.CLEAN_INIT))
+    processor.simulation.engine.edit(np.array([-5, 20]), np.array([-3, 4]), np.array([1, 1]))
+    processor._handle_message(Message(Message.VIEW, (-8, -8, 32, 32)))
+
+    _, board, (view, cells) = processor.frames.take()
+    assert board.sum() == 0
+    assert view == (-8, -8, 32, 32) and np.array_equal(np.argwhere(cells), [[3, 5], [28, 12]])
+    assert processor.bounding_box() == (-5, -3, 21, 5)
+
+
+def test_shared_frame_keeps_only_newest_generation() -> None:
+    frame = SharedFrame((4, 4), 8, threading.Lock())
+    try:
+        assert frame.take(np.copy) is None
+        for generation in range(3):
+            frame.publish(generation, np.full((4, 4), generation % 2), np.full((8, 8), generation, dtype=np.uint8), None)
+        board, image, generation = frame.take(np.copy)
+        assert generation == 2
+        assert not board.any() and (image == 2).all()
+        assert frame.take(np.copy) is None
+        assert frame.cycle() is None and frame.bounding_box() is None
+
+        frame.publish(3, np.zeros((4, 4)), np.zeros((8, 8), dtype=np.uint8), None, (-7, 2, 5, 9))
+        assert frame.bounding_box() == (-7, 2, 5, 9)
+    finally:
+        frame.close()
+        frame.memory.unlink()
+
+
+def test_worker_process_shares_consecutive_generations(monkeypatch) -> None:
+    monkeypatch.setattr(ImageTk, "PhotoImage", lambda image: np.array(image))  # no display needed
+    processor = ProcessingProcess(units=24, size=48, engine="bitpacked")
+    try:
+        processor.send_message(Message(Message.RANDOM_INIT))
+        processor.start()
+        frames = []
+        deadline = time.perf_counter() + 20
+        while len(frames) < 3 and time.perf_counter() < deadline:
+            frame = processor.take_frame()
+            if frame is None:
+                time.sleep(0.01)
+            else:
+                frames.append(frame)
+        assert [generation for _, _, generation in frames] == [1, 2, 3]
+
+        (previous, _, _), (board, image, _) = frames[1:]
+        expected = ConvolveEngine(previous.shape)
+        expected.load(previous)
+        expected.step()
+        assert np.array_equal(board, expected.state())
+        assert np.array_equal(image, np.kron(board, np.ones((2, 2), dtype=np.uint8)))
+    finally:
+        processor.close()
+    assert not processor.process.is_alive()
@@ -0,0 +1,106 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from game_of_life.rendering import EDGE, Renderer, Viewport
+
+COLORS = ((35, 43, 43), (82, 172, 204))
+
+
+@pytest.mark.parametrize("units, size", [(20, 720), (37, 800), (1000, 720)])
+def test_render_matches_resized_image(units: int, size: int) -> None:
+    board = np.random.default_rng(units).integers(2, size=(units, units)).astype(np.uint8)
+
+    rgb = np.array(COLORS, dtype=np.uint8)[board]
+    expected = Image.fromarray(rgb).resize(size=(size, size), resample=Image.NEAREST)
+    renderer = Renderer(board.shape, size, COLORS)
+    renderer.render(board)
+    assert np.array_equal(renderer.rgb(), np.asarray(expected))
+    assert np.array_equal(np.asarray(renderer.image().convert("RGB")), np.asarray(expected))
+
+
+def test_partial_render_matches_full_render() -> None:
+    rng = np.random.default_rng(0)
+    previous = rng.integers(2, size=(20, 20)).astype(np.uint8)
+    current = previous.copy()
+    current[2:5, 3:9] ^= 1
+
+    renderer = Renderer(previous.shape, 720, COLORS)
+    renderer.render(previous)
+    renderer.render(current, region=(2, 3, 5, 9))
+    assert np.array_equal(renderer.indices, Renderer(current.shape, 720, COLORS).render(current))
+
+
+def test_render_does_not_allocate_frames() -> None:
+    board = np.ones((500, 500), dtype=np.uint8)
+    renderer = Renderer(board.shape, 720, COLORS)
+    renderer.render(board)
+
+    tracemalloc.start()
+    renderer.render(board)
+    renderer.image()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 720 * 720 // 10  # well below the size of a single frame
+
+
+def test_zoomed_view_renders_only_the_window() -> None:
+    board = np.random.default_rng(1).integers(2, size=(1000, 1000)).astype(np.uint8)
+    viewport = Viewport(board.shape, 720)
+    viewport.zoom_by(10, x=360, y=360)
+    top, left, height, width = viewport.view
+    assert (height, width) == (100, 100) and (top, left) == (450, 450)
+
+    renderer = Renderer(board.shape, 720, COLORS)
+    renderer.set_view(viewport.view)
+    window = board[top:top + height, left:left + width]
+    assert np.array_equal(renderer.render(board), Renderer(window.shape, 720, COLORS).render(window))
+
+
+def test_viewport_stays_within_board() -> None:
+    viewport = Viewport((100, 100), 800)
+    viewport.zoom_by(4, x=0, y=0)
+    assert viewport.view == (0, 0, 25, 25)
+    viewport.pan(-10000, 10000)
+    assert viewport.view == (0, 75, 25, 25)
+    assert viewport.cell_at(799, 0) == (0, 99)
+    viewport.zoom_by(0.01)
+    assert viewport.view == (0, 0, 100, 100)
+
+
+def test_view_into_unbounded_universe_leaves_the_board() -> None:
+    viewport = Viewport((100, 100), 800, bounded=False)
+    viewport.pan(4000, 4000)
+    assert viewport.view == (-500, -500, 100, 100)
+    viewport.zoom_by(0.01)
+    assert viewport.view[2:] == (1600, 1600)
+    viewport.fit((-30, 200, -10, 210))
+    assert viewport.view == (-31, 194, 22, 22)
+
+    board = np.random.default_rng(2).integers(2, size=(100, 100)).astype(np.uint8)
+    renderer = Renderer(board.shape, 720, COLORS)
+    renderer.set_view((-20, 50, 80, 80))
+    window = np.zeros((80, 80), dtype=np.uint8)
+    window[20:, :50] = board[:60, 50:]
+    assert np.array_equal(renderer.render(board), Renderer(window.shape, 720, COLORS).render(window))
+    assert np.array_equal(renderer.render_view(window), Renderer(window.shape, 720, COLORS).render(window))
+
+
+def test_grid_lines_are_drawn_when_cells_are_large() -> None:
+    board = np.ones((20, 20), dtype=np.uint8)
+    renderer = Renderer(board.shape, 720, COLORS + ((79, 85, 85),), grid_min_zoom=4)
+    indices = renderer.render(board)
+    assert np.array_equal(np.flatnonzero(indices[1] == EDGE), np.arange(0, 720, 36))
+    assert (indices[0] == EDGE).all()
+
+    renderer = Renderer((200, 200), 720, COLORS + ((79, 85, 85),), grid_min_zoom=4)  # 3.6 pixels per cell
+    assert (renderer.render(np.ones((200, 200), dtype=np.uint8)) == 1).all()
+
+
+def test_pixels_of_region() -> None:
+    renderer = Renderer((20, 20), 720, COLORS)
+    assert renderer.pixels((2, 3, 3, 4)) == (108, 72, 144, 108)
+    renderer.set_view((0, 0, 10, 10))
+    assert renderer.pixels((15, 15, 16, 16)) is None
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from scipy.signal import convolve2d
+
+from game_of_life.engines import LookupEngine, normalize_rule, parse_rule
+from game_of_life.simulation import Simulation
+
+KERNEL = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]])
+
+
+def masks_step(board: np.ndarray) -> np.ndarray:
+    """Conway's rule applied by boolean masks, as the convolve engine does."""
+    neighbors = convolve2d(board, KERNEL, mode="same")
+    processed = board.copy()
+    processed[(board == 0) & (neighbors == 3)] = 1
+    processed[(board == 1) & ((neighbors > 3) | (neighbors < 2))] = 0
+    return processed
+
+
+def rule_step(board: np.ndarray, birth: set, survival: set) -> np.ndarray:
+    neighbors = convolve2d(board, KERNEL, mode="same")
+    return np.where(board == 1, np.isin(neighbors, list(survival)), np.isin(neighbors, list(birth))).astype(np.uint8)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (20, 20), (37, 81)])
+def test_lookup_table_matches_masks_for_conway(shape: tuple) -> None:
+    board = (np.random.default_rng(sum(shape)).random(shape) < 0.35).astype(np.uint8)
+    engine = LookupEngine(shape, "B3/S23")
+    engine.load(board)
+    for _ in range(30):
+        board = masks_step(board)
+        engine.step()
+        assert np.array_equal(engine.state(), board)
+
+
+@pytest.mark.parametrize("rule", ["B36/S23", "B3678/S34678", "B2/S", "B/S012345678"])
+def test_lookup_table_matches_rule(rule: str) -> None:
+    birth, survival = parse_rule(rule)
+    board = (np.random.default_rng(0).random((30, 40)) < 0.4).astype(np.uint8)
+    engine = LookupEngine(board.shape, rule)
+    engine.load(board)
+    for _ in range(10):
+        board = rule_step(board, birth, survival)
+        engine.step()
+    assert np.array_equal(engine.state(), board)
+
+
+def test_parse_rule() -> None:
+    assert parse_rule("b36/s23") == (frozenset({3, 6}), frozenset({2, 3}))
+    assert normalize_rule("S32/B63") == "B36/S23"
+    for invalid in ("B9/S23", "23/3", "B3S23", ""):
+        with pytest.raises(ValueError):
+            parse_rule(invalid)
+
+
+def test_simulation_uses_lookup_engine_for_other_rules() -> None:
+    assert Simulation((8, 8), "bitpacked", rule="B3/S23").engine.name == "bitpacked"
+    simulation = Simulation((8, 8), "bitpacked", rule="B36/S23")
+    assert simulation.engine.name == "lookup" and simulation.engine.rule == "B36/S23"
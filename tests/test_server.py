@@ -0,0 +1,142 @@
+import asyncio
+import socket
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from game_of_life.engines import ConvolveEngine
+from game_of_life.messages import Message
+from game_of_life.server import SEEK, FrameClient, FrameServer, decode_runs, encode_runs
+from game_of_life.simulation import Simulation
+
+
+@pytest.mark.parametrize("first", [0, 1])
+def test_runs_round_trip(first: int) -> None:
+    board = (np.random.default_rng(first).random((9, 13)) < 0.4).astype(np.uint8)
+    board[0, 0] = first
+    assert np.array_equal(decode_runs(encode_runs(board), board.shape), board)
+
+
+def serve(test, history=None, paused: bool = True, size: int = 32, patterns=None):
+    simulation = Simulation((size, size), "bitpacked", detect_cycles=False)
+    simulation.reset(seed=1)
+
+    async def run() -> None:
+        server = FrameServer(simulation, history=history, patterns=patterns)
+        await server.start()
+        server._set_paused(paused)
+        try:
+            await asyncio.wait_for(test(server, server.address[1]), timeout=20)
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_clients_drive_and_receive_generations() -> None:
+    async def test(server: FrameServer, port: int) -> None:
+        first, second = await FrameClient.connect(port=port), await FrameClient.connect(port=port)
+        assert first.shape == (32, 32) and first.rule == "B3/S23"
+        await first.send(Message.FAST_FORWARD, content=50)
+        while first.generation < 50:
+            await first.receive()
+        board = first.board.copy()
+
+        await second.send(Message.STEP)
+        for client in (first, second):
+            while client.generation != 51:
+                await client.receive()
+        expected = ConvolveEngine(board.shape)
+        expected.load(board)
+        expected.step()
+        assert np.array_equal(first.board, expected.state())
+        assert np.array_equal(second.board, expected.state())
+
+        await first.send(Message.VIEW, content=[0, 0, 8, 8])
+        with pytest.raises(ValueError, match="Unsupported"):
+            while True:
+                await first.receive()
+        await first.close()
+        await second.close()
+
+    serve(test)
+
+
+def test_slow_client_does_not_stall_simulation() -> None:
+    async def test(server: FrameServer, port: int) -> None:
+        # never reads its stream, which fills up soon
+        slow = socket.socket()
+        slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        slow.connect(("127.0.0.1", port))
+        client = await FrameClient.connect(port=port)
+        while client.generation < 200:
+            await client.receive()
+
+        generations = sorted(subscriber.sent.generation for subscriber in server.subscribers)
+        assert generations[0] < 100 <= generations[1]
+        assert max(subscriber.dropped for subscriber in server.subscribers) > 100
+        slow.close()
+        await client.close()
+
+    serve(test, paused=False, size=256)
+
+
+def test_seek_back_in_history(tmp_path: Path) -> None:
+    async def test(server: FrameServer, port: int) -> None:
+        client = await FrameClient.connect(port=port)
+        await client.send(SEEK, generation=40)
+        while client.generation < 40:
+            await client.receive()
+        await client.send(SEEK, generation=10)
+        while client.generation != 10:
+            await client.receive()
+        board = client.board.copy()
+        await client.send(SEEK, generation=40)
+        while client.generation != 40:
+            await client.receive()
+
+        expected = ConvolveEngine(board.shape)
+        expected.load(board)
+        expected.advance(30)
+        assert np.array_equal(client.board, expected.state())
+        await client.close()
+
+    serve(test, history=str(tmp_path / "run.golh"))
+
+
+def test_invalid_messages_are_refused(tmp_path: Path) -> None:
+    (tmp_path / "patterns").mkdir()
+    (tmp_path / "patterns" / "block.cells").write_text("OO\nOO\n")
+    (tmp_path / "secret.cells").write_text("O\n")
+
+    async def test(server: FrameServer, port: int) -> None:
+        client = await FrameClient.connect(port=port)
+        client.writer.write(b"[1]\n" + b"x" * 2 ** 17 + b"\n")
+        for match in ("JSON object", "too long"):
+            with pytest.raises(ValueError, match=match):
+                while True:
+                    await client.receive()
+        for name in ("../secret.cells", str(tmp_path / "secret.cells")):
+            await client.send(Message.LOAD_PATTERN, content=name)
+            with pytest.raises(ValueError, match="not in the patterns directory"):
+                while True:
+                    await client.receive()
+
+        for content in (-3, 0, 10 ** 12):
+            await client.send(Message.FAST_FORWARD, content=content)
+            with pytest.raises(ValueError, match="Cannot skip"):
+                while True:
+                    await client.receive()
+        await client.send(SEEK, generation=-1)
+        with pytest.raises(ValueError, match="Cannot seek"):
+            while True:
+                await client.receive()
+        assert server.simulation.generation == 0
+
+        await client.send(Message.LOAD_PATTERN, content="block.cells")
+        while client.generation != 0 or client.board.sum() != 4:
+            await client.receive()
+        await client.close()
+
+    serve(test, patterns=str(tmp_path / "patterns"))
@@ -0,0 +1,23 @@
+import numpy as np
+
+from game_of_life.simulation import Simulation
+
+
+def test_random_reset_is_compact_and_seeded() -> None:
+    simulation = Simulation((300, 500), "convolve", memory_budget=0)
+    simulation.reset(density=0.3, seed=7)
+    board = simulation.state()
+
+    assert board.dtype == np.uint8 and board.flags.c_contiguous
+    assert abs(board.mean() - 0.3) < 0.01
+    other = Simulation((300, 500), "convolve", memory_budget=0)
+    other.reset(density=0.3, seed=7)
+    assert np.array_equal(other.state(), board)
+
+
+def test_memory_budget_selects_bitpacked_storage() -> None:
+    simulation = Simulation((2048, 2048), "convolve", memory_budget=1)
+    assert simulation.engine.name == "bitpacked"
+    assert simulation.nbytes == 2050 * 32 * 8
+
+    assert Simulation((512, 512), "convolve", memory_budget=1).engine.name == "convolve"
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from game_of_life.messages import Message
+from game_of_life.processing import ProcessingThread
+from game_of_life.simulation import Simulation
+from game_of_life.stats import Stats
+
+
+def soup(shape: tuple, seed: int = 0) -> np.ndarray:
+    board = np.zeros(shape, dtype=np.uint8)
+    board[10:30, 15:40] = np.random.default_rng(seed).random((20, 25)) < 0.4
+    return board
+
+
+def test_stats_follow_changes_reported_by_engine() -> None:
+    decay = 0.9
+    simulation = Simulation((48, 64), "convolve", detect_cycles=False, stats=True)
+    simulation.stats.decay = decay
+    simulation.load(soup((48, 64)))
+
+    heat = np.zeros((48, 64))
+    for _ in range(30):
+        previous = simulation.state().copy()
+        simulation.step()
+        board = simulation.state()
+        heat = heat * decay + (board != previous)
+
+    stats = simulation.stats
+    assert not simulation._stats_stale
+    assert stats.generation == 30
+    assert stats.population == board.sum()
+    assert stats.births == np.count_nonzero(board > previous)
+    assert stats.deaths == np.count_nonzero(board < previous)
+    assert stats.bounding_box() == simulation.engine.bounding_box()
+    np.testing.assert_allclose(stats.heatmap(), heat, rtol=1e-5, atol=1e-6)
+    assert [entry[0] for entry in stats.history] == list(range(31))
+
+
+@pytest.mark.parametrize("engine", ["bitpacked", "convolve"])
+def test_statistics_catch_up_with_unknown_changes(engine: str) -> None:
+    simulation = Simulation((48, 64), engine, detect_cycles=False, stats=True)
+    simulation.load(soup((48, 64), seed=1))
+    simulation.advance(5)
+    simulation.step()
+    previous = simulation.statistics()
+    simulation.step()
+
+    stats = simulation.statistics()
+    board = simulation.state()
+    assert stats is previous
+    assert stats.generation == 7
+    assert stats.population == board.sum()
+    assert stats.bounding_box() == simulation.engine.bounding_box()
+
+
+def test_heatmap_blocks() -> None:
+    stats = Stats((10, 7))
+    stats.update(np.array([0, 69]), np.array([], dtype=np.intp), generation=1)
+    heatmap = stats.heatmap(size=4)
+    assert heatmap.shape == (4, 4)
+    assert heatmap[0, 0] == heatmap[-1, -1] == 1
+    assert heatmap.sum() == 2
+    assert stats.bounding_box() == (0, 0, 10, 7)
+
+
+def test_worker_answers_stats_message() -> None:
+    processor = ProcessingThread(units=16, engine="convolve")
+    processor._handle_message(Message(Message.TURBO, True))
+    processor._handle_message(Message(Message.RANDOM_INIT))
+    for _ in range(3):
+        processor._process()
+    assert processor.statistics() is None
+
+    processor._handle_message(Message(Message.STATS))
+    snapshot = processor.statistics()
+    assert snapshot.generation == processor.simulation.generation
+    assert snapshot.population == processor.simulation.population
+    assert snapshot.history.shape[1] == 4